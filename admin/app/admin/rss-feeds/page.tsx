@@ -92,6 +92,7 @@ function CreateFeedForm() {
       status: String(formData.get('status') || 'draft'),
       max_items: Number(formData.get('max_items') || 20),
       download_images: Boolean(formData.get('download_images') || false),
+      extract_full: Boolean(formData.get('extract_full') || false),
     }
     await serverFetch('/admin/rss-feeds', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(payload) })
     revalidatePath('/admin/rss-feeds')
@@ -125,6 +126,9 @@ function CreateFeedForm() {
         <label className="inline-flex items-center gap-2 text-sm opacity-80">
           <input type="checkbox" name="download_images" defaultChecked /> Download images
         </label>
+        <label className="inline-flex items-center gap-2 text-sm opacity-80">
+          <input type="checkbox" name="extract_full" /> Extract full articles
+        </label>
         <Button type="submit" className="ml-auto px-4 py-2">Add feed</Button>
       </div>
     </form>
@@ -0,0 +1,32 @@
+"""learned RapidAPI endpoint variants per host
+
+Revision ID: 0011_job_provider_variants
+Revises: 0010_paywall_events
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_job_provider_variants"
+down_revision = "0010_paywall_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_provider_variants",
+        sa.Column("host", sa.String(), primary_key=True),
+        sa.Column("variant", sa.String(), primary_key=True),
+        sa.Column("successes", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("failures", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("avg_latency_ms", sa.Float(), nullable=True),
+        sa.Column("last_success_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_provider_variants")
@@ -0,0 +1,66 @@
+"""local jobs index with full-text search
+
+Revision ID: 0012_jobs_index
+Revises: 0011_job_provider_variants
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_jobs_index"
+down_revision = "0011_job_provider_variants"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("canton", sa.String(), nullable=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("posted_at", sa.DateTime(timezone=False), nullable=True),
+        sa.Column("employment_type", sa.String(), nullable=True),
+        sa.Column("salary", sa.String(), nullable=True),
+        sa.Column("snippet", sa.String(), nullable=True),
+        sa.Column("first_seen_at", sa.DateTime(timezone=False), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=False), nullable=False),
+    )
+    op.create_index("ix_jobs_canton_posted", "jobs", ["canton", "posted_at"])
+    op.create_index("ix_jobs_last_seen", "jobs", ["last_seen_at"])
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.add_column(
+            "jobs",
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(company, '') || ' ' || "
+                    "coalesce(location, '') || ' ' || coalesce(snippet, ''))",
+                    persisted=True,
+                ),
+            ),
+        )
+        op.create_index("ix_jobs_search_vector", "jobs", ["search_vector"], postgresql_using="gin")
+    elif bind.dialect.name == "sqlite":
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(id UNINDEXED, title, company, location, snippet)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.drop_index("ix_jobs_search_vector", table_name="jobs")
+    elif bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
+    op.drop_index("ix_jobs_last_seen", table_name="jobs")
+    op.drop_index("ix_jobs_canton_posted", table_name="jobs")
+    op.drop_table("jobs")
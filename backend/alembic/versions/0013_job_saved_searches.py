@@ -0,0 +1,56 @@
+"""saved job searches and the alerts they produced
+
+Revision ID: 0013_job_saved_searches
+Revises: 0012_jobs_index
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_job_saved_searches"
+down_revision = "0012_jobs_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_saved_searches",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("keyword", sa.String(), nullable=False, server_default=""),
+        sa.Column("canton", sa.String(), nullable=True),
+        sa.Column("employment_type", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.Column("last_matched_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_job_saved_searches_user_id", "job_saved_searches", ["user_id"])
+
+    op.create_table(
+        "job_alerts",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("saved_search_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("job_id", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("canton", sa.String(), nullable=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("posted_at", sa.DateTime(timezone=False), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.Column("seen_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("saved_search_id", "job_id", name="uq_job_alerts_search_job"),
+    )
+    op.create_index("ix_job_alerts_user_created", "job_alerts", ["user_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_alerts_user_created", table_name="job_alerts")
+    op.drop_table("job_alerts")
+    op.drop_index("ix_job_saved_searches_user_id", table_name="job_saved_searches")
+    op.drop_table("job_saved_searches")
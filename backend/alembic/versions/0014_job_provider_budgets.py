@@ -0,0 +1,33 @@
+"""shared RapidAPI budget (token bucket and monthly spend)
+
+Revision ID: 0014_job_provider_budgets
+Revises: 0013_job_saved_searches
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_job_provider_budgets"
+down_revision = "0013_job_saved_searches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_provider_budgets",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("spent", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("denied", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("tokens", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("refilled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_provider_budgets")
@@ -0,0 +1,35 @@
+"""hourly/daily rollups of job search events
+
+Revision ID: 0015_job_search_rollups
+Revises: 0014_job_provider_budgets
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_job_search_rollups"
+down_revision = "0014_job_provider_budgets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_search_rollups",
+        sa.Column("granularity", sa.String(), primary_key=True),
+        sa.Column("bucket", sa.DateTime(timezone=False), primary_key=True),
+        sa.Column("keyword", sa.String(), primary_key=True),
+        sa.Column("canton", sa.String(), primary_key=True, server_default=""),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_job_search_rollups_window", "job_search_rollups", ["granularity", "bucket"])
+    op.create_index("ix_job_search_events_created", "job_search_events", ["created_at"])
+    # existing events are rolled up by backend/scripts/backfill_job_rollups.py
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_search_events_created", table_name="job_search_events")
+    op.drop_index("ix_job_search_rollups_window", table_name="job_search_rollups")
+    op.drop_table("job_search_rollups")
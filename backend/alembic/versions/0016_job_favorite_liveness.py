@@ -0,0 +1,37 @@
+"""liveness of favorited postings
+
+Revision ID: 0016_job_favorite_liveness
+Revises: 0015_job_search_rollups
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_job_favorite_liveness"
+down_revision = "0015_job_search_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("job_favorites") as batch_op:
+        batch_op.add_column(sa.Column("link_status", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("link_checked_at", sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column("link_dead_since", sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column("link_etag", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("link_last_modified", sa.String(), nullable=True))
+    op.create_index("ix_job_favorites_link_checked", "job_favorites", ["link_checked_at"])
+    op.create_index("ix_job_favorites_url", "job_favorites", ["url"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_favorites_url", table_name="job_favorites")
+    op.drop_index("ix_job_favorites_link_checked", table_name="job_favorites")
+    with op.batch_alter_table("job_favorites") as batch_op:
+        batch_op.drop_column("link_last_modified")
+        batch_op.drop_column("link_etag")
+        batch_op.drop_column("link_dead_since")
+        batch_op.drop_column("link_checked_at")
+        batch_op.drop_column("link_status")
@@ -0,0 +1,31 @@
+"""conditional GET state of rss feeds
+
+Revision ID: 0017_rss_feed_conditional_get
+Revises: 0016_job_favorite_liveness
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_rss_feed_conditional_get"
+down_revision = "0016_job_favorite_liveness"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("rss_feeds") as batch_op:
+        batch_op.add_column(sa.Column("etag", sa.String(length=300), nullable=True))
+        batch_op.add_column(sa.Column("last_modified", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("seen_entries", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("rss_feeds") as batch_op:
+        batch_op.drop_column("seen_entries")
+        batch_op.drop_column("content_hash")
+        batch_op.drop_column("last_modified")
+        batch_op.drop_column("etag")
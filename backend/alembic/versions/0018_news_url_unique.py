@@ -0,0 +1,38 @@
+"""unique news (url, language)
+
+Revision ID: 0018_news_url_unique
+Revises: 0017_rss_feed_conditional_get
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0018_news_url_unique"
+down_revision = "0017_rss_feed_conditional_get"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Imports used to race into duplicates. Which copy to keep is an editorial call
+    # (some are hand-edited), so stop and list them instead of deleting rows here.
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT url, language, COUNT(*) AS n FROM news"
+            " GROUP BY url, language HAVING COUNT(*) > 1"
+            " ORDER BY n DESC, url LIMIT 20"
+        )
+    ).fetchall()
+    if duplicates:
+        listed = "\n".join(f"  {n} x [{language}] {url}" for url, language, n in duplicates)
+        raise RuntimeError(
+            "news has several rows per (url, language); merge or delete the extra rows and re-run "
+            f"the migration (showing up to 20):\n{listed}"
+        )
+    op.create_index("uq_news_url_language", "news", ["url", "language"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_news_url_language", table_name="news")
@@ -0,0 +1,33 @@
+"""lease-based scheduling of rss feeds
+
+Revision ID: 0019_rss_feed_scheduling
+Revises: 0018_news_url_unique
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0019_rss_feed_scheduling"
+down_revision = "0018_news_url_unique"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("rss_feeds") as batch_op:
+        batch_op.add_column(sa.Column("poll_interval_sec", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("next_run_at", sa.DateTime(timezone=False), nullable=True))
+        batch_op.add_column(sa.Column("lease_owner", sa.String(length=128), nullable=True))
+        batch_op.add_column(sa.Column("lease_expires_at", sa.DateTime(timezone=False), nullable=True))
+    op.create_index("ix_rss_feeds_next_run", "rss_feeds", ["enabled", "next_run_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rss_feeds_next_run", table_name="rss_feeds")
+    with op.batch_alter_table("rss_feeds") as batch_op:
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("lease_owner")
+        batch_op.drop_column("next_run_at")
+        batch_op.drop_column("poll_interval_sec")
@@ -0,0 +1,29 @@
+"""full-article extraction for rss imports
+
+Revision ID: 0020_article_extraction
+Revises: 0019_rss_feed_scheduling
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0020_article_extraction"
+down_revision = "0019_rss_feed_scheduling"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("rss_feeds") as batch_op:
+        batch_op.add_column(sa.Column("extract_full", sa.Boolean(), nullable=False, server_default=sa.false()))
+    with op.batch_alter_table("news") as batch_op:
+        batch_op.add_column(sa.Column("content_etag", sa.String(length=300), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("news") as batch_op:
+        batch_op.drop_column("content_etag")
+    with op.batch_alter_table("rss_feeds") as batch_op:
+        batch_op.drop_column("extract_full")
@@ -0,0 +1,28 @@
+"""per-canton coverage of the jobs index by the ingester
+
+Revision ID: 0021_job_index_coverage
+Revises: 0020_article_extraction
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0021_job_index_coverage"
+down_revision = "0020_article_extraction"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_index_coverage",
+        sa.Column("canton", sa.String(), primary_key=True),
+        sa.Column("ingested_at", sa.DateTime(timezone=False), nullable=False),
+        sa.Column("postings", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_index_coverage")
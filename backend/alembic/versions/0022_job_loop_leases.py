@@ -0,0 +1,28 @@
+"""leases so one worker runs each background job loop
+
+Revision ID: 0022_job_loop_leases
+Revises: 0021_job_index_coverage
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0022_job_loop_leases"
+down_revision = "0021_job_index_coverage"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_loop_leases",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("owner", sa.String(length=128), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=False), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_loop_leases")
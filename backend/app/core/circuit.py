@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import get_settings
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised (or reported) instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker for one upstream.
+
+    The last ``window`` calls are kept; a call fails when it raised, returned an
+    unusable response or took longer than ``slow_call_ms``. Once ``min_calls`` are
+    recorded and the failure rate reaches ``failure_rate`` the circuit opens and
+    ``allow`` answers False for ``open_sec``. After that a single trial call is let
+    through (half-open): success closes the circuit, failure opens it again. A trial
+    that never reports back (its caller was cancelled) is given up after
+    ``open_sec`` and the next call becomes the trial. Thread-safe, since feed imports run in the threadpool.
+    """
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5, slow_call_ms: float = 5000.0, open_sec: float = 30.0) -> None:
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.open_sec = open_sec
+        self._calls: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._latency_ewma_ms: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_sec:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; a False answer is counted as rejected."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            now = time.monotonic()
+            if state == HALF_OPEN and (not self._trial_in_flight or now - self._trial_started_at >= self.open_sec):
+                self._trial_in_flight = True
+                self._trial_started_at = now
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def record(self, ok: bool, latency_ms: float) -> None:
+        failed = not ok or latency_ms > self.slow_call_ms
+        with self._lock:
+            self._counters["calls"] += 1
+            if failed:
+                self._counters["failures"] += 1
+            prev = self._latency_ewma_ms
+            self._latency_ewma_ms = latency_ms if prev is None else 0.8 * prev + 0.2 * latency_ms
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._trial_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    self._calls.append((True, latency_ms))
+                return
+            if state == OPEN:
+                # a call admitted before the circuit opened; it only updates the stats
+                return
+            self._calls.append((not failed, latency_ms))
+            if len(self._calls) >= self.min_calls and self._failure_ratio() >= self.failure_rate:
+                self._open()
+
+    def release(self) -> None:
+        """Give back an admitted call that never reached the upstream, without judging it."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._counters["opened"] += 1
+
+    def _failure_ratio(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._calls.clear()
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            ratio = self._failure_ratio()
+            retry_in = max(self.open_sec - (time.monotonic() - self._opened_at), 0.0) if state == OPEN else 0.0
+            latency = self._latency_ewma_ms
+            # 1.0 is a healthy upstream; failures and latency close to the slow threshold pull it down
+            health = (1.0 - ratio) * (1.0 - min((latency or 0.0) / self.slow_call_ms, 1.0) / 2)
+            return {
+                "name": self.name,
+                "state": state,
+                "failure_rate": round(ratio, 3),
+                "window_calls": len(self._calls),
+                "avg_latency_ms": round(latency, 1) if latency is not None else None,
+                "health": round(health if state != OPEN else 0.0, 3),
+                "retry_in_sec": round(retry_in, 1),
+                **self._counters,
+            }
+
+
+class CircuitBreakers:
+    """Registry of breakers keyed by upstream name (``jsearch``, ``overpass``, ``feeds:<host>``)."""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    settings = get_settings()
+                    breaker = CircuitBreaker(
+                        name,
+                        window=settings.CIRCUIT_WINDOW,
+                        min_calls=settings.CIRCUIT_MIN_CALLS,
+                        failure_rate=settings.CIRCUIT_FAILURE_RATE,
+                        slow_call_ms=settings.CIRCUIT_SLOW_CALL_MS,
+                        open_sec=settings.CIRCUIT_OPEN_SEC,
+                    )
+                    self._breakers[name] = breaker
+        return breaker
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return sorted((b.snapshot() for b in list(self._breakers.values())), key=lambda s: s["name"])
+
+    def reset(self, name: Optional[str] = None) -> None:
+        for key, breaker in list(self._breakers.items()):
+            if name is None or key == name:
+                breaker.reset()
+
+
+breakers = CircuitBreakers()
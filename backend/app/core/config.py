@@ -46,6 +46,19 @@ class Settings(BaseSettings):
     SENTRY_TRACES_SAMPLE_RATE: float = 0.1
     SENTRY_PROFILES_SAMPLE_RATE: float = 0.0
 
+    # Outbound HTTP client pools (one per upstream, see core/http.py)
+    HTTP_POOL_MAX_CONNECTIONS: int = 100
+    HTTP_POOL_MAX_KEEPALIVE: int = 20
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = True
+
+    # Circuit breakers around upstreams (see core/circuit.py)
+    CIRCUIT_WINDOW: int = 20
+    CIRCUIT_MIN_CALLS: int = 5
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_SLOW_CALL_MS: float = 5000.0
+    CIRCUIT_OPEN_SEC: float = 30.0
+
     # Remote config
     REMOTE_FLAGS: dict = Field(default_factory=lambda: {"enableNewOnboarding": True})
 
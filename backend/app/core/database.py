@@ -3,7 +3,7 @@ from __future__ import annotations
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Table, create_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from .config import get_settings
@@ -40,3 +40,18 @@ def db_session() -> Generator[Session, None, None]:
         session.close()
 
 
+
+
+def upsert_insert(db: Session, table: Table):
+    """
+    INSERT construct that supports ``on_conflict_do_update``/``on_conflict_do_nothing``
+    on the session's dialect (PostgreSQL in production, SQLite locally).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"upsert is not supported on {dialect}")
+    return insert(table)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import importlib.util
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .config import get_settings
+
+
+# One keep-alive pool per upstream. Timeouts match what the call sites used before
+# they shared clients.
+UPSTREAMS: Dict[str, Dict[str, Any]] = {
+    "rapidapi": {"timeout": 15.0, "http2": True},
+    "rav": {"timeout": 15.0, "http2": True},
+    "overpass": {"timeout": 12.0, "http2": False},
+    "feeds": {
+        "timeout": 10.0,
+        "http2": True,
+        "follow_redirects": True,
+        "headers": {"User-Agent": "SweezyRSS/1.0 (+https://sweezy.onrender.com)"},
+    },
+    "telegram": {"timeout": 3.0, "http2": True},
+    # favorite liveness probes hit arbitrary job boards; they follow redirects
+    # themselves so every hop is checked for a public address
+    "postings": {
+        "timeout": 10.0,
+        "http2": False,
+        "follow_redirects": False,
+        "headers": {"User-Agent": "SweezyLinkCheck/1.0 (+https://sweezy.onrender.com)"},
+    },
+}
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClients:
+    """
+    Registry of pooled outbound clients keyed by upstream name.
+
+    Async clients are used by routers and async services; sync clients serve code
+    that still runs in the threadpool (manual feed imports). Clients are created lazily,
+    so the registry also works outside the FastAPI lifespan (scripts, tests).
+    A custom ``transport`` replaces the network for every client (tests, benchmarks).
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, sync_transport: Optional[httpx.BaseTransport] = None) -> None:
+        self._transport = transport
+        self._sync_transport = sync_transport
+        self._async: Dict[str, httpx.AsyncClient] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def _client_kwargs(self, name: str) -> Dict[str, Any]:
+        settings = get_settings()
+        conf = dict(UPSTREAMS.get(name) or {"timeout": 10.0})
+        http2 = bool(conf.pop("http2", False)) and settings.HTTP2_ENABLED and _http2_available()
+        return {
+            **conf,
+            "http2": http2,
+            "limits": httpx.Limits(
+                max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_POOL_KEEPALIVE_EXPIRY,
+            ),
+        }
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._async.get(name)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._async.get(name)
+                if client is None or client.is_closed:
+                    kwargs = self._client_kwargs(name)
+                    if self._transport is not None:
+                        kwargs["transport"] = self._transport
+                    client = httpx.AsyncClient(**kwargs)
+                    self._async[name] = client
+        return client
+
+    def get_sync(self, name: str) -> httpx.Client:
+        client = self._sync.get(name)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._sync.get(name)
+                if client is None or client.is_closed:
+                    kwargs = self._client_kwargs(name)
+                    if self._sync_transport is not None:
+                        kwargs["transport"] = self._sync_transport
+                    client = httpx.Client(**kwargs)
+                    self._sync[name] = client
+        return client
+
+    def open(self) -> None:
+        """Eagerly create the async client of every known upstream."""
+        for name in UPSTREAMS:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            async_clients = list(self._async.values())
+            sync_clients = list(self._sync.values())
+            self._async.clear()
+            self._sync.clear()
+        for client in async_clients:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+        for client in sync_clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+http_clients = HTTPClients()
+
+
+def get_http_clients() -> HTTPClients:
+    return http_clients
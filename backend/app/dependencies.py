@@ -7,6 +7,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from .core.database import get_db
+from .core.http import HTTPClients, get_http_clients
 from .core.security import decode_token
 from .services.users import UserService
 from datetime import datetime, timezone
@@ -29,6 +30,7 @@ def get_current_admin(
 
 CurrentAdmin = Annotated[Dict, Depends(get_current_admin)]
 DBSession = Annotated[Session, Depends(get_db)]
+HTTPClientsDep = Annotated[HTTPClients, Depends(get_http_clients)]
 
 
 def get_current_user(
@@ -3,11 +3,9 @@ from __future__ import annotations
 import asyncio
 from contextlib import asynccontextmanager
 import contextlib
-from typing import List
 import subprocess
 from pathlib import Path
 import os
-import time as _time
 
 import time
 import uuid
@@ -16,7 +14,9 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import get_settings
+from .core.http import http_clients
 from .core.sentry import init_sentry
+from .services.job_events import event_sink
 from .routers.auth import router as auth_router
 from .routers.guides import router as guides_router
 from .routers.checklists import router as checklists_router
@@ -43,42 +43,41 @@ except Exception as exc:
     raise
 
 
-async def _background_tick() -> None:
-    from .core.database import SessionLocal
-    from .models.rss_feed import RSSFeed
-    from .services.rss_importer import RSSImporter
-    interval = int(os.getenv("FEED_IMPORT_INTERVAL_SEC", "900"))
-    last_run = 0.0
-    while True:
-        await asyncio.sleep(60)
-        now = _time.monotonic()
-        if now - last_run < interval:
-            continue
-        last_run = now
-        try:
-            with SessionLocal() as db:
-                feeds: List[RSSFeed] = db.query(RSSFeed).filter(RSSFeed.enabled == True).all()  # noqa: E712
-                for f in feeds:
-                    try:
-                        RSSImporter.import_feed_record(db, f)
-                    except Exception:
-                        continue
-        except Exception:
-            # never break background loop
-            pass
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_sentry()
-    task = asyncio.create_task(_background_tick())
+    http_clients.open()
+    event_sink.start()
+    # every worker runs the feed scheduler; DB leases make each feed import run once
+    from .services.rss_engine import feed_engine
+    tasks = [asyncio.create_task(feed_engine.run_loop())]
+    # the job loops below run in every worker too; DB leases (services/loop_lease.py)
+    # make one worker do each loop's work, so provider calls don't multiply by workers
+    if os.getenv("JOBS_SUGGEST_ENABLED", "1") == "1":
+        from .services.job_suggest import suggester
+        tasks.append(asyncio.create_task(suggester.run_loop()))
+    if os.getenv("JOBS_LIVENESS_ENABLED", "0") == "1":
+        from .services.job_liveness import liveness_checker
+        tasks.append(asyncio.create_task(liveness_checker.run_loop()))
+    if os.getenv("JOBS_WARM_ENABLED", "0") == "1":
+        from .services.job_warmer import cache_warmer
+        tasks.append(asyncio.create_task(cache_warmer.run_loop()))
+    if os.getenv("JOBS_INGEST_ENABLED", "0") == "1":
+        from .services.job_index import ingest_loop
+        tasks.append(asyncio.create_task(ingest_loop()))
     try:
         yield
     finally:
-        task.cancel()
+        for task in tasks:
+            task.cancel()
         # Suppress task cancellation on shutdown to avoid noisy tracebacks
-        with contextlib.suppress(asyncio.CancelledError):
-            await task
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        # write the buffered search events before the process exits
+        await event_sink.aclose()
+        feed_engine.close()
+        await http_clients.aclose()
 
 
 app = FastAPI(
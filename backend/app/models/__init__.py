@@ -1,5 +1,5 @@
 from .guide import Guide
-from .job import JobFavorite, JobSearchEvent
+from .job import JobFavorite, JobSearchEvent, JobSearchRollup, JobProviderVariant, JobProviderBudget, JobPosting, JobIndexCoverage, JobLoopLease, JobSavedSearch, JobAlert
 from .checklist import Checklist
 from .template import Template
 from .appointment import Appointment
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, String, DateTime, func
+from sqlalchemy import Column, String, DateTime, Float, Integer, Index, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
 import uuid
@@ -20,6 +20,17 @@ class JobFavorite(Base):
     canton = Column(String, nullable=True)
     url = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # posting liveness, maintained by services/job_liveness.py
+    link_status = Column(String, nullable=True)  # live | dead; null until first checked
+    link_checked_at = Column(DateTime(timezone=True), nullable=True)
+    link_dead_since = Column(DateTime(timezone=True), nullable=True)
+    link_etag = Column(String, nullable=True)
+    link_last_modified = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_job_favorites_link_checked", "link_checked_at"),
+        Index("ix_job_favorites_url", "url"),
+    )
 
 
 class JobSearchEvent(Base):
@@ -29,4 +40,121 @@ class JobSearchEvent(Base):
     canton = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_job_search_events_created", "created_at"),
+    )
+
+
+
+
+class JobSearchRollup(Base):
+    """Search event counts per hour/day bucket (see services/job_rollups.py); ``canton`` is "" for none."""
+    __tablename__ = "job_search_rollups"
+    granularity = Column(String, primary_key=True)  # hour | day
+    bucket = Column(DateTime(timezone=False), primary_key=True)  # UTC start of the bucket
+    keyword = Column(String, primary_key=True)
+    canton = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_job_search_rollups_window", "granularity", "bucket"),
+    )
+
+
+class JobProviderVariant(Base):
+    """Learned health of one RapidAPI endpoint/param variant on a host (see services/provider_variants.py)."""
+    __tablename__ = "job_provider_variants"
+    host = Column(String, primary_key=True)
+    variant = Column(String, primary_key=True)
+    successes = Column(Float, nullable=False, default=0.0)  # exponentially decayed counts
+    failures = Column(Float, nullable=False, default=0.0)
+    avg_latency_ms = Column(Float, nullable=True)
+    last_success_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class JobProviderBudget(Base):
+    """Shared token bucket and monthly spend of a paid provider (see services/provider_budget.py)."""
+    __tablename__ = "job_provider_budgets"
+    name = Column(String, primary_key=True)
+    period = Column(String, nullable=False)  # YYYY-MM the counters belong to
+    spent = Column(Integer, nullable=False, default=0)
+    denied = Column(Integer, nullable=False, default=0)
+    tokens = Column(Float, nullable=False, default=0.0)
+    refilled_at = Column(DateTime(timezone=True), nullable=True)
+    version = Column(Integer, nullable=False, default=0)  # compare-and-swap guard between workers
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class JobPosting(Base):
+    """Locally indexed listing; ``id`` is the ``source:id`` key produced by the aggregator parsers."""
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True)
+    source = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    company = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    canton = Column(String, nullable=True)
+    url = Column(String, nullable=False)
+    posted_at = Column(DateTime(timezone=False), nullable=True)
+    employment_type = Column(String, nullable=True)
+    salary = Column(String, nullable=True)
+    snippet = Column(String, nullable=True)
+    first_seen_at = Column(DateTime(timezone=False), nullable=False)
+    last_seen_at = Column(DateTime(timezone=False), nullable=False)
+
+    __table_args__ = (
+        Index("ix_jobs_canton_posted", "canton", "posted_at"),
+        Index("ix_jobs_last_seen", "last_seen_at"),
+    )
+
+
+class JobIndexCoverage(Base):
+    """When the ingester last pulled a canton's newest listings into ``jobs`` (see services/job_index.py)."""
+    __tablename__ = "job_index_coverage"
+    canton = Column(String, primary_key=True)
+    ingested_at = Column(DateTime(timezone=False), nullable=False)
+    postings = Column(Integer, nullable=False, default=0)
+
+
+class JobLoopLease(Base):
+    """Which worker runs a background job loop (see services/loop_lease.py)."""
+    __tablename__ = "job_loop_leases"
+    name = Column(String, primary_key=True)
+    owner = Column(String(128), nullable=False)
+    expires_at = Column(DateTime(timezone=False), nullable=False)
+
+
+class JobSavedSearch(Base):
+    """A user's saved search; ``keyword`` is normalized like ``JobSearchEvent.keyword``."""
+    __tablename__ = "job_saved_searches"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    keyword = Column(String, nullable=False, default="")
+    canton = Column(String, nullable=True)
+    employment_type = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_matched_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class JobAlert(Base):
+    """A newly ingested posting that matched a saved search (see services/job_alerts.py)."""
+    __tablename__ = "job_alerts"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    saved_search_id = Column(UUID(as_uuid=True), nullable=False)
+    job_id = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    company = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    canton = Column(String, nullable=True)
+    url = Column(String, nullable=False)
+    posted_at = Column(DateTime(timezone=False), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    seen_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        UniqueConstraint("saved_search_id", "job_id", name="uq_job_alerts_search_job"),
+        Index("ix_job_alerts_user_created", "user_id", "created_at"),
+    )
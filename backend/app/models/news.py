@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, DateTime, Text
+from sqlalchemy import String, DateTime, Index, Text
 
 from ..core.database import Base
 
@@ -16,6 +16,8 @@ class News(Base):
     title: Mapped[str] = mapped_column(String(300), nullable=False)
     summary: Mapped[str] = mapped_column(Text, nullable=False, default="")
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # ETag of the page ``content`` was extracted from (RSS imports re-fetch conditionally)
+    content_etag: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
     url: Mapped[str] = mapped_column(String(500), nullable=False)
     source: Mapped[str] = mapped_column(String(120), nullable=False, default="Sweezy")
     language: Mapped[str] = mapped_column(String(8), nullable=False, default="uk")
@@ -25,4 +27,7 @@ class News(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=datetime.utcnow)
 
-
+    __table_args__ = (
+        # RSS imports upsert on it; translations may share their source's url
+        Index("uq_news_url_language", "url", "language", unique=True),
+    )
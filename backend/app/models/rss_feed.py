@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Boolean, DateTime, Integer
+from sqlalchemy import String, Boolean, DateTime, Index, Integer, Text
 
 from ..core.database import Base
 
@@ -19,8 +19,23 @@ class RSSFeed(Base):
     enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     max_items: Mapped[int] = mapped_column(Integer, nullable=False, default=20)
     download_images: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # fetch each item's page and store its main content in news.content
+    extract_full: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     last_imported_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
+    # validators and body fingerprint of the last fetch, for conditional polling
+    etag: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    # JSON list of (link, updated) fingerprints of the entries in the last fetched document
+    seen_entries: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # scheduling: adaptive interval, next due time and the worker currently importing it
+    poll_interval_sec: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    next_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=datetime.utcnow)
 
-
+    __table_args__ = (
+        Index("ix_rss_feeds_next_run", "enabled", "next_run_at"),
+    )
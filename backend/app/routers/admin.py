@@ -2,10 +2,9 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 import re
-import time
 from datetime import datetime
-from urllib.parse import urlparse, urljoin
 
+import anyio
 from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
@@ -16,16 +15,21 @@ from ..models.audit_log import AuditLog
 from ..models.news import News
 from ..schemas import GuideCreate, TemplateCreate, ChecklistCreate
 from ..core.config import get_settings
-from ..routers.media import UPLOAD_DIR
+from ..core.circuit import CircuitOpenError, breakers
 from ..models.rss_feed import RSSFeed
-from ..services.rss_importer import RSSImporter
+from ..services.rss_engine import FeedJob, feed_engine
+from ..services.image_pipeline import image_pipeline
+from ..services.jobs_cache import search_cache
+from ..services.provider_variants import variant_memory
+from ..services.provider_budget import rapidapi_budget
+from ..services.job_events import event_sink
+from ..services.job_liveness import liveness_checker
+from ..services.job_warmer import cache_warmer
 from ..models.subscription import Subscription, SubscriptionEvent
 from ..models.analytics import PaywallEvent
 from ..services import stripe_service
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import func
-import feedparser
-import httpx
 
 
 router = APIRouter()
@@ -331,6 +335,58 @@ def paywall_funnel(_: CurrentAdmin, db: DBSession, days: int = 30) -> Dict[str,
     top_contexts = [{"context": r[0] or "none", "count": int(r[1])} for r in contexts]
     return {"by_type": by_type, "top_contexts": top_contexts, "since": since.isoformat()}
 
+@router.get("/jobs/cache")
+def jobs_cache_stats(_: CurrentAdmin) -> Dict[str, Any]:
+    """Hit/miss/stale counters of the /jobs/search result cache."""
+    return search_cache.stats()
+
+
+@router.delete("/jobs/cache")
+def jobs_cache_flush(_: CurrentAdmin) -> Dict[str, Any]:
+    search_cache.clear()
+    return {"ok": True}
+
+@router.get("/feeds/engine")
+def feed_engine_stats(_: CurrentAdmin) -> Dict[str, Any]:
+    """Feeds imported and items created/updated by the RSS import engine, plus image pipeline counters."""
+    return {**feed_engine.stats(), "images": image_pipeline.stats()}
+
+@router.get("/jobs/warmer")
+def jobs_cache_warmer_stats(_: CurrentAdmin) -> Dict[str, Any]:
+    """Warmed/skipped counters of the popular-query cache warmer."""
+    return cache_warmer.stats()
+
+@router.get("/jobs/events")
+def jobs_event_sink_stats(_: CurrentAdmin) -> Dict[str, Any]:
+    """Buffered/written/dropped counters of the search analytics event writer."""
+    return event_sink.stats()
+
+@router.get("/jobs/liveness")
+def jobs_liveness_stats(_: CurrentAdmin) -> Dict[str, Any]:
+    """Probe counters of the favorites liveness checker."""
+    return liveness_checker.stats()
+
+@router.get("/jobs/variants")
+def jobs_provider_variants(_: CurrentAdmin) -> List[Dict[str, Any]]:
+    """Learned RapidAPI endpoint variants per host, best score first within a host."""
+    return variant_memory.snapshot()
+
+@router.get("/jobs/budget")
+def jobs_provider_budget(_: CurrentAdmin) -> Dict[str, Any]:
+    """RapidAPI spend this month, remaining quota, bucket level and this worker's grant/deny counters."""
+    return rapidapi_budget.snapshot()
+
+@router.get("/circuits")
+def circuit_breakers(_: CurrentAdmin) -> List[Dict[str, Any]]:
+    """State, failure rate, latency and health score of every upstream circuit breaker."""
+    return breakers.snapshot()
+
+@router.post("/circuits/reset")
+def circuit_breakers_reset(payload: Dict[str, Any], _: CurrentAdmin) -> Dict[str, Any]:
+    """Close one circuit (``{"name": "overpass"}``) or all of them (empty body)."""
+    breakers.reset(payload.get("name"))
+    return {"ok": True}
+
 @router.post("/import/news/rss")
 def import_news_rss(payload: Dict[str, Any], db: DBSession, _: CurrentAdmin) -> Dict[str, Any]:
     """
@@ -341,173 +397,34 @@ def import_news_rss(payload: Dict[str, Any], db: DBSession, _: CurrentAdmin) ->
       - status: 'draft'|'published' = 'draft'
       - max_items: int = 50
       - download_images: bool = True
-      - extract_full: bool = False (reserved)
+      - extract_full: bool = False (fetch each item's page and store its main content)
     """
     feed_url = payload.get("feed_url")
     if not feed_url:
         return {"created": 0, "updated": 0, "skipped": 0, "error": "feed_url is required"}
-    language = payload.get("language", "uk")
-    status = payload.get("status", "draft")
-    max_items = int(payload.get("max_items", 50))
-    download_images = bool(payload.get("download_images", True))
-
-    # Fetch feed with proper headers (some hosts block default user agents)
-    client = httpx.Client(timeout=10, follow_redirects=True, headers={
-        "User-Agent": "SweezyRSS/1.0 (+https://sweezy.onrender.com)"
-    })
+    job = FeedJob(
+        id="",
+        url=feed_url,
+        language=payload.get("language", "uk"),
+        status=payload.get("status", "draft"),
+        max_items=int(payload.get("max_items", 50)),
+        download_images=bool(payload.get("download_images", True)),
+        extract_full=bool(payload.get("extract_full", False)),
+    )
     try:
-        resp = client.get(feed_url)
-        text = resp.text if resp.status_code < 400 else ""
-    except Exception:
-        text = ""
-    parsed = feedparser.parse(text or feed_url)
-    # If no entries, try to discover <link rel="alternate" type="application/rss+xml|atom+xml">
-    if not getattr(parsed, "entries", None):
-        try:
-            html = text or ""
-            if not html:
-                html = client.get(feed_url).text
-            import re as _re
-            m = _re.search(r'<link[^>]+type="application/(?:rss|atom)\+xml"[^>]+href="([^"]+)"', html, flags=_re.I)
-            if m:
-                feed_href = m.group(1)
-                feed_abs = urljoin(feed_url, feed_href)
-                text2 = client.get(feed_abs).text
-                parsed = feedparser.parse(text2)
-        except Exception:
-            pass
-    created = updated = skipped = 0
-    src = parsed.feed.get("title") or (urlparse(feed_url).hostname or "RSS")
-
-    # If still no entries — treat the URL as single article page and import via OpenGraph
-    if not getattr(parsed, "entries", None):
-        try:
-            html = text or client.get(feed_url).text
-            import re as _re
-            def meta(prop=None, name=None):
-                if prop:
-                    m = _re.search(rf'<meta[^>]+property=["\']{_re.escape(prop)}["\'][^>]*content=["\']([^"\']+)["\']', html, flags=_re.I)
-                    if m: return m.group(1)
-                if name:
-                    m = _re.search(rf'<meta[^>]+name=["\']{_re.escape(name)}["\'][^>]*content=["\']([^"\']+)["\']', html, flags=_re.I)
-                    if m: return m.group(1)
-                return None
-            title = meta(prop="og:title") or meta(name="title")
-            if not title:
-                mtitle = _re.search(r'<title[^>]*>(.*?)</title>', html, flags=_re.I|_re.S)
-                title = (mtitle.group(1).strip() if mtitle else "Untitled")
-            desc = meta(prop="og:description") or meta(name="description") or ""
-            img = meta(prop="og:image") or meta(name="image")
-            pub = meta(prop="article:published_time") or meta(name="article:published_time")
-            pub_dt = datetime.utcnow()
-            try:
-                # try ISO-8601 (trim timezone if necessary)
-                p = pub.replace("Z","").split("+")[0] if pub else ""
-                if p:
-                    pub_dt = datetime.fromisoformat(p)
-            except Exception:
-                pass
-            image_url = None
-            if img:
-                image_url = img
-                if download_images:
-                    try:
-                        r = client.get(urljoin(feed_url, img))
-                        if r.status_code == 200:
-                            name = f"{__import__('uuid').uuid4()}.jpg"
-                            (UPLOAD_DIR / name).write_bytes(r.content)
-                            image_url = f"/media/{name}"
-                    except Exception:
-                        pass
-            data = {
-                "title": title.strip(),
-                "summary": desc.strip(),
-                "content": None,
-                "url": feed_url,
-                "source": src,
-                "language": language,
-                "status": status,
-                "published_at": pub_dt,
-                "image_url": image_url,
-            }
-            existing = db.query(News).filter(News.url == feed_url).first()
-            from ..services.news_service import NewsService as _NS
-            if existing:
-                _NS.update(db, existing, **data); updated += 1
-            else:
-                _NS.create(db, **data); created += 1
-        except Exception:
-            skipped += 1
-            client.close()
-            return {"created": created, "updated": updated, "skipped": skipped}
-
-    for entry in getattr(parsed, "entries", [])[:max_items]:
-        try:
-            url = entry.get("link")
-            if not url:
-                skipped += 1
-                continue
-            existing = db.query(News).filter(News.url == url).first()
-            title = (entry.get("title") or "Untitled").strip()
-            summary = entry.get("summary") or entry.get("description") or ""
-            # published
-            pub_dt = datetime.utcnow()
-            if entry.get("published_parsed"):
-                pub_dt = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-            # image
-            image_url = None
-            media = entry.get("media_content") or entry.get("enclosures") or []
-            if isinstance(media, list) and media:
-                m0 = media[0]
-                if isinstance(m0, dict):
-                    image_url = m0.get("url")
-            if not image_url and isinstance(summary, str):
-                import re as _re
-                m = _re.search(r'<img[^>]+src="([^"]+)"', summary)
-                if m:
-                    image_url = m.group(1)
-            # optionally download image
-            if download_images and image_url:
-                try:
-                    r = client.get(image_url)
-                    if r.status_code == 200:
-                        ext = ".jpg"
-                        name = f"{__import__('uuid').uuid4()}{ext}"
-                        (UPLOAD_DIR / name).write_bytes(r.content)
-                        image_url = f"/media/{name}"
-                except Exception:
-                    pass
-
-            data = {
-                "title": title,
-                "summary": summary,
-                "content": None,
-                "url": url,
-                "source": src,
-                "language": language,
-                "status": status,
-                "published_at": pub_dt,
-                "image_url": image_url,
-            }
-            if existing:
-                from ..services.news_service import NewsService as _NS
-                _NS.update(db, existing, **data)
-                updated += 1
-            else:
-                from ..services.news_service import NewsService as _NS
-                _NS.create(db, **data)
-                created += 1
-        except Exception:
-            skipped += 1
-            continue
-    client.close()
-    return {"created": created, "updated": updated, "skipped": skipped}
+        # same path as scheduled imports: async fetch, parse pool, image pipeline, bulk upsert
+        return anyio.from_thread.run(feed_engine.import_feed, job)
+    except CircuitOpenError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
 
 
 @router.post("/import/news")
 def import_news(payload: Dict[str, Any], db: DBSession, _: CurrentAdmin) -> Dict[str, Any]:
     items = payload.get("items") or []
     created = 0
+    # (url, language) is unique: skip items already stored or repeated in the payload
+    urls = [raw.get("url") for raw in items if isinstance(raw, dict) and raw.get("url")]
+    taken = set(db.query(News.url, News.language).filter(News.url.in_(urls)).all()) if urls else set()
     for raw in items:
         try:
             title = raw.get("title") or "Untitled"
@@ -517,8 +434,9 @@ def import_news(payload: Dict[str, Any], db: DBSession, _: CurrentAdmin) -> Dict
             language = raw.get("language") or "uk"
             published_at = raw.get("published_at") or raw.get("date") or None
             image_url = raw.get("image_url")
-            if not url:
+            if not url or (url, language) in taken:
                 continue
+            taken.add((url, language))
             obj = News(
                 id=str(__import__("uuid").uuid4()),
                 title=title,
@@ -547,7 +465,11 @@ def list_rss_feeds(_: CurrentAdmin, db: DBSession) -> List[Dict[str, Any]]:
         "enabled": bool(r.enabled),
         "max_items": r.max_items,
         "download_images": bool(r.download_images),
+        "extract_full": bool(r.extract_full),
         "last_imported_at": r.last_imported_at.isoformat() if r.last_imported_at else None,
+        "poll_interval_sec": r.poll_interval_sec,
+        "next_run_at": r.next_run_at.isoformat() if r.next_run_at else None,
+        "lease_owner": r.lease_owner,
     } for r in rows]
 
 @router.post("/rss-feeds")
@@ -560,6 +482,7 @@ def create_rss_feed(payload: Dict[str, Any], db: DBSession, _: CurrentAdmin) ->
         enabled=bool(payload.get("enabled", True)),
         max_items=int(payload.get("max_items", 20)),
         download_images=bool(payload.get("download_images", True)),
+        extract_full=bool(payload.get("extract_full", False)),
         created_at=__import__("datetime").datetime.utcnow(),
         updated_at=__import__("datetime").datetime.utcnow(),
     )
@@ -579,19 +502,28 @@ def run_rss_feed_import(feed_id: str, db: DBSession, _: CurrentAdmin) -> Dict[st
     r = db.query(RSSFeed).filter(RSSFeed.id == feed_id).first()
     if not r:
         raise HTTPException(status_code=404, detail="Not found")
-    return RSSImporter.import_feed_record(db, r)
+    try:
+        # runs on the event loop like the scheduled imports; this thread just waits
+        return anyio.from_thread.run(feed_engine.import_feed, FeedJob.of(r))
+    except CircuitOpenError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
 
 @router.patch("/rss-feeds/{feed_id}")
 def update_rss_feed(feed_id: str, payload: Dict[str, Any], db: DBSession, _: CurrentAdmin) -> Dict[str, Any]:
     r = db.query(RSSFeed).filter(RSSFeed.id == feed_id).first()
     if not r:
         raise HTTPException(status_code=404, detail="Not found")
+    if payload.get("url") and payload["url"] != r.url:
+        # validators, seen entries and the learned interval belong to the old URL; poll the new one next tick
+        r.etag = r.last_modified = r.content_hash = r.seen_entries = None
+        r.poll_interval_sec = r.next_run_at = None
     for k in ["url","language","status"]:
         if k in payload and payload[k] is not None:
             setattr(r, k, payload[k])
     if "enabled" in payload: r.enabled = bool(payload["enabled"])
     if "max_items" in payload: r.max_items = int(payload["max_items"])
     if "download_images" in payload: r.download_images = bool(payload["download_images"])
+    if "extract_full" in payload: r.extract_full = bool(payload["extract_full"])
     r.updated_at = __import__("datetime").datetime.utcnow()
     db.add(r); db.commit()
     return {"ok": True}
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, HTTPException, status
-from typing import List
+import json
+from fastapi import APIRouter, Body, Query, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_
+from typing import Any, Dict, List, Literal
 from datetime import datetime, timezone
 
-from ..dependencies import CurrentUser, DBSession
-from ..schemas.job import JobItem, JobSearchResponse, JobFavoriteIn, JobFavoriteOut, JobSearchEventOut
-from ..services.jobs_aggregator import search_jobs
-from ..models.job import JobFavorite, JobSearchEvent
+from ..dependencies import CurrentUser, DBSession, HTTPClientsDep
+from ..schemas.job import JobItem, JobSearchResponse, JobFavoriteIn, JobFavoriteOut, JobSearchEventIn, JobSearchEventOut, JobSuggestionOut, JobSavedSearchIn, JobSavedSearchOut, JobAlertOut
+from ..services.jobs_aggregator import search_jobs, search_jobs_page
+from ..services.jobs_cache import facets_key, partial_result_ttl, search_cache, search_key
+from ..services.job_index import indexed_search, indexed_stream
+from ..services.job_alerts import alert_matcher, normalize_keyword
+from ..services.job_events import event_sink
+from ..services.job_facets import facets_ttl, index_facets, results_facets
+from ..services.job_rollups import top_keywords as rollup_top_keywords
+from ..services.job_suggest import MAX_LIMIT as MAX_SUGGESTIONS, suggester
+from ..services.provider_budget import OK as BUDGET_OK, rapidapi_budget
+from ..models.job import JobAlert, JobFavorite, JobSavedSearch
 
 router = APIRouter()
 
@@ -27,42 +38,102 @@ def _is_premium(user) -> bool:
 
 
 @router.get("/search", response_model=JobSearchResponse)
-async def search(q: str | None = None, canton: str | None = None, page: int = 1, per_page: int = 20, debug: bool = False) -> JobSearchResponse:
-    items, sources, dbg = await search_jobs(q=q, canton=canton, page=page, per_page=per_page, debug=debug)
-    return JobSearchResponse(items=items, total=len(items), sources=sources, debug=dbg if debug else None)
+async def search(clients: HTTPClientsDep, q: str | None = None, canton: str | None = None, page: int = 1, per_page: int = 20, cursor: str | None = None, debug: bool = False, facets: bool = False) -> JobSearchResponse:
+    # `cursor` (from the previous response's next_cursor) replaces `page` for deep pagination
+    try:
+        if debug and page > 1 and not cursor:
+            # the live providers, uncached, addressed like indexed_search does
+            items, sources, dbg = await search_jobs(q=q, canton=canton, page=page, per_page=per_page, debug=True, clients=clients)
+            next_cursor = None
+        elif debug:
+            items, sources, dbg, next_cursor = await search_jobs_page(q=q, canton=canton, per_page=per_page, cursor=cursor, debug=True, clients=clients)
+        else:
+            items, sources, dbg, next_cursor = await search_cache.get_or_fetch(
+                search_key(q, canton, page, per_page, cursor),
+                lambda: indexed_search(q=q, canton=canton, page=page, per_page=per_page, cursor=cursor, clients=clients),
+                ttl_for=partial_result_ttl,
+                # spare the RapidAPI quota: stale results are good enough while it runs low
+                revalidate=rapidapi_budget.level() == BUDGET_OK,
+            )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    facet_summary = None
+    if facets:
+        # only index facets are shared by all pages; the fallback describes this page and isn't cached
+        facet_summary = await search_cache.get_or_fetch(facets_key(q, canton), lambda: index_facets(q, canton), ttl_for=facets_ttl)
+        if facet_summary is None:
+            facet_summary = results_facets(items)
+    return JobSearchResponse(items=items, total=len(items), sources=sources, next_cursor=next_cursor, debug=dbg if debug else None, facets=facet_summary)
+
+
+def _frame_bytes(frame: Dict[str, Any], sse: bool) -> bytes:
+    payload = dict(frame)
+    if "items" in payload:
+        payload["items"] = [it.model_dump(mode="json") for it in payload["items"]]
+    data = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    if sse:
+        return f"event: {frame['type']}\ndata: {data}\n\n".encode("utf-8")
+    return (data + "\n").encode("utf-8")
+
+
+@router.get("/search/stream")
+async def search_stream(request: Request, clients: HTTPClientsDep, q: str | None = None, canton: str | None = None, per_page: int = 20, format: str | None = Query(None, description="ndjson|sse; defaults from the Accept header")):
+    """
+    Streaming variant of /search: one ``items`` frame per provider as soon as it
+    answers, then a ``summary`` frame with ``sources``, the merged ``order`` and
+    ``next_cursor`` for /search.
+    """
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+
+    async def frames():
+        async for frame in indexed_stream(q=q, canton=canton, per_page=per_page, clients=clients):
+            yield _frame_bytes(frame, sse)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(frames(), media_type="text/event-stream" if sse else "application/x-ndjson", headers=headers)
+
+
+MAX_EVENTS_PER_REQUEST = 500
 
 
 @router.post("/analytics/events", status_code=status.HTTP_204_NO_CONTENT)
-def log_event(db: DBSession, keyword: str, canton: str | None = None):
-    try:
-        db.add(JobSearchEvent(keyword=keyword.strip().lower(), canton=canton))
-        db.commit()
-    except Exception:
-        db.rollback()
+async def log_event(keyword: str | None = None, canton: str | None = None, events: List[JobSearchEventIn] | None = Body(None)):
+    """
+    Record searches for analytics: one via ``keyword``/``canton`` query params, or a
+    JSON array of ``{"keyword", "canton"}`` (clients may batch what they collected).
+    Events are buffered and written in bulk by ``event_sink``.
+    """
+    batch = list(events or [])
+    if keyword is not None:
+        batch.append(JobSearchEventIn(keyword=keyword, canton=canton))
+    if not batch:
+        raise HTTPException(status_code=422, detail="No events")
+    if len(batch) > MAX_EVENTS_PER_REQUEST:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_EVENTS_PER_REQUEST} events per request")
+    event_sink.submit((normalize_keyword(e.keyword), e.canton) for e in batch)
     return
 
 
 @router.get("/analytics/top", response_model=List[JobSearchEventOut])
-def top_keywords(db: DBSession, limit: int = 10):
-    from sqlalchemy import func
-    rows = (
-        db.query(JobSearchEvent.keyword, JobSearchEvent.canton, func.count().label("count"))
-        .group_by(JobSearchEvent.keyword, JobSearchEvent.canton)
-        .order_by(func.count().desc())
-        .limit(limit)
-        .all()
-    )
-    return [JobSearchEventOut(keyword=r[0], canton=r[1], count=r[2]) for r in rows]
+def top_keywords(db: DBSession, limit: int = 10, window: Literal["24h", "7d", "30d"] = "7d"):
+    """Most searched keywords of the last 24 hours (hourly rollups) or 7/30 days (daily rollups)."""
+    rows = rollup_top_keywords(db, window, limit)
+    return [JobSearchEventOut(keyword=keyword, canton=canton, count=count) for keyword, canton, count in rows]
+
+
+@router.get("/suggest", response_model=List[JobSuggestionOut])
+def suggest(prefix: str, canton: str | None = None, limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS)):
+    """Popular search keywords starting with ``prefix``, served from memory (rebuilt in the background)."""
+    return [JobSuggestionOut(keyword=keyword, count=count) for keyword, count in suggester.suggest(prefix, canton, limit)]
 
 
 @router.get("/favorites", response_model=List[JobFavoriteOut])
-def list_favorites(user: CurrentUser, db: DBSession):
-    rows = (
-        db.query(JobFavorite)
-        .filter(JobFavorite.user_id == user.id)
-        .order_by(JobFavorite.created_at.desc())
-        .all()
-    )
+def list_favorites(user: CurrentUser, db: DBSession, hide_dead: bool = False):
+    # `link_status` flags postings that disappeared; hide_dead leaves them out
+    query = db.query(JobFavorite).filter(JobFavorite.user_id == user.id)
+    if hide_dead:
+        query = query.filter(or_(JobFavorite.link_status.is_(None), JobFavorite.link_status != "dead"))
+    rows = query.order_by(JobFavorite.created_at.desc()).all()
     return [
         JobFavoriteOut(
             id=str(r.id),
@@ -74,6 +145,8 @@ def list_favorites(user: CurrentUser, db: DBSession):
             canton=r.canton,
             url=r.url,
             created_at=r.created_at,
+            link_status=r.link_status,
+            link_checked_at=r.link_checked_at,
         )
         for r in rows
     ]
@@ -128,3 +201,83 @@ def remove_favorite(favorite_id: str, user: CurrentUser, db: DBSession):
     return
 
 
+def _saved_search_out(r: JobSavedSearch) -> JobSavedSearchOut:
+    return JobSavedSearchOut(
+        id=str(r.id),
+        keyword=r.keyword,
+        canton=r.canton,
+        employment_type=r.employment_type,
+        created_at=r.created_at,
+        last_matched_at=r.last_matched_at,
+    )
+
+
+@router.get("/saved-searches", response_model=List[JobSavedSearchOut])
+def list_saved_searches(user: CurrentUser, db: DBSession):
+    rows = (
+        db.query(JobSavedSearch)
+        .filter(JobSavedSearch.user_id == user.id)
+        .order_by(JobSavedSearch.created_at.desc())
+        .all()
+    )
+    return [_saved_search_out(r) for r in rows]
+
+
+@router.post("/saved-searches", response_model=JobSavedSearchOut, status_code=status.HTTP_201_CREATED)
+def add_saved_search(payload: JobSavedSearchIn, user: CurrentUser, db: DBSession):
+    keyword = normalize_keyword(payload.keyword)
+    canton = payload.canton.strip().upper() if payload.canton and payload.canton.strip() else None
+    if not keyword and not canton:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Saved search needs a keyword or a canton")
+    row = JobSavedSearch(user_id=user.id, keyword=keyword, canton=canton, employment_type=payload.employment_type or None)
+    db.add(row)
+    db.commit()
+    db.refresh(row)
+    alert_matcher.invalidate()
+    return _saved_search_out(row)
+
+
+@router.delete("/saved-searches/{saved_search_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_saved_search(saved_search_id: str, user: CurrentUser, db: DBSession):
+    row = db.query(JobSavedSearch).filter(JobSavedSearch.id == saved_search_id, JobSavedSearch.user_id == user.id).first()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Saved search not found")
+    db.query(JobAlert).filter(JobAlert.saved_search_id == row.id).delete(synchronize_session=False)
+    db.delete(row)
+    db.commit()
+    alert_matcher.invalidate()
+    return
+
+
+@router.get("/alerts", response_model=List[JobAlertOut])
+def list_alerts(user: CurrentUser, db: DBSession, unseen_only: bool = False, limit: int = Query(50, le=200)):
+    query = db.query(JobAlert).filter(JobAlert.user_id == user.id)
+    if unseen_only:
+        query = query.filter(JobAlert.seen_at.is_(None))
+    rows = query.order_by(JobAlert.created_at.desc()).limit(limit).all()
+    return [
+        JobAlertOut(
+            id=str(r.id),
+            saved_search_id=str(r.saved_search_id),
+            job_id=r.job_id,
+            source=r.source,
+            title=r.title,
+            company=r.company,
+            location=r.location,
+            canton=r.canton,
+            url=r.url,
+            posted_at=r.posted_at,
+            created_at=r.created_at,
+            seen=r.seen_at is not None,
+        )
+        for r in rows
+    ]
+
+
+@router.post("/alerts/seen", status_code=status.HTTP_204_NO_CONTENT)
+def mark_alerts_seen(user: CurrentUser, db: DBSession):
+    db.query(JobAlert).filter(JobAlert.user_id == user.id, JobAlert.seen_at.is_(None)).update(
+        {JobAlert.seen_at: datetime.now(timezone.utc)}, synchronize_session=False
+    )
+    db.commit()
+    return
@@ -3,11 +3,15 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Tuple
 from hashlib import sha1
+import time
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
 import httpx
 
+from ..core.circuit import breakers
+from ..dependencies import HTTPClientsDep
+
 router = APIRouter()
 
 
@@ -45,7 +49,7 @@ async def _mock_provider(category: Optional[str]) -> PlaceLiveStatus:
     return PlaceLiveStatus(wait_minutes=minutes, busy_level=level, updated_at=now, provider="mock")
 
 
-async def _overpass_hours(lat: Optional[float], lng: Optional[float], name: Optional[str]) -> Optional[str]:
+async def _overpass_hours(client: httpx.AsyncClient, lat: Optional[float], lng: Optional[float], name: Optional[str]) -> Optional[str]:
     if lat is None or lng is None:
         return None
     # Overpass QL query to find nearby element with matching name and opening_hours tag
@@ -60,24 +64,40 @@ async def _overpass_hours(lat: Optional[float], lng: Optional[float], name: Opti
         );
         out tags center 10;
     """
+    # Overpass is often overloaded; an open circuit skips it instead of waiting for the timeout
+    breaker = breakers.get("overpass")
+    if not breaker.allow():
+        return None
+    started = time.perf_counter()
+    judged = False
     try:
-        async with httpx.AsyncClient(timeout=12) as client:
-            r = await client.post("https://overpass-api.de/api/interpreter", data=q)
-            if r.status_code >= 400:
-                return None
-            data = r.json()
-            elements = data.get("elements") or []
-            for el in elements:
-                tags = el.get("tags") or {}
-                if "opening_hours" in tags:
-                    return tags["opening_hours"]
+        r = await client.post("https://overpass-api.de/api/interpreter", data=q)
+        judged = True
+        breaker.record(r.status_code < 400, (time.perf_counter() - started) * 1000)
+        if r.status_code >= 400:
+            return None
+        data = r.json()
+        elements = data.get("elements") or []
+        for el in elements:
+            tags = el.get("tags") or {}
+            if "opening_hours" in tags:
+                return tags["opening_hours"]
+    except httpx.HTTPError:
+        judged = True
+        breaker.record(False, (time.perf_counter() - started) * 1000)
+        return None
     except Exception:
         return None
+    finally:
+        if not judged:
+            # cancelled (the client went away) before Overpass answered: free a half-open trial
+            breaker.release()
     return None
 
 
 @router.get("/place-status", response_model=PlaceLiveStatus)
 async def place_status(
+    clients: HTTPClientsDep,
     name: str,
     category: Optional[str] = Query(None, description="place category, e.g. migration_office"),
     canton: Optional[str] = None,
@@ -98,7 +118,7 @@ async def place_status(
     # Placeholder for future real providers; currently mock
     status = await _mock_provider(category)
     # Augment with opening hours from OpenStreetMap Overpass if available
-    hours = await _overpass_hours(lat, lng, name)
+    hours = await _overpass_hours(clients.get("overpass"), lat, lng, name)
     if hours:
         status.hours_text = hours
         status.provider = status.provider + "+overpass"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from ..schemas.news import NewsOut, NewsCreate, NewsUpdate
 from ..services.news_service import NewsService
@@ -21,14 +22,22 @@ def get_news(news_id: str, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=NewsOut)
 def create_news(payload: NewsCreate, _: CurrentAdmin, db: Session = Depends(get_db)):
-  return NewsService.create(db, **payload.model_dump())
+  try:
+    return NewsService.create(db, **payload.model_dump())
+  except IntegrityError:
+    db.rollback()
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="News with this url already exists in this language")
 
 @router.put("/{news_id}", response_model=NewsOut)
 def update_news(news_id: str, payload: NewsUpdate, _: CurrentAdmin, db: Session = Depends(get_db)):
   news = NewsService.get(db, news_id)
   if not news:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="News not found")
-  return NewsService.update(db, news, **payload.model_dump(exclude_unset=True))
+  try:
+    return NewsService.update(db, news, **payload.model_dump(exclude_unset=True))
+  except IntegrityError:
+    db.rollback()
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="News with this url already exists in this language")
 
 @router.delete("/{news_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_news(news_id: str, _: CurrentAdmin, db: Session = Depends(get_db)):
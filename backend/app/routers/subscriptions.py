@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from ..dependencies import DBSession, CurrentUser
+from ..dependencies import DBSession, CurrentUser, HTTPClientsDep
 from ..models.user import User
 from ..models.subscription import Subscription, SubscriptionEvent
 from ..services import stripe_service
@@ -112,15 +112,13 @@ def create_referral_code(user: CurrentUser) -> ReferralOut:
 
 
 @router.post("/stripe/webhook", status_code=200)
-async def stripe_webhook(request: Request, db: DBSession):
+async def stripe_webhook(request: Request, db: DBSession, clients: HTTPClientsDep):
     payload = await request.body()
     sig = request.headers.get("stripe-signature")
     secret = os.getenv("STRIPE_WEBHOOK_SECRET")
     if not secret:
         raise HTTPException(status_code=500, detail="Webhook not configured")
     import stripe  # type: ignore
-    import urllib.request
-    import json as _json
 
     try:
         event = stripe.Webhook.construct_event(payload=payload, sig_header=sig, secret=secret)  # type: ignore
@@ -144,16 +142,14 @@ async def stripe_webhook(request: Request, db: DBSession):
     stripe_service.log_event(db, user.id if user else None, event_type, json.loads(payload.decode("utf-8")))
 
     # Optional Telegram notification (only for key events)
-    def _notify_telegram(text: str) -> None:
+    async def _notify_telegram(text: str) -> None:
         token = os.getenv("TELEGRAM_BOT_TOKEN")
         chat_id = os.getenv("TELEGRAM_CHAT_ID")
         if not token or not chat_id:
             return
         try:
             url = f"https://api.telegram.org/bot{token}/sendMessage"
-            data = _json.dumps({"chat_id": chat_id, "text": text}).encode("utf-8")
-            req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
-            urllib.request.urlopen(req, timeout=3)  # nosec B310
+            await clients.get("telegram").post(url, json={"chat_id": chat_id, "text": text})
         except Exception:
             pass
 
@@ -178,13 +174,13 @@ async def stripe_webhook(request: Request, db: DBSession):
         except Exception:
             period_end = None
         stripe_service.apply_premium(db, user, subscription_id=str(subscription_id), current_period_end=period_end)
-        _notify_telegram(f"✅ Subscription active for {user.email} (until {period_end.isoformat() if period_end else 'n/a'})")
+        await _notify_telegram(f"✅ Subscription active for {user.email} (until {period_end.isoformat() if period_end else 'n/a'})")
         return {"ok": True}
 
     if event_type in {"customer.subscription.deleted"}:
         if user:
             stripe_service.apply_free(db, user)
-            _notify_telegram(f"⚠️ Subscription canceled for {user.email}")
+            await _notify_telegram(f"⚠️ Subscription canceled for {user.email}")
         return {"ok": True}
 
     return {"ok": True}
@@ -17,13 +17,40 @@ class JobItem(BaseModel):
     employment_type: Optional[str] = None
     salary: Optional[str] = None
     snippet: Optional[str] = None
+    sources: List[str] = Field(default_factory=list, description="providers that returned this posting")
+
+
+class JobFacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class JobSalaryStats(BaseModel):
+    count: int = Field(description="postings with a readable salary")
+    min: int
+    max: int
+    mean: int
+    p10: int
+    p25: int
+    p50: int
+    p75: int
+    p90: int
+
+
+class JobFacets(BaseModel):
+    basis: str = Field(description="index: every indexed posting matching the search; results: only the returned page (cold index)")
+    matched: int
+    counts: Dict[str, List[JobFacetCount]] = Field(default_factory=dict, description="top values per field: canton, employment_type, company, source")
+    salary: Optional[JobSalaryStats] = Field(default=None, description="annual CHF, from range midpoints; hourly and monthly salaries are annualized")
 
 
 class JobSearchResponse(BaseModel):
     items: List[JobItem]
     total: int
-    sources: Dict[str, int] = {}
+    sources: Dict[str, int] = Field(default_factory=dict, description="item count per provider; -1 failed, -2 timed out, -3 skipped (circuit open), -4 over the RapidAPI budget")
+    next_cursor: Optional[str] = Field(default=None, description="pass as ``cursor`` to get the next page; null on the last page")
     debug: Optional[Dict[str, Any]] = None
+    facets: Optional[JobFacets] = None
 
 
 class JobFavoriteIn(BaseModel):
@@ -46,6 +73,13 @@ class JobFavoriteOut(BaseModel):
     canton: Optional[str] = None
     url: str
     created_at: datetime
+    link_status: Optional[str] = Field(default=None, description="live or dead; null until the posting was checked")
+    link_checked_at: Optional[datetime] = None
+
+
+class JobSearchEventIn(BaseModel):
+    keyword: str
+    canton: Optional[str] = None
 
 
 class JobSearchEventOut(BaseModel):
@@ -54,3 +88,38 @@ class JobSearchEventOut(BaseModel):
     count: int
 
 
+
+
+class JobSuggestionOut(BaseModel):
+    keyword: str
+    count: int = Field(description="searches in the suggestion window")
+
+
+class JobSavedSearchIn(BaseModel):
+    keyword: str = ""
+    canton: Optional[str] = None
+    employment_type: Optional[str] = None
+
+
+class JobSavedSearchOut(BaseModel):
+    id: str
+    keyword: str
+    canton: Optional[str] = None
+    employment_type: Optional[str] = None
+    created_at: datetime
+    last_matched_at: Optional[datetime] = None
+
+
+class JobAlertOut(BaseModel):
+    id: str
+    saved_search_id: str
+    job_id: str
+    source: str
+    title: str
+    company: Optional[str] = None
+    location: Optional[str] = None
+    canton: Optional[str] = None
+    url: str
+    posted_at: Optional[datetime] = None
+    created_at: datetime
+    seen: bool
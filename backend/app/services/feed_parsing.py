@@ -0,0 +1,303 @@
+"""
+Pure, CPU-bound parts of the RSS import. Runs in worker processes, so it must
+not touch the database or the network and only returns plain (picklable) data.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from datetime import datetime
+from html import escape
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urljoin, urlparse
+
+import feedparser
+
+
+_ALTERNATE_RE = re.compile(r'<link[^>]+type="application/(?:rss|atom)\+xml"[^>]+href="([^"]+)"', re.I)
+_IMG_RE = re.compile(r'<img[^>]+src="([^"]+)"')
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+
+
+def _meta(html: str, prop: Optional[str] = None, name: Optional[str] = None) -> Optional[str]:
+    for attr, value in (("property", prop), ("name", name)):
+        if value:
+            m = re.search(rf'<meta[^>]+{attr}=["\']{re.escape(value)}["\'][^>]*content=["\']([^"\']+)["\']', html, flags=re.I)
+            if m:
+                return m.group(1)
+    return None
+
+
+def _entry_image(entry: Dict[str, Any], summary: Any) -> Optional[str]:
+    media = entry.get("media_content") or entry.get("enclosures") or []
+    if isinstance(media, list) and media and isinstance(media[0], dict) and media[0].get("url"):
+        return media[0]["url"]
+    if isinstance(summary, str):
+        m = _IMG_RE.search(summary)
+        if m:
+            return m.group(1)
+    return None
+
+
+def entry_fingerprint(link: str, updated: str) -> str:
+    """Short stable id of an entry's ``(link, updated)`` pair; changes when the entry is edited."""
+    return hashlib.sha1(f"{link}\n{updated}".encode("utf-8")).hexdigest()[:16]
+
+
+def parse_article(html: str, page_url: str) -> Optional[Dict[str, Any]]:
+    """A single news item from a web page's OpenGraph tags (for URLs that are not feeds)."""
+    if not html:
+        return None
+    title = _meta(html, prop="og:title", name="title")
+    if not title:
+        m = _TITLE_RE.search(html)
+        title = m.group(1).strip() if m else "Untitled"
+    published_at = datetime.utcnow()
+    pub = _meta(html, prop="article:published_time", name="article:published_time")
+    try:
+        p = pub.replace("Z", "").split("+")[0] if pub else ""
+        if p:
+            published_at = datetime.fromisoformat(p)
+    except Exception:
+        pass
+    img = _meta(html, prop="og:image", name="image")
+    return {
+        "url": page_url,
+        "fingerprint": None,
+        "title": title.strip(),
+        "summary": (_meta(html, prop="og:description", name="description") or "").strip(),
+        "published_at": published_at,
+        "image_url": urljoin(page_url, img) if img else None,
+    }
+
+
+def parse_feed(text: str, feed_url: str, max_items: int) -> Dict[str, Any]:
+    """
+    ``{"source", "feed", "entries", "published", "alternate"}`` for a fetched document. When it
+    is not a feed (``feed`` false), ``alternate`` is the feed an HTML page advertises
+    (to be fetched and parsed next) and ``entries`` holds the page itself as one
+    article. Entries without a link are kept as ``{"url": None}`` (counted as skipped);
+    feed entries carry the ``fingerprint`` of their ``(link, updated)`` pair.
+    ``published`` lists the dates the entries actually state (for the poll interval).
+    """
+    parsed = feedparser.parse(text or "")
+    feed = getattr(parsed, "feed", None)
+    source = (feed.get("title") if feed else None) or urlparse(feed_url).hostname or "RSS"
+    raw = getattr(parsed, "entries", None) or []
+    if not raw:
+        m = _ALTERNATE_RE.search(text) if text else None
+        article = parse_article(text, feed_url)
+        return {
+            "source": source,
+            "feed": False,
+            "entries": [article] if article else [],
+            "published": [],
+            "alternate": urljoin(feed_url, m.group(1)) if m else None,
+        }
+    entries: List[Dict[str, Any]] = []
+    published: List[datetime] = []
+    for entry in raw[:max_items]:
+        url = entry.get("link")
+        if not url:
+            entries.append({"url": None})
+            continue
+        summary = entry.get("summary") or entry.get("description") or ""
+        published_at = datetime.utcnow()
+        if entry.get("published_parsed"):
+            published_at = datetime.fromtimestamp(time.mktime(entry.published_parsed))
+            published.append(published_at)
+        entries.append({
+            "url": url,
+            # dict.get: FeedParserDict maps a missing "updated" to "published" with a DeprecationWarning
+            "fingerprint": entry_fingerprint(url, dict.get(entry, "updated") or entry.get("published") or ""),
+            "title": (entry.get("title") or "Untitled").strip(),
+            "summary": summary,
+            "published_at": published_at,
+            "image_url": _entry_image(entry, summary),
+        })
+    return {"source": source, "feed": True, "entries": entries, "published": published, "alternate": None}
+
+
+# --- full-article extraction -------------------------------------------------
+
+# subtrees that never hold the article
+_DROP = {"script", "style", "noscript", "template", "svg", "iframe", "form", "nav", "header", "footer", "aside", "button", "select"}
+_VOID = {"br", "img", "hr", "meta", "link", "input", "source", "wbr", "area", "col", "embed", "param", "track"}
+# what sanitized content may contain; every other tag is unwrapped (its text kept)
+_ALLOWED = {"p", "h2", "h3", "h4", "ul", "ol", "li", "blockquote", "pre", "code", "em", "strong", "b", "i", "a", "img", "br", "figure", "figcaption"}
+_BLOCK = {"p", "div", "section", "article", "main", "ul", "ol", "li", "blockquote", "pre", "table", "figure", "h1", "h2", "h3", "h4", "h5", "h6"}
+_POSITIVE_RE = re.compile(r"article|body|content|entry|main|post|story|text", re.I)
+_NEGATIVE_RE = re.compile(r"comment|footer|sidebar|share|social|related|promo|advert|banner|menu|nav|cookie|subscribe", re.I)
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["_Node"]) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Union["_Node", str]] = []
+        self.parent = parent
+
+    def text(self) -> str:
+        return "".join(c if isinstance(c, str) else c.text() for c in self.children)
+
+    def link_text(self) -> str:
+        if self.tag == "a":
+            return self.text()
+        return "".join(c.link_text() for c in self.children if isinstance(c, _Node))
+
+    def iter(self):
+        yield self
+        for c in self.children:
+            if isinstance(c, _Node):
+                yield from c.iter()
+
+
+class _TreeBuilder(HTMLParser):
+    """Forgiving HTML -> ``_Node`` tree; boilerplate subtrees (``_DROP``) are left out."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = _Node("#root", {}, None)
+        self._open = self.root
+        self._dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._dropping:
+            if tag in _DROP:
+                self._dropping += 1
+            return
+        if tag in _DROP:
+            self._dropping = 1
+            return
+        if tag in _BLOCK and self._open.tag == "p":
+            # <p> closes implicitly at the next block
+            self._open = self._open.parent
+        node = _Node(tag, {k: v or "" for k, v in attrs}, self._open)
+        self._open.children.append(node)
+        if tag not in _VOID:
+            self._open = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID and not self._dropping and self._open.tag == tag:
+            self._open = self._open.parent
+
+    def handle_endtag(self, tag):
+        if self._dropping:
+            if tag in _DROP:
+                self._dropping -= 1
+            return
+        node = self._open
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            # closes whatever was left open inside it
+            self._open = node.parent
+
+    def handle_data(self, data):
+        if not self._dropping:
+            self._open.children.append(data)
+
+
+def _class_weight(node: _Node) -> int:
+    names = f"{node.attrs.get('class', '')} {node.attrs.get('id', '')}"
+    weight = 0
+    if _NEGATIVE_RE.search(names):
+        weight -= 25
+    if _POSITIVE_RE.search(names):
+        weight += 25
+    return weight
+
+
+def _main_node(root: _Node) -> Optional[_Node]:
+    """
+    Readability-style pick of the main content: every paragraph scores its parent
+    (fully) and grandparent (half) by length and commas; class/id names and link
+    density adjust the candidates.
+    """
+    scores: Dict[int, float] = {}
+    nodes: Dict[int, _Node] = {}
+    for p in root.iter():
+        if p.tag not in ("p", "pre", "blockquote"):
+            continue
+        text = p.text().strip()
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        for ancestor, share in ((p.parent, 1.0), (p.parent.parent if p.parent else None, 0.5)):
+            if ancestor is None or ancestor is root:
+                continue
+            key = id(ancestor)
+            if key not in scores:
+                nodes[key] = ancestor
+                scores[key] = _class_weight(ancestor)
+            scores[key] += score * share
+    best: Optional[_Node] = None
+    best_score = 0.0
+    for key, score in scores.items():
+        node = nodes[key]
+        text = node.text()
+        link_density = len(node.link_text()) / len(text) if text else 1.0
+        score *= 1 - link_density
+        if score > best_score:
+            best, best_score = node, score
+    return best
+
+
+def _render(node: _Node, base_url: str, out: List[str]) -> None:
+    for child in node.children:
+        if isinstance(child, str):
+            out.append(escape(child, quote=False))
+            continue
+        tag = child.tag
+        if tag not in _ALLOWED:
+            _render(child, base_url, out)
+            continue
+        attrs = ""
+        if tag in ("a", "img"):
+            name = "href" if tag == "a" else "src"
+            url = urljoin(base_url, child.attrs.get(name, "").strip())
+            if urlparse(url).scheme not in ("http", "https"):
+                # javascript:, data: and other schemes are dropped; a link keeps its text
+                if tag == "img":
+                    continue
+                _render(child, base_url, out)
+                continue
+            attrs = f' {name}="{escape(url)}"'
+            if tag == "img" and child.attrs.get("alt"):
+                attrs += f' alt="{escape(child.attrs["alt"])}"'
+        if tag in _VOID:
+            out.append(f"<{tag}{attrs}>")
+            continue
+        out.append(f"<{tag}{attrs}>")
+        _render(child, base_url, out)
+        out.append(f"</{tag}>")
+
+
+def extract_content(html: str, page_url: str, min_chars: int = 200) -> Optional[str]:
+    """
+    Main content of an article page as sanitized HTML: the best-scoring block
+    (see ``_main_node``) with only ``_ALLOWED`` tags, no attributes but absolute
+    http(s) ``href``/``src`` (and ``alt``). None when no block has ``min_chars``
+    of text.
+    """
+    if not html:
+        return None
+    builder = _TreeBuilder()
+    try:
+        builder.feed(html)
+        builder.close()
+    except Exception:
+        return None
+    node = _main_node(builder.root)
+    if node is None or len(node.text().strip()) < min_chars:
+        return None
+    out: List[str] = []
+    _render(node, page_url, out)
+    content = re.sub(r"\n\s*\n+", "\n", "".join(out)).strip()
+    return content or None
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+from ..routers.media import UPLOAD_DIR
+
+
+# magic bytes -> extension; checked before Content-Type, which hosts often get wrong
+_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+_CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+}
+
+
+def sniff_extension(head: bytes, content_type: Optional[str]) -> Optional[str]:
+    """File extension of an image from its first bytes, else its Content-Type; None for non-images."""
+    for signature, ext in _SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return ".avif"
+    mime = (content_type or "").split(";")[0].strip().lower()
+    return _CONTENT_TYPES.get(mime)
+
+
+class ImagePipeline:
+    """
+    Downloads feed images into ``UPLOAD_DIR``.
+
+    Bodies are streamed to a temporary file in ``chunk_size`` pieces and hashed on
+    the way; a download is abandoned once it passes ``max_bytes`` (or announces more
+    in Content-Length). Files are named after their SHA-256, so an image shared by
+    many articles is stored once, with the extension taken from the magic bytes (or
+    Content-Type); responses that aren't images are dropped. At most
+    ``concurrency`` downloads run at once, concurrent requests for the same URL
+    share one download, and the last ``remember`` URLs are answered from memory.
+    """
+
+    def __init__(self, concurrency: int, max_bytes: int, chunk_size: int = 64 * 1024, remember: int = 4096) -> None:
+        self.concurrency = concurrency
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.remember = remember
+        self._gate: Optional[asyncio.Semaphore] = None
+        self._gate_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._known: "OrderedDict[str, str]" = OrderedDict()
+        self._counters: Dict[str, int] = {"downloads": 0, "stored": 0, "deduplicated": 0, "remembered": 0, "too_large": 0, "not_image": 0, "errors": 0}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._gate is None or self._gate_loop is not loop:
+            self._gate = asyncio.Semaphore(self.concurrency)
+            self._gate_loop = loop
+        return self._gate
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """``/media/<sha256>.<ext>`` for the image at ``url``; None when it couldn't be stored."""
+        known = self._known.get(url)
+        if known is not None:
+            self._known.move_to_end(url)
+            self._counters["remembered"] += 1
+            return known
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._download(client, url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _download(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        directory = UPLOAD_DIR
+        tmp = directory / f".{uuid.uuid4().hex}.part"
+        async with self._semaphore():
+            self._counters["downloads"] += 1
+            try:
+                path = await self._stream(client, url, directory, tmp)
+            except Exception:
+                self._counters["errors"] += 1
+                path = None
+            finally:
+                await asyncio.to_thread(tmp.unlink, missing_ok=True)
+        if path is not None:
+            self._known[url] = path
+            while len(self._known) > self.remember:
+                self._known.popitem(last=False)
+        return path
+
+    async def _stream(self, client: httpx.AsyncClient, url: str, directory: Path, tmp: Path) -> Optional[str]:
+        digest = hashlib.sha256()
+        size = 0
+        ext: Optional[str] = None
+        async with client.stream("GET", url) as r:
+            if r.status_code != 200:
+                self._counters["errors"] += 1
+                return None
+            declared = r.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                self._counters["too_large"] += 1
+                return None
+            fh = await asyncio.to_thread(open, tmp, "wb")
+            try:
+                async for chunk in r.aiter_bytes(self.chunk_size):
+                    if ext is None:
+                        ext = sniff_extension(chunk, r.headers.get("content-type"))
+                        if ext is None:
+                            self._counters["not_image"] += 1
+                            return None
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        self._counters["too_large"] += 1
+                        return None
+                    digest.update(chunk)
+                    await asyncio.to_thread(fh.write, chunk)
+            finally:
+                await asyncio.to_thread(fh.close)
+        if ext is None:
+            # empty body
+            self._counters["not_image"] += 1
+            return None
+        name = f"{digest.hexdigest()}{ext}"
+        target = directory / name
+        try:
+            # link fails if the file exists, so concurrent downloads of one image can't both store it
+            await asyncio.to_thread(os.link, tmp, target)
+            self._counters["stored"] += 1
+        except FileExistsError:
+            self._counters["deduplicated"] += 1
+        return f"/media/{name}"
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "remembered_urls": len(self._known), "inflight": len(self._inflight)}
+
+
+image_pipeline = ImagePipeline(
+    concurrency=int(os.getenv("FEED_IMAGE_CONCURRENCY", "8")),
+    max_bytes=int(os.getenv("FEED_IMAGE_MAX_BYTES", str(5 * 1024 * 1024))),
+)
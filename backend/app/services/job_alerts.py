@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.database import upsert_insert
+from ..models.job import JobAlert, JobSavedSearch
+from ..schemas.job import JobItem
+from .job_dedup import tokenize
+
+
+ANY_CANTON = "*"
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+
+
+def normalize_keyword(keyword: Optional[str]) -> str:
+    """Same normalization as the search analytics events (``JobSearchEvent.keyword``)."""
+    return (keyword or "").strip().lower()
+
+
+def _employment_key(value: Optional[str]) -> str:
+    # FULLTIME / FULL_TIME / full-time are the same thing across providers
+    return _NON_ALNUM_RE.sub("", (value or "").lower())
+
+
+@dataclass(frozen=True)
+class SavedSearchSpec:
+    id: str
+    user_id: str
+    terms: FrozenSet[str]
+    canton: Optional[str] = None
+    employment_type: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, id: object, user_id: object, keyword: str, canton: Optional[str], employment_type: Optional[str]) -> "SavedSearchSpec":
+        return cls(
+            id=str(id),
+            user_id=str(user_id),
+            terms=frozenset(tokenize(keyword)),
+            canton=canton.upper() if canton else None,
+            employment_type=_employment_key(employment_type) or None,
+        )
+
+
+class AlertMatcher:
+    """
+    Inverted index over saved searches, matched against batches of new postings.
+
+    Each search is posted once, under its rarest term (by frequency across all saved
+    searches) and its canton, or ``*`` when it has none. Searches without a keyword are
+    posted under the empty term. A job looks up one posting list per distinct token,
+    for its own canton and for ``*``, and checks only those candidates for the other
+    terms and the employment type. So the work per job depends on its tokens and on
+    how many searches share their rarest term, not on the total number of searches.
+    """
+
+    def __init__(self, searches: Iterable[SavedSearchSpec]) -> None:
+        searches = list(searches)
+        frequency = Counter(t for s in searches for t in s.terms)
+        self._postings: Dict[Tuple[str, str], List[SavedSearchSpec]] = defaultdict(list)
+        for spec in searches:
+            anchor = min(spec.terms, key=lambda t: (frequency[t], t)) if spec.terms else ""
+            self._postings[(anchor, spec.canton or ANY_CANTON)].append(spec)
+        self.size = len(searches)
+
+    def match_item(self, item: JobItem) -> List[SavedSearchSpec]:
+        tokens = set(tokenize(" ".join(filter(None, [item.title, item.company, item.location, item.snippet]))))
+        cantons = (item.canton.upper(), ANY_CANTON) if item.canton else (ANY_CANTON,)
+        employment = _employment_key(item.employment_type)
+        matched = []
+        for token in (*tokens, ""):
+            for canton in cantons:
+                for spec in self._postings.get((token, canton), ()):
+                    if spec.employment_type and spec.employment_type != employment:
+                        continue
+                    if spec.terms <= tokens:
+                        matched.append(spec)
+        return matched
+
+    def match(self, items: Iterable[JobItem]) -> Dict[str, Tuple[SavedSearchSpec, List[JobItem]]]:
+        """Matches of a batch, grouped by saved search id."""
+        out: Dict[str, Tuple[SavedSearchSpec, List[JobItem]]] = {}
+        for item in items:
+            for spec in self.match_item(item):
+                out.setdefault(spec.id, (spec, []))[1].append(item)
+        return out
+
+
+def load_matcher(db: Session) -> AlertMatcher:
+    rows = db.query(
+        JobSavedSearch.id, JobSavedSearch.user_id, JobSavedSearch.keyword, JobSavedSearch.canton, JobSavedSearch.employment_type
+    ).yield_per(5000)
+    return AlertMatcher(SavedSearchSpec.from_row(*row) for row in rows)
+
+
+class MatcherCache:
+    """
+    This worker's ``AlertMatcher``, so matching a batch doesn't reload every saved search.
+
+    Rebuilt from the table once older than ``refresh_sec`` (picks up searches saved
+    through other workers) and right away after ``invalidate``, which the saved-search
+    endpoints call on every change.
+    """
+
+    def __init__(self, refresh_sec: float) -> None:
+        self.refresh_sec = refresh_sec
+        self._matcher: Optional[AlertMatcher] = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> AlertMatcher:
+        with self._lock:
+            if self._matcher is not None and time.monotonic() - self._built_at < self.refresh_sec:
+                return self._matcher
+            generation = self._generation
+        built_at = time.monotonic()
+        matcher = load_matcher(db)
+        with self._lock:
+            # a change saved while loading may be missing from this matcher: use it once, don't keep it
+            if generation == self._generation:
+                self._matcher, self._built_at = matcher, built_at
+        return matcher
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._matcher = None
+            self._generation += 1
+
+
+alert_matcher = MatcherCache(refresh_sec=float(os.getenv("JOBS_ALERT_MATCHER_REFRESH_SEC", "60")))
+
+
+def record_alerts(db: Session, matches: Dict[str, Tuple[SavedSearchSpec, List[JobItem]]]) -> int:
+    """
+    Insert one alert per (saved search, job); already alerted pairs are skipped.
+    Returns the number of alerts actually inserted. The caller commits.
+    """
+    rows = {
+        alert_id(spec.id, item.id): {
+            "id": alert_id(spec.id, item.id),
+            "user_id": uuid.UUID(spec.user_id),
+            "saved_search_id": uuid.UUID(spec.id),
+            "job_id": item.id,
+            "source": item.source,
+            "title": item.title,
+            "company": item.company,
+            "location": item.location,
+            "canton": item.canton,
+            "url": item.url,
+            "posted_at": item.posted_at.replace(tzinfo=None) if item.posted_at else None,
+        }
+        for spec, items in matches.values()
+        for item in items
+    }
+    if rows:
+        # alert ids are deterministic, so the pairs alerted before are found by id
+        existing = {r[0] for r in db.query(JobAlert.id).filter(JobAlert.id.in_(list(rows)))}
+        rows = {k: v for k, v in rows.items() if k not in existing}
+    if not rows:
+        return 0
+    stmt = upsert_insert(db, JobAlert.__table__).on_conflict_do_nothing(index_elements=["saved_search_id", "job_id"])
+    db.execute(stmt, list(rows.values()))
+    matched = {row["saved_search_id"] for row in rows.values()}
+    db.query(JobSavedSearch).filter(JobSavedSearch.id.in_(matched)).update(
+        {JobSavedSearch.last_matched_at: datetime.now(timezone.utc)}, synchronize_session=False
+    )
+    return len(rows)
+
+
+def alert_id(saved_search_id: str, job_id: str) -> uuid.UUID:
+    # Deterministic, so a retried batch maps onto the same alert rows
+    return uuid.uuid5(uuid.UUID(saved_search_id), job_id)
+
+
+def alert_new(db: Session, items: List[JobItem]) -> int:
+    """Match newly indexed postings against all saved searches and record the alerts. The caller commits."""
+    if not items:
+        return 0
+    matcher = alert_matcher.get(db)
+    if not matcher.size:
+        return 0
+    return record_alerts(db, matcher.match(items))
+
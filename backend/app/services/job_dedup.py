@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from ..schemas.job import JobItem
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Gender/workload decorations that providers add or drop: "(m/w/d)", "80-100%", "h/f"
+_NOISE_RE = re.compile(r"\((?:[mwfdhx]\s*/\s*)+[mwfdhx]\)|\b(?:[mwfdhx]\s*/\s*)+[mwfdhx]\b|\d+\s*(?:-\s*\d+\s*)?%")
+_COMPANY_SUFFIXES = {"ag", "gmbh", "sa", "sarl", "ltd", "inc", "llc", "co", "kg", "plc"}
+_STOPWORDS = {"in", "innen", "und", "and", "et", "the", "of", "for", "fur", "a"}
+# 8 bands of 2 rows: title pairs with Jaccard >= 0.8 share a band with p > 0.99
+_BANDS = 8
+_ROWS = 2
+# Per bucket only the most recent representatives are compared, keeping the pass linear
+_BUCKET_PROBES = 8
+
+
+def _fold(value: Optional[str]) -> str:
+    text = (value or "").lower()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+@lru_cache(maxsize=8192)
+def normalize_title(value: Optional[str]) -> str:
+    return " ".join(_WORD_RE.findall(_NOISE_RE.sub(" ", _fold(value))))
+
+
+@lru_cache(maxsize=4096)
+def normalize_company(value: Optional[str]) -> str:
+    words = _WORD_RE.findall(_fold(value))
+    while words and words[-1] in _COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+@lru_cache(maxsize=4096)
+def normalize_location(value: Optional[str]) -> str:
+    # "Zürich, ZH, CH" and "Zurich" are the same place; the city is enough
+    city = _fold(value).split(",")[0]
+    return " ".join(_WORD_RE.findall(city))
+
+
+def fingerprint(item: JobItem) -> str:
+    """Exact key of a posting across providers."""
+    raw = "|".join([normalize_title(item.title), normalize_company(item.company), normalize_location(item.location)])
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+# MinHash over title tokens: each token is hashed once and then permuted K times
+# with universal hashing, which is much cheaper than K cryptographic hashes.
+_MINHASH_K = _BANDS * _ROWS
+_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % (_PRIME - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _PRIME)
+    for i in range(_MINHASH_K)
+]
+
+
+@lru_cache(maxsize=8192)
+def title_tokens(value: Optional[str]) -> FrozenSet[str]:
+    """Stemmed title words; plural and gendered forms ("Entwickler/in") collapse."""
+    return frozenset(tokenize(normalize_title(value)))
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Accent-folded, lightly stemmed words without stopwords (shared with job alerts)."""
+    tokens = []
+    for word in _WORD_RE.findall(_fold(value)):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("s"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+@lru_cache(maxsize=8192)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+@lru_cache(maxsize=8192)
+def minhash(tokens: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [_token_hash(t) for t in tokens]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _merge_into(target: JobItem, dup: JobItem) -> None:
+    if dup.source not in target.sources:
+        target.sources.append(dup.source)
+    for field in ("company", "location", "canton", "posted_at", "employment_type", "salary", "snippet"):
+        if getattr(target, field) is None and getattr(dup, field) is not None:
+            setattr(target, field, getattr(dup, field))
+
+
+class Deduper:
+    """
+    Streaming duplicate filter for postings from several providers.
+
+    ``add`` returns the item when it is new, or ``None`` when it was folded into a
+    posting seen before (whose ``sources`` then lists both providers). Exact matches
+    are found by ``fingerprint``. Near-duplicate titles of the same company and city
+    are found by MinHash LSH and confirmed by token Jaccard >= ``min_similarity``;
+    each item probes a fixed number of buckets, so a pass over n items is O(n).
+    Works on ``JobItem`` and on the parser's ``JobRecord`` alike.
+    """
+
+    def __init__(self, min_similarity: Optional[float] = None) -> None:
+        self.min_similarity = float(os.getenv("JOBS_DEDUP_MIN_SIMILARITY", "0.8")) if min_similarity is None else min_similarity
+        self._exact: Dict[str, JobItem] = {}
+        self._buckets: Dict[Tuple[str, str, int, Tuple[int, ...]], List[Tuple[FrozenSet[str], JobItem]]] = {}
+        self.merged = 0
+
+    def add(self, item: JobItem) -> Optional[JobItem]:
+        if not item.sources:
+            item.sources = [item.source]
+        key = fingerprint(item)
+        rep = self._exact.get(key)
+        buckets: List[Tuple[str, str, int, Tuple[int, ...]]] = []
+        tokens: FrozenSet[str] = frozenset()
+        if rep is None and self.min_similarity < 1.0:
+            tokens = title_tokens(item.title)
+            rep, buckets = self._near(item, tokens)
+        if rep is not None:
+            _merge_into(rep, item)
+            self._exact.setdefault(key, rep)
+            self.merged += 1
+            return None
+        self._exact[key] = item
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, []).append((tokens, item))
+        return item
+
+    def _near(self, item: JobItem, tokens: FrozenSet[str]) -> Tuple[Optional[JobItem], List[Tuple[str, str, int, Tuple[int, ...]]]]:
+        if not tokens:
+            return None, []
+        sig = minhash(tokens)
+        company, city = normalize_company(item.company), normalize_location(item.location)
+        buckets = [(company, city, band, tuple(sig[band * _ROWS:(band + 1) * _ROWS])) for band in range(_BANDS)]
+        for bucket in buckets:
+            for other_tokens, other in self._buckets.get(bucket, ())[-_BUCKET_PROBES:]:
+                if jaccard(tokens, other_tokens) >= self.min_similarity:
+                    return other, []
+        return None, buckets
+
+
+def dedupe(items: List[JobItem], min_similarity: Optional[float] = None) -> List[JobItem]:
+    """Collapse cross-provider duplicates, keeping the first occurrence's position."""
+    deduper = Deduper(min_similarity)
+    return [it for it in items if deduper.add(it) is not None]
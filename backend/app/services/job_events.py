@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models.job import JobSearchEvent
+from .job_rollups import apply_rollups, prune_rollups, rollup_counts
+
+
+class EventSink:
+    """
+    In-process buffer for ``job_search_events`` rows, written in bulk.
+
+    ``submit`` only appends to the buffer; a background task flushes it with one
+    multi-row INSERT once ``batch_size`` rows are waiting or ``flush_sec`` passed
+    since the last flush. Rows keep the time they were submitted, not the time they
+    were written. The same transaction adds them to the hourly/daily rollups behind
+    /jobs/analytics/top and, every ``prune_sec``, drops expired rollup buckets.
+    The buffer is bounded by ``max_buffer``: when the database is down
+    the oldest rows are dropped rather than growing without limit. ``aclose`` writes
+    what is left (called from the app lifespan on shutdown).
+    """
+
+    def __init__(self, batch_size: int, flush_sec: float, max_buffer: int, prune_sec: float = 3600.0, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.batch_size = batch_size
+        self.flush_sec = flush_sec
+        self.max_buffer = max_buffer
+        self.prune_sec = prune_sec
+        self._pruned_at = 0.0
+        self._session_factory = session_factory
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._counters: Dict[str, int] = {"submitted": 0, "written": 0, "flushes": 0, "errors": 0, "dropped": 0}
+
+    def submit(self, events: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """Queue ``(keyword, canton)`` pairs; never touches the database. Returns the number queued."""
+        now = datetime.now(timezone.utc)
+        rows = [{"id": uuid.uuid4(), "keyword": keyword, "canton": canton, "created_at": now} for keyword, canton in events]
+        with self._lock:
+            self._buffer.extend(rows)
+            self._counters["submitted"] += len(rows)
+            self._trim()
+            due = len(self._buffer) >= self.batch_size
+        self._ensure_started()
+        if due and self._wakeup is not None:
+            self._wakeup.set()
+        return len(rows)
+
+    def _trim(self) -> None:
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self._counters["dropped"] += overflow
+
+    def flush(self) -> int:
+        """Write everything buffered in one INSERT; on failure the rows go back to the buffer."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        try:
+            with self._session_factory() as db:
+                db.execute(insert(JobSearchEvent.__table__), rows)
+                apply_rollups(db, rollup_counts((r["keyword"], r["canton"], r["created_at"]) for r in rows))
+                if time.monotonic() - self._pruned_at >= self.prune_sec:
+                    prune_rollups(db)
+                    self._pruned_at = time.monotonic()
+                db.commit()
+        except Exception:
+            with self._lock:
+                self._buffer[:0] = rows
+                self._counters["errors"] += 1
+                self._trim()
+            return 0
+        with self._lock:
+            self._counters["written"] += len(rows)
+            self._counters["flushes"] += 1
+        return len(rows)
+
+    def _ensure_started(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # called outside the event loop (scripts, threadpool): write through
+            self.flush()
+            return
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_sec)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                # never break background loop
+                pass
+
+    def start(self) -> None:
+        self._ensure_started()
+
+    async def aclose(self) -> None:
+        """Stop the flusher and write the remaining rows."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "buffered": len(self._buffer), "batch_size": self.batch_size, "flush_sec": self.flush_sec}
+
+
+event_sink = EventSink(
+    batch_size=int(os.getenv("JOBS_EVENTS_BATCH_SIZE", "200")),
+    flush_sec=float(os.getenv("JOBS_EVENTS_FLUSH_SEC", "2")),
+    max_buffer=int(os.getenv("JOBS_EVENTS_MAX_BUFFER", "10000")),
+    prune_sec=float(os.getenv("JOBS_ROLLUP_PRUNE_SEC", "3600")),
+)
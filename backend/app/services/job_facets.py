@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.database import SessionLocal
+from ..schemas.job import JobItem
+from .job_index import index_columns, index_covers
+
+
+FACET_FIELDS = ("canton", "employment_type", "company", "source")
+_COLUMNS = FACET_FIELDS + ("salary",)
+_PERCENTILES = (10, 25, 50, 75, 90)
+
+# "CHF 80'000 - 100'000", "85k", "32.50 / hour", "6 500 per month"
+_NUMBER_RE = re.compile(r"\d+(?:['’ .,]\d{3})*(?:[.,]\d+)?\s*[kK]?")
+_HOURLY_RE = re.compile(r"hour|stunde|heure|/\s*h\b|\bph\b", re.IGNORECASE)
+_MONTHLY_RE = re.compile(r"month|monat|mois|/\s*m\b|\bpm\b", re.IGNORECASE)
+# Swiss full time: 42 h x 52 weeks; monthly salaries are paid 12 times
+_HOURS_PER_YEAR = 2184.0
+_MONTHS_PER_YEAR = 12.0
+# Annual amounts outside this range are parse noise, not salaries
+_PLAUSIBLE_CHF = (12_000.0, 1_000_000.0)
+
+
+def _amount(token: str) -> float:
+    token = token.strip()
+    scale = 1000.0 if token[-1:] in "kK" else 1.0
+    digits = re.sub(r"['’ ]", "", token.rstrip("kK").strip())
+    # a separator followed by exactly three digits groups thousands, anything else is a decimal point
+    digits = re.sub(r"[.,](?=\d{3}(?:\D|$))", "", digits).replace(",", ".")
+    return float(digits) * scale
+
+
+def _salary_ranges(salaries: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(low, high, per-year multiplier) per salary text; NaN where nothing could be read."""
+    n = len(salaries)
+    low = np.full(n, np.nan)
+    high = np.full(n, np.nan)
+    for i, text in enumerate(salaries):
+        if not text:
+            continue
+        numbers = [_amount(t) for t in _NUMBER_RE.findall(text)[:2]]
+        if numbers:
+            low[i] = numbers[0]
+            high[i] = numbers[-1]
+    texts = np.array([s or "" for s in salaries], dtype=object)
+    hourly = np.fromiter((bool(_HOURLY_RE.search(t)) for t in texts), dtype=bool, count=n)
+    monthly = np.fromiter((bool(_MONTHLY_RE.search(t)) for t in texts), dtype=bool, count=n)
+    multiplier = np.where(hourly, _HOURS_PER_YEAR, np.where(monthly, _MONTHS_PER_YEAR, 1.0))
+    return low, high, multiplier
+
+
+def salary_stats(salaries: Sequence[Optional[str]]) -> Optional[Dict[str, Any]]:
+    """Percentiles of annual CHF salaries (range midpoints); None when no salary could be read."""
+    if not salaries:
+        return None
+    low, high, multiplier = _salary_ranges(salaries)
+    annual = (low + np.fmax(high, low)) / 2.0 * multiplier
+    # hourly/monthly amounts given without a unit: guess from the magnitude
+    annual = np.where(annual < 300, annual * _HOURS_PER_YEAR, np.where(annual < 30_000, annual * _MONTHS_PER_YEAR, annual))
+    annual = annual[(annual >= _PLAUSIBLE_CHF[0]) & (annual <= _PLAUSIBLE_CHF[1])]
+    if not annual.size:
+        return None
+    values = np.percentile(annual, _PERCENTILES)
+    return {
+        "count": int(annual.size),
+        "min": round(float(annual.min())),
+        "max": round(float(annual.max())),
+        "mean": round(float(annual.mean())),
+        **{f"p{p}": round(float(v)) for p, v in zip(_PERCENTILES, values)},
+    }
+
+
+def facet_counts(values: Sequence[Optional[str]], top: int) -> List[Dict[str, Any]]:
+    """Most frequent non-empty values with their counts, most frequent first."""
+    column = np.array([v for v in values if v], dtype=str)
+    if not column.size:
+        return []
+    uniques, counts = np.unique(column, return_counts=True)
+    # stable sort keeps the alphabetical order of np.unique among equal counts
+    order = np.argsort(-counts, kind="stable")[:top]
+    return [{"value": str(uniques[i]), "count": int(counts[i])} for i in order]
+
+
+def compute_facets(columns: Dict[str, Sequence[Any]], basis: str, top: int = 10) -> Dict[str, Any]:
+    """Facet counts and salary statistics from column arrays (see ``index_columns``)."""
+    matched = len(columns.get("source") or ())
+    return {
+        "basis": basis,
+        "matched": matched,
+        "counts": {field: facet_counts(columns.get(field) or (), top) for field in FACET_FIELDS},
+        "salary": salary_stats(columns.get("salary") or ()),
+    }
+
+
+def _columns_of(items: List[JobItem]) -> Dict[str, List[Any]]:
+    return {c: [getattr(it, c) for it in items] for c in _COLUMNS}
+
+
+def _index_facets_sync(q: Optional[str], canton: Optional[str], top: int, max_rows: int) -> Optional[Dict[str, Any]]:
+    try:
+        with SessionLocal() as db:
+            if not index_covers(db, canton):
+                return None
+            columns = index_columns(db, q, canton, _COLUMNS, max_rows)
+    except Exception:
+        return None
+    if not columns["source"]:
+        return None
+    return compute_facets(columns, "index", top)
+
+
+async def index_facets(q: Optional[str], canton: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Facets of everything the index matches for ``q``/``canton`` (up to
+    JOBS_FACETS_MAX_ROWS postings), or None while the index is cold for them.
+    They don't depend on the page, so every page of a search can share them.
+    """
+    top = int(os.getenv("JOBS_FACETS_TOP", "10"))
+    return await asyncio.to_thread(_index_facets_sync, q, canton, top, int(os.getenv("JOBS_FACETS_MAX_ROWS", "20000")))
+
+
+def results_facets(items: List[JobItem]) -> Dict[str, Any]:
+    """Fallback for a cold index: facets of one result page, reported as ``basis: "results"``."""
+    return compute_facets(_columns_of(items), "results", int(os.getenv("JOBS_FACETS_TOP", "10")))
+
+
+def facets_ttl(value: Optional[Dict[str, Any]]) -> Optional[float]:
+    """A cold index is asked again shortly, so facets switch to it once it warms up."""
+    if value is None:
+        return float(os.getenv("JOBS_CACHE_PARTIAL_TTL_SEC", "30"))
+    return None
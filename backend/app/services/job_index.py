@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal, upsert_insert
+from ..core.http import HTTPClients
+from ..models.job import JobIndexCoverage, JobPosting
+from ..schemas.job import JobItem
+from .job_alerts import alert_new
+from .job_dedup import dedupe
+from .jobs_aggregator import CANTON_NAMES, decode_cursor, encode_cursor, search_jobs, search_jobs_page, stream_jobs
+from .loop_lease import LoopLease, loop_lease_sec, run_leased
+
+
+_FTS_COLUMNS = ("title", "company", "location", "snippet")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_background: Set[asyncio.Task] = set()
+
+
+def _max_age() -> timedelta:
+    return timedelta(seconds=int(os.getenv("JOBS_INDEX_MAX_AGE_SEC", str(3 * 24 * 3600))))
+
+
+def _coverage_max_age() -> timedelta:
+    # two ingest runs: one late run doesn't send every search to the providers
+    default = 2 * int(os.getenv("JOBS_INGEST_INTERVAL_SEC", "3600"))
+    return timedelta(seconds=int(os.getenv("JOBS_INDEX_COVERAGE_SEC", str(default))))
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def ensure_fts(db: Session) -> None:
+    """SQLite keeps the full-text index in an FTS5 table next to ``jobs`` (created by migration 0012)."""
+    if _dialect(db) == "sqlite":
+        db.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(id UNINDEXED, title, company, location, snippet)"))
+
+
+def _to_item(row: JobPosting) -> JobItem:
+    return JobItem(
+        id=row.id,
+        source=row.source,
+        title=row.title,
+        company=row.company,
+        location=row.location,
+        canton=row.canton,
+        url=row.url,
+        posted_at=row.posted_at,
+        employment_type=row.employment_type,
+        salary=row.salary,
+        snippet=row.snippet,
+    )
+
+
+def upsert_jobs(db: Session, items: List[JobItem], now: Optional[datetime] = None) -> List[str]:
+    """
+    Insert or refresh postings keyed by ``source:id``. Returns the ids that were new.
+    Runs in the caller's transaction; the caller commits.
+    """
+    if not items:
+        return []
+    now = now or datetime.utcnow()
+    by_id = {it.id: it for it in items}
+    ids = list(by_id)
+    existing = {r[0] for r in db.query(JobPosting.id).filter(JobPosting.id.in_(ids)).all()}
+    rows = [
+        {
+            "id": it.id,
+            "source": it.source,
+            "title": it.title,
+            "company": it.company,
+            "location": it.location,
+            "canton": it.canton.upper() if it.canton else None,
+            "url": it.url,
+            "posted_at": it.posted_at.replace(tzinfo=None) if it.posted_at else None,
+            "employment_type": it.employment_type,
+            "salary": it.salary,
+            "snippet": it.snippet,
+            "first_seen_at": now,
+            "last_seen_at": now,
+        }
+        for it in by_id.values()
+    ]
+    stmt = upsert_insert(db, JobPosting.__table__)
+    updatable = [c for c in rows[0] if c not in ("id", "first_seen_at")]
+    stmt = stmt.on_conflict_do_update(index_elements=["id"], set_={c: getattr(stmt.excluded, c) for c in updatable})
+    db.execute(stmt, rows)
+    if _dialect(db) == "sqlite":
+        ensure_fts(db)
+        db.execute(text("DELETE FROM jobs_fts WHERE id IN (SELECT value FROM json_each(:ids))"), {"ids": json.dumps(ids)})
+        db.execute(
+            text("INSERT INTO jobs_fts (id, title, company, location, snippet) VALUES (:id, :title, :company, :location, :snippet)"),
+            [{"id": r["id"], **{c: r[c] or "" for c in _FTS_COLUMNS}} for r in rows],
+        )
+    return [i for i in ids if i not in existing]
+
+
+def expire_stale(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete postings not seen by the ingester within JOBS_INDEX_MAX_AGE_SEC."""
+    cutoff = (now or datetime.utcnow()) - _max_age()
+    if _dialect(db) == "sqlite":
+        ensure_fts(db)
+        db.execute(
+            text("DELETE FROM jobs_fts WHERE id IN (SELECT id FROM jobs WHERE last_seen_at < :cutoff)"),
+            {"cutoff": cutoff},
+        )
+    return db.query(JobPosting).filter(JobPosting.last_seen_at < cutoff).delete(synchronize_session=False)
+
+
+def record_coverage(db: Session, canton: str, postings: int, now: Optional[datetime] = None) -> None:
+    """Note that the ingester just pulled ``canton``'s newest listings. The caller commits."""
+    stmt = upsert_insert(db, JobIndexCoverage.__table__)
+    row = {"canton": canton.upper(), "ingested_at": now or datetime.utcnow(), "postings": postings}
+    db.execute(stmt.on_conflict_do_update(index_elements=["canton"], set_={"ingested_at": stmt.excluded.ingested_at, "postings": stmt.excluded.postings}), [row])
+
+
+def index_covers(db: Session, canton: Optional[str]) -> bool:
+    """
+    Whether the ingester covered ``canton`` (every canton when None) within
+    JOBS_INDEX_COVERAGE_SEC. Postings written back from live searches don't count:
+    they are whatever earlier queries happened to return, not the canton's listings.
+    """
+    cutoff = datetime.utcnow() - _coverage_max_age()
+    wanted = [canton.upper()] if canton else list(CANTON_NAMES)
+    fresh = (
+        db.query(JobIndexCoverage.canton)
+        .filter(JobIndexCoverage.canton.in_(wanted), JobIndexCoverage.ingested_at >= cutoff)
+        .count()
+    )
+    return fresh == len(wanted)
+
+
+def _fts_query(q: str) -> str:
+    # Every token must match, as a prefix; quoting neutralizes FTS5 operators
+    tokens = _TOKEN_RE.findall(q)
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def _match(db: Session, q: Optional[str], canton: Optional[str]):
+    """Query over fresh postings matching ``q`` (full-text) and ``canton``; None when ``q`` can't match anything."""
+    cutoff = datetime.utcnow() - _max_age()
+    query = db.query(JobPosting).filter(JobPosting.last_seen_at >= cutoff)
+    if canton:
+        query = query.filter(JobPosting.canton == canton.upper())
+    terms = (q or "").strip()
+    if terms:
+        dialect = _dialect(db)
+        if dialect == "sqlite":
+            match = _fts_query(terms)
+            if not match:
+                return None
+            ensure_fts(db)
+            query = query.filter(JobPosting.id.in_(text("SELECT id FROM jobs_fts WHERE jobs_fts MATCH :match").bindparams(match=match)))
+        elif dialect == "postgresql":
+            query = query.filter(text("jobs.search_vector @@ plainto_tsquery('simple', :terms)").bindparams(terms=terms))
+        else:
+            for token in _TOKEN_RE.findall(terms):
+                query = query.filter(JobPosting.title.ilike(f"%{token}%"))
+    return query
+
+
+def query_index(db: Session, q: Optional[str], canton: Optional[str], offset: int, limit: int) -> Tuple[List[JobItem], int]:
+    """Newest-first slice of indexed postings matching ``q`` (full-text) and ``canton``."""
+    query = _match(db, q, canton)
+    if query is None:
+        return [], 0
+    total = query.count()
+    rows = (
+        query.order_by(JobPosting.posted_at.desc().nullslast(), JobPosting.id)
+        .offset(max(offset, 0))
+        .limit(limit)
+        .all()
+    )
+    return [_to_item(r) for r in rows], total
+
+
+def index_columns(db: Session, q: Optional[str], canton: Optional[str], columns: Sequence[str], limit: int) -> Dict[str, List[Any]]:
+    """
+    Column-wise values of ``columns`` for every posting matching the search (at most
+    ``limit`` rows), without building ORM objects. Used for facets.
+    """
+    query = _match(db, q, canton)
+    if query is None:
+        return {c: [] for c in columns}
+    rows = query.with_entities(*(getattr(JobPosting, c) for c in columns)).limit(limit).all()
+    values = list(zip(*rows)) if rows else [() for _ in columns]
+    return {c: list(v) for c, v in zip(columns, values)}
+
+
+def _query_index_sync(q: Optional[str], canton: Optional[str], offset: int, limit: int) -> Tuple[List[JobItem], int]:
+    try:
+        with SessionLocal() as db:
+            return query_index(db, q, canton, offset, limit)
+    except Exception:
+        # missing table/FTS support: behave like a cold index
+        return [], 0
+
+
+def _index_covers_sync(canton: Optional[str]) -> bool:
+    try:
+        with SessionLocal() as db:
+            return index_covers(db, canton)
+    except Exception:
+        # missing table: behave like a cold index
+        return False
+
+
+def _store_sync(items: List[JobItem], covered: Optional[str] = None) -> Tuple[List[str], int]:
+    """
+    Upsert ``items`` and alert saved searches on the postings that were new, in one
+    transaction: every path that first indexes a posting (ingest or live write-back)
+    raises its alerts. Returns ``(new ids, alerts)``.
+    """
+    with SessionLocal() as db:
+        new_ids = upsert_jobs(db, items)
+        if covered:
+            record_coverage(db, covered, len(items))
+        fresh = set(new_ids)
+        alerts = alert_new(db, [it for it in items if it.id in fresh])
+        db.commit()
+        return new_ids, alerts
+
+
+async def _store_in_background(items: List[JobItem]) -> None:
+    try:
+        await asyncio.to_thread(_store_sync, items)
+    except Exception:
+        pass
+
+
+async def indexed_search(q: Optional[str], canton: Optional[str], page: int, per_page: int, cursor: Optional[str] = None, clients: Optional[HTTPClients] = None) -> Tuple[List[JobItem], Dict[str, int], Dict[str, Any], Optional[str]]:
+    """
+    Answer from the local index when the ingester covers ``canton`` (see
+    ``index_covers``); live providers are asked otherwise, and when the index has
+    no match. Live results are written back to the index in the background.
+
+    Returns ``(items, sources, debug, next_cursor)``. Index cursors carry an offset,
+    live cursors the per-provider merge positions of ``search_jobs_page``; ``page``
+    is only used when no cursor is given.
+    """
+    state = decode_cursor(cursor, q, canton, per_page) if cursor else {}
+    if "s" in state:
+        items, sources, dbg, next_cursor = await search_jobs_page(q=q, canton=canton, per_page=per_page, cursor=cursor, clients=clients)
+    else:
+        offset = int(state["i"]) if "i" in state else (max(page, 1) - 1) * per_page
+        # an index cursor keeps paging the index it started on
+        if "i" in state or await asyncio.to_thread(_index_covers_sync, canton):
+            items, total = await asyncio.to_thread(_query_index_sync, q, canton, offset, per_page)
+            if items:
+                next_cursor = encode_cursor(q, canton, per_page, i=offset + len(items)) if offset + len(items) < total else None
+                return dedupe(items), {"index": total}, {}, next_cursor
+            if cursor:
+                # the index shrank under an index cursor: nothing more to show
+                return [], {"index": total}, {}, None
+        if page > 1:
+            items, sources, dbg = await search_jobs(q=q, canton=canton, page=page, per_page=per_page, clients=clients)
+            next_cursor = None
+        else:
+            items, sources, dbg, next_cursor = await search_jobs_page(q=q, canton=canton, per_page=per_page, clients=clients)
+    if items:
+        task = asyncio.create_task(_store_in_background(items))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+    return items, sources, dbg, next_cursor
+
+
+async def indexed_stream(q: Optional[str], canton: Optional[str], per_page: int, clients: Optional[HTTPClients] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Frames of ``stream_jobs`` for /jobs/search/stream. A covered index with matches
+    answers with a single ``index`` frame; otherwise providers are streamed and what
+    they returned is written back to the index once the stream completed.
+    """
+    items, total = [], 0
+    if await asyncio.to_thread(_index_covers_sync, canton):
+        items, total = await asyncio.to_thread(_query_index_sync, q, canton, 0, per_page)
+    if items:
+        items = dedupe(items)
+        yield {"type": "items", "provider": "index", "items": items}
+        yield {
+            "type": "summary",
+            "sources": {"index": total},
+            "total": len(items),
+            "order": [it.id for it in items],
+            "next_cursor": encode_cursor(q, canton, per_page, i=per_page) if per_page < total else None,
+        }
+        return
+    received: List[JobItem] = []
+    async for frame in stream_jobs(q, canton, per_page, clients=clients):
+        if frame["type"] == "items":
+            received.extend(frame["items"])
+        yield frame
+    if received:
+        task = asyncio.create_task(_store_in_background(received))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+
+async def ingest_once(clients: Optional[HTTPClients] = None) -> Dict[str, int]:
+    """
+    Pull the newest listings of every canton into the index, record which cantons
+    were covered and expire stale postings. New postings raise alerts as they are
+    stored (see ``_store_sync``).
+    """
+    per_canton = int(os.getenv("JOBS_INGEST_PER_CANTON", "20"))
+    pause = float(os.getenv("JOBS_INGEST_PAUSE_SEC", "2"))
+    stats = {"fetched": 0, "new": 0, "alerts": 0, "expired": 0}
+    for canton in CANTON_NAMES:
+        try:
+            items, sources, _ = await search_jobs(q=None, canton=canton, page=1, per_page=per_canton, clients=clients)
+            # covered only when some provider answered; a failed fetch leaves the canton cold
+            answered = any(n >= 0 for n in sources.values())
+            if items or answered:
+                new_ids, alerts = await asyncio.to_thread(_store_sync, items, canton if answered else None)
+                stats["fetched"] += len(items)
+                stats["new"] += len(new_ids)
+                stats["alerts"] += alerts
+        except Exception:
+            continue
+        # spread provider quota over the run instead of bursting
+        await asyncio.sleep(pause)
+
+    def expire() -> int:
+        with SessionLocal() as db:
+            n = expire_stale(db)
+            db.commit()
+            return n
+
+    try:
+        stats["expired"] = await asyncio.to_thread(expire)
+    except Exception:
+        pass
+    return stats
+
+
+async def ingest_loop() -> None:
+    # every worker starts the loop; the lease makes one of them ingest
+    interval = int(os.getenv("JOBS_INGEST_INTERVAL_SEC", "3600"))
+    await run_leased(LoopLease("jobs_ingest", loop_lease_sec(interval)), interval, ingest_once)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import os
+import socket
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from sqlalchemy import or_
+
+from ..core.database import SessionLocal
+from ..core.http import HTTPClients, http_clients
+from ..models.job import JobFavorite
+from .loop_lease import LoopLease, loop_lease_sec, run_leased
+
+
+LIVE = "live"
+DEAD = "dead"
+UNKNOWN = "unknown"
+
+_DEAD_STATUSES = {404, 410}
+_MAX_REDIRECTS = 5
+
+
+@dataclass
+class ProbeResult:
+    status: str
+    http_status: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+async def resolve(host: str, port: int) -> List[str]:
+    """Addresses ``host`` resolves to."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def public_url(url: str) -> bool:
+    """
+    Whether ``url`` may be probed from the server: http(s) on a host whose every
+    address is public. Favorite URLs come from users; without this the probe
+    would report on internal services (metadata endpoints, admin ports).
+    """
+    try:
+        parts = urlparse(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return False
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = await resolve(parts.hostname, port)
+        return bool(addresses) and all(ipaddress.ip_address(a.split("%")[0]).is_global for a in addresses)
+    except (OSError, ValueError):
+        return False
+
+
+def classify(resp: httpx.Response) -> str:
+    """LIVE/DEAD/UNKNOWN for a posting URL's response (after redirects)."""
+    if resp.status_code in _DEAD_STATUSES:
+        return DEAD
+    if resp.status_code == 304 or 200 <= resp.status_code < 300:
+        # boards often redirect expired postings to their home page instead of a 404
+        if resp.history and urlparse(str(resp.url)).path in ("", "/"):
+            return DEAD
+        return LIVE
+    return UNKNOWN
+
+
+class LivenessChecker:
+    """
+    Marks favorites whose posting disappeared.
+
+    Each run walks favorites not checked within ``recheck_sec`` in batches of
+    ``batch_size`` (keyset on id). A URL shared by several favorites is probed once:
+    first from the result cache (``cache_ttl_sec``), otherwise with a conditional
+    HEAD (``If-None-Match``/``If-Modified-Since`` from the last probe), falling back
+    to GET when a server rejects HEAD. At most ``concurrency`` probes run at once,
+    at most ``per_host`` per host, and requests to one host are spaced by
+    ``host_interval_sec``. 404/410, or a redirect to the site root, mark a posting
+    dead; errors and other statuses leave the previous state alone. Only public
+    http(s) addresses are probed, redirect hops included (see ``public_url``);
+    other URLs stay unknown.
+    """
+
+    def __init__(self, concurrency: int, per_host: int, host_interval_sec: float, cache_ttl_sec: float, batch_size: int, recheck_sec: float) -> None:
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_interval_sec = host_interval_sec
+        self.cache_ttl_sec = cache_ttl_sec
+        self.batch_size = batch_size
+        self.recheck_sec = recheck_sec
+        self._cache: Dict[str, Tuple[float, ProbeResult]] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_next_at: Dict[str, float] = defaultdict(float)
+        self._counters: Dict[str, int] = {"probes": 0, "cache_hits": 0, "live": 0, "dead": 0, "unknown": 0, "blocked": 0}
+
+    def _cached(self, url: str) -> Optional[ProbeResult]:
+        hit = self._cache.get(url)
+        if hit is None or time.monotonic() - hit[0] >= self.cache_ttl_sec:
+            return None
+        return hit[1]
+
+    async def _polite(self, host: str) -> None:
+        # reserve the next slot for this host before sleeping, so waiters queue up
+        now = time.monotonic()
+        start = max(now, self._host_next_at[host])
+        self._host_next_at[host] = start + self.host_interval_sec
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _send(self, client: httpx.AsyncClient, method: str, url: str, headers: Dict[str, str]) -> Optional[httpx.Response]:
+        """
+        The final response (headers only) to ``method`` on ``url``, following up to
+        ``_MAX_REDIRECTS`` redirects; None when a hop isn't a public URL.
+        """
+        hops: List[httpx.Response] = []
+        for _ in range(_MAX_REDIRECTS + 1):
+            if not await public_url(url):
+                self._counters["blocked"] += 1
+                return None
+            resp = await client.send(client.build_request(method, url, headers=headers), stream=True, follow_redirects=False)
+            await resp.aclose()
+            location = resp.headers.get("location")
+            if not resp.is_redirect or not location:
+                resp.history = hops
+                return resp
+            hops.append(resp)
+            url = urljoin(str(resp.url), location)
+        return None
+
+    async def probe(self, client: httpx.AsyncClient, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> ProbeResult:
+        cached = self._cached(url)
+        if cached is not None:
+            self._counters["cache_hits"] += 1
+            return cached
+        host = urlparse(url).netloc.lower()
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        async with slots:
+            result = ProbeResult(UNKNOWN, None, etag, last_modified)
+            try:
+                await self._polite(host)
+                resp = await self._send(client, "HEAD", url, headers)
+                if resp is not None and resp.status_code in (403, 405, 501):
+                    # HEAD not supported (or blocked): look at the GET headers only
+                    await self._polite(host)
+                    resp = await self._send(client, "GET", url, headers)
+                if resp is not None:
+                    status = classify(resp)
+                    if status == DEAD:
+                        # validators of whatever page we were redirected to mean nothing for the posting
+                        result = ProbeResult(DEAD, resp.status_code)
+                    else:
+                        result = ProbeResult(status, resp.status_code, resp.headers.get("etag") or etag, resp.headers.get("last-modified") or last_modified)
+            except httpx.HTTPError:
+                pass
+        self._counters["probes"] += 1
+        self._counters[result.status] += 1
+        self._cache[url] = (time.monotonic(), result)
+        return result
+
+    def _due_batch(self, after_id: Optional[object]) -> List[Tuple[object, str, Optional[str], Optional[str]]]:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.recheck_sec)
+        with SessionLocal() as db:
+            query = db.query(JobFavorite.id, JobFavorite.url, JobFavorite.link_etag, JobFavorite.link_last_modified).filter(
+                or_(JobFavorite.link_checked_at.is_(None), JobFavorite.link_checked_at < cutoff)
+            )
+            if after_id is not None:
+                query = query.filter(JobFavorite.id > after_id)
+            return [tuple(r) for r in query.order_by(JobFavorite.id).limit(self.batch_size).all()]
+
+    def _store(self, results: Dict[str, ProbeResult]) -> None:
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            for url, result in results.items():
+                values = {JobFavorite.link_checked_at: now, JobFavorite.link_etag: result.etag, JobFavorite.link_last_modified: result.last_modified}
+                if result.status != UNKNOWN:
+                    values[JobFavorite.link_status] = result.status
+                rows = db.query(JobFavorite).filter(JobFavorite.url == url)
+                rows.update(values, synchronize_session=False)
+                if result.status == DEAD:
+                    rows.filter(JobFavorite.link_dead_since.is_(None)).update({JobFavorite.link_dead_since: now}, synchronize_session=False)
+                elif result.status == LIVE:
+                    rows.update({JobFavorite.link_dead_since: None}, synchronize_session=False)
+            db.commit()
+
+    async def check_once(self, clients: Optional[HTTPClients] = None) -> Dict[str, int]:
+        clients = clients or http_clients
+        client = clients.get("postings")
+        gate = asyncio.Semaphore(self.concurrency)
+        stats = {"favorites": 0, "urls": 0, "dead": 0}
+        after_id = None
+
+        async def run(url: str, etag: Optional[str], last_modified: Optional[str]) -> Tuple[str, ProbeResult]:
+            async with gate:
+                return url, await self.probe(client, url, etag, last_modified)
+
+        while True:
+            batch = await asyncio.to_thread(self._due_batch, after_id)
+            if not batch:
+                break
+            after_id = batch[-1][0]
+            by_url: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+            for _, url, etag, last_modified in batch:
+                by_url.setdefault(url, (etag, last_modified))
+            results = dict(await asyncio.gather(*(run(url, *validators) for url, validators in by_url.items())))
+            await asyncio.to_thread(self._store, results)
+            stats["favorites"] += len(batch)
+            stats["urls"] += len(by_url)
+            stats["dead"] += sum(1 for r in results.values() if r.status == DEAD)
+        self._prune_cache()
+        return stats
+
+    def _prune_cache(self) -> None:
+        now = time.monotonic()
+        for url in [u for u, (at, _) in self._cache.items() if now - at >= self.cache_ttl_sec]:
+            del self._cache[url]
+        for host in [h for h, at in self._host_next_at.items() if at < now]:
+            del self._host_next_at[host]
+        # called between runs, when no probe holds a host slot
+        self._host_slots.clear()
+
+    async def run_loop(self) -> None:
+        # every worker starts the loop; the lease makes one of them probe
+        interval = float(os.getenv("JOBS_LIVENESS_INTERVAL_SEC", "3600"))
+        await run_leased(LoopLease("jobs_liveness", loop_lease_sec(interval)), interval, self.check_once)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "cached_urls": len(self._cache)}
+
+
+liveness_checker = LivenessChecker(
+    concurrency=int(os.getenv("JOBS_LIVENESS_CONCURRENCY", "16")),
+    per_host=int(os.getenv("JOBS_LIVENESS_PER_HOST", "2")),
+    host_interval_sec=float(os.getenv("JOBS_LIVENESS_HOST_INTERVAL_SEC", "0.5")),
+    cache_ttl_sec=float(os.getenv("JOBS_LIVENESS_CACHE_TTL_SEC", "21600")),
+    batch_size=int(os.getenv("JOBS_LIVENESS_BATCH_SIZE", "500")),
+    recheck_sec=float(os.getenv("JOBS_LIVENESS_RECHECK_SEC", "86400")),
+)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from ..schemas.job import JobItem
+
+
+class JobRecord:
+    """
+    Slotted, unvalidated stand-in for ``JobItem`` used between parsing and the final page.
+
+    Provider parsers produce these; merge, sort and dedup work on them (same attribute
+    names as ``JobItem``), and only the records that end up on a page are turned into
+    pydantic models with ``to_item``. Parsers guarantee the types ``JobItem`` expects.
+    """
+
+    __slots__ = ("id", "source", "title", "company", "location", "canton", "url", "posted_at", "employment_type", "salary", "snippet", "sources")
+
+    def __init__(
+        self,
+        id: str,
+        source: str,
+        title: str,
+        url: str,
+        company: Optional[str] = None,
+        location: Optional[str] = None,
+        canton: Optional[str] = None,
+        posted_at: Optional[datetime] = None,
+        employment_type: Optional[str] = None,
+        salary: Optional[str] = None,
+        snippet: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.source = source
+        self.title = title
+        self.url = url
+        self.company = company
+        self.location = location
+        self.canton = canton
+        self.posted_at = posted_at
+        self.employment_type = employment_type
+        self.salary = salary
+        self.snippet = snippet
+        self.sources: List[str] = []
+
+    def to_item(self) -> JobItem:
+        return JobItem(
+            id=self.id,
+            source=self.source,
+            title=self.title,
+            company=self.company,
+            location=self.location,
+            canton=self.canton,
+            url=self.url,
+            posted_at=self.posted_at,
+            employment_type=self.employment_type,
+            salary=self.salary,
+            snippet=self.snippet,
+            sources=list(self.sources),
+        )
+
+    def __repr__(self) -> str:
+        return f"JobRecord({self.id!r}, {self.title!r})"
+
+
+def to_items(records: List[JobRecord]) -> List[JobItem]:
+    return [r.to_item() for r in records]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.database import upsert_insert
+from ..models.job import JobSearchEvent, JobSearchRollup
+
+
+HOUR = "hour"
+DAY = "day"
+
+# window -> (granularity, number of buckets, including the current one)
+WINDOWS: Dict[str, Tuple[str, int]] = {
+    "24h": (HOUR, 24),
+    "7d": (DAY, 7),
+    "30d": (DAY, 30),
+}
+
+_BUCKET_SPAN = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+
+def _retention(granularity: str) -> timedelta:
+    if granularity == HOUR:
+        return timedelta(hours=int(os.getenv("JOBS_ROLLUP_HOURLY_RETENTION_H", "48")))
+    return timedelta(days=int(os.getenv("JOBS_ROLLUP_DAILY_RETENTION_D", "90")))
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    """Naive UTC start of the hour/day ``ts`` falls in."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    if granularity == HOUR:
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_counts(events: Iterable[Tuple[str, Optional[str], datetime]]) -> Counter:
+    """``(granularity, bucket, keyword, canton) -> count`` for raw ``(keyword, canton, created_at)`` events."""
+    counts: Counter = Counter()
+    for keyword, canton, created_at in events:
+        for granularity in (HOUR, DAY):
+            counts[(granularity, bucket_start(created_at, granularity), keyword, canton or "")] += 1
+    return counts
+
+
+def apply_rollups(db: Session, counts: Counter) -> None:
+    """Add ``counts`` onto the rollup rows. Runs in the caller's transaction; the caller commits."""
+    if not counts:
+        return
+    rows = [
+        {"granularity": g, "bucket": b, "keyword": k, "canton": c, "count": n}
+        for (g, b, k, c), n in counts.items()
+    ]
+    table = JobSearchRollup.__table__
+    stmt = upsert_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["granularity", "bucket", "keyword", "canton"],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    db.execute(stmt, rows)
+
+
+def prune_rollups(db: Session, now: Optional[datetime] = None) -> int:
+    """Drop buckets older than the retention of their granularity. The caller commits."""
+    now = bucket_start(now or datetime.now(timezone.utc), HOUR)
+    deleted = 0
+    for granularity in (HOUR, DAY):
+        deleted += (
+            db.query(JobSearchRollup)
+            .filter(JobSearchRollup.granularity == granularity, JobSearchRollup.bucket < now - _retention(granularity))
+            .delete(synchronize_session=False)
+        )
+    return deleted
+
+
+def top_keywords(db: Session, window: str, limit: int, now: Optional[datetime] = None) -> List[Tuple[str, Optional[str], int]]:
+    """
+    Most searched ``(keyword, canton, count)`` over ``window`` (a ``WINDOWS`` key).
+    Reads at most ``buckets x distinct keywords`` rollup rows, however many raw
+    events there are.
+    """
+    granularity, buckets = WINDOWS[window]
+    since = bucket_start(now or datetime.now(timezone.utc), granularity) - _BUCKET_SPAN[granularity] * (buckets - 1)
+    total = func.sum(JobSearchRollup.count)
+    rows = (
+        db.query(JobSearchRollup.keyword, JobSearchRollup.canton, total.label("count"))
+        .filter(JobSearchRollup.granularity == granularity, JobSearchRollup.bucket >= since)
+        .group_by(JobSearchRollup.keyword, JobSearchRollup.canton)
+        .order_by(total.desc(), JobSearchRollup.keyword)
+        .limit(limit)
+        .all()
+    )
+    return [(r[0], r[1] or None, int(r[2])) for r in rows]
+
+
+def backfill(db: Session, since: Optional[datetime] = None, batch: int = 10000) -> Dict[str, Any]:
+    """
+    Rebuild the rollups from raw ``job_search_events`` (all of them, or those from
+    ``since`` on). Buckets in that range are replaced, not added to, so a backfill
+    can be re-run safely. The caller commits.
+    """
+    start_day = bucket_start(since, DAY) if since is not None else None
+    rollups = db.query(JobSearchRollup)
+    events = db.query(JobSearchEvent.keyword, JobSearchEvent.canton, JobSearchEvent.created_at)
+    if start_day is not None:
+        rollups = rollups.filter(JobSearchRollup.bucket >= start_day)
+        events = events.filter(JobSearchEvent.created_at >= start_day)
+    cleared = rollups.delete(synchronize_session=False)
+    counts = rollup_counts(events.yield_per(batch))
+    apply_rollups(db, counts)
+    return {"events": sum(n for (g, _, _, _), n in counts.items() if g == HOUR), "rollup_rows": len(counts), "cleared_rows": cleared}
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from ..core.database import SessionLocal
+from ..models.job import JobSearchRollup
+from .job_alerts import normalize_keyword
+from .job_rollups import DAY, bucket_start
+
+
+ALL_CANTONS = ""
+MAX_LIMIT = 20
+# prefixes up to this length match too many keywords to scan; their answers are precomputed
+_HOT_PREFIX_LEN = 2
+
+
+def _top(candidates: List[Tuple[str, int]], limit: int) -> List[Tuple[str, int]]:
+    # most searched first, alphabetical among equals
+    return heapq.nsmallest(limit, candidates, key=lambda c: (-c[1], c[0]))
+
+
+class SuggestIndex:
+    """
+    Immutable keyword index: a sorted array of keywords with their search counts
+    (overall and per canton). A prefix lookup bisects to the first match and scans
+    the matching range; answers for 1-2 character prefixes, whose ranges are long,
+    are precomputed at build time. Never changed after construction, so readers
+    need no lock.
+    """
+
+    def __init__(self, counts: Iterable[Tuple[str, Optional[str], int]]) -> None:
+        weights: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for keyword, canton, count in counts:
+            if not keyword:
+                continue
+            per_canton = weights[keyword]
+            per_canton[ALL_CANTONS] += count
+            if canton:
+                per_canton[canton.upper()] += count
+        self.keywords: List[str] = sorted(weights)
+        self.weights: List[Dict[str, int]] = [dict(weights[k]) for k in self.keywords]
+        self._hot: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        grouped: Dict[Tuple[str, str], List[Tuple[str, int]]] = defaultdict(list)
+        for keyword, per_canton in zip(self.keywords, self.weights):
+            for n in range(1, min(_HOT_PREFIX_LEN, len(keyword)) + 1):
+                for canton, count in per_canton.items():
+                    grouped[(keyword[:n], canton)].append((keyword, count))
+        for key, candidates in grouped.items():
+            self._hot[key] = _top(candidates, MAX_LIMIT)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def lookup(self, prefix: str, canton: Optional[str] = None, limit: int = 10) -> List[Tuple[str, int]]:
+        """Most searched keywords starting with ``prefix`` as ``(keyword, count)``."""
+        prefix = normalize_keyword(prefix)
+        canton = (canton or ALL_CANTONS).upper()
+        limit = max(1, min(limit, MAX_LIMIT))
+        if not prefix:
+            return []
+        if len(prefix) <= _HOT_PREFIX_LEN:
+            return self._hot.get((prefix, canton), [])[:limit]
+        keywords, weights = self.keywords, self.weights
+        candidates = []
+        i = bisect_left(keywords, prefix)
+        while i < len(keywords) and keywords[i].startswith(prefix):
+            count = weights[i].get(canton)
+            if count:
+                candidates.append((keywords[i], count))
+            i += 1
+        return _top(candidates, limit)
+
+
+def load_counts(window_days: int, min_count: int, max_keywords: int) -> List[Tuple[str, Optional[str], int]]:
+    """
+    ``(keyword, canton, count)`` over the last ``window_days`` of daily rollups, for
+    the ``max_keywords`` most searched keywords that were searched at least
+    ``min_count`` times in all cantons together.
+    """
+    since = bucket_start(datetime.now(timezone.utc), DAY) - timedelta(days=window_days - 1)
+    in_window = (JobSearchRollup.granularity == DAY, JobSearchRollup.bucket >= since)
+    total = func.sum(JobSearchRollup.count)
+    with SessionLocal() as db:
+        # thresholds apply per keyword: searches spread over cantons add up
+        keywords = (
+            db.query(JobSearchRollup.keyword)
+            .filter(*in_window, JobSearchRollup.keyword != "")
+            .group_by(JobSearchRollup.keyword)
+            .having(total >= min_count)
+            .order_by(total.desc(), JobSearchRollup.keyword)
+            .limit(max_keywords)
+            .subquery()
+        )
+        rows = (
+            db.query(JobSearchRollup.keyword, JobSearchRollup.canton, total)
+            .join(keywords, keywords.c.keyword == JobSearchRollup.keyword)
+            .filter(*in_window)
+            .group_by(JobSearchRollup.keyword, JobSearchRollup.canton)
+            .all()
+        )
+    return [(r[0], r[1] or None, int(r[2])) for r in rows]
+
+
+class Suggester:
+    """
+    Serves /jobs/suggest from a ``SuggestIndex`` that a background loop rebuilds
+    every ``refresh_sec`` from the search rollups. A rebuilt index replaces the old
+    one with a single reference swap; lookups never touch the database. Keywords
+    searched fewer than ``min_count`` times are left out, so one-off (possibly
+    personal) queries are never suggested to others.
+    """
+
+    def __init__(self, refresh_sec: float, window_days: int, min_count: int, max_keywords: int) -> None:
+        self.refresh_sec = refresh_sec
+        self.window_days = window_days
+        self.min_count = min_count
+        self.max_keywords = max_keywords
+        self.index = SuggestIndex([])
+        self.built_at: Optional[datetime] = None
+
+    def suggest(self, prefix: str, canton: Optional[str] = None, limit: int = 10) -> List[Tuple[str, int]]:
+        return self.index.lookup(prefix, canton, limit)
+
+    def rebuild(self) -> int:
+        index = SuggestIndex(load_counts(self.window_days, self.min_count, self.max_keywords))
+        self.index = index
+        self.built_at = datetime.now(timezone.utc)
+        return len(index)
+
+    async def run_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.rebuild)
+            except Exception:
+                # keep serving the previous index
+                pass
+            await asyncio.sleep(self.refresh_sec)
+
+
+suggester = Suggester(
+    refresh_sec=float(os.getenv("JOBS_SUGGEST_REFRESH_SEC", "600")),
+    window_days=int(os.getenv("JOBS_SUGGEST_WINDOW_DAYS", "30")),
+    min_count=int(os.getenv("JOBS_SUGGEST_MIN_COUNT", "2")),
+    max_keywords=int(os.getenv("JOBS_SUGGEST_MAX_KEYWORDS", "50000")),
+)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from ..core.database import SessionLocal
+from ..core.http import HTTPClients
+from .job_index import indexed_search
+from .job_rollups import top_keywords
+from .jobs_cache import SearchCache, partial_result_ttl, search_cache, search_key
+from .loop_lease import LoopLease, loop_lease_sec, run_leased
+from .provider_budget import OK, ProviderBudget, rapidapi_budget
+
+
+class CacheWarmer:
+    """
+    Keeps the most searched queries in the /jobs/search cache.
+
+    Each pass reads the ``top_n`` most searched ``(keyword, canton)`` pairs of the
+    last ``window`` from the search rollups and re-fetches the first page of every
+    pair that is missing from the cache or turns stale within ``lead_sec``, so
+    users don't wait for providers after a deploy or a cache flush. Answers go
+    through ``indexed_search``, so live results also land in the index. At most
+    ``concurrency`` fetches run at once. Warming is optional traffic: a pass stops
+    as soon as the RapidAPI budget is no longer OK.
+    """
+
+    def __init__(self, top_n: int, window: str, per_page: int, lead_sec: float, interval_sec: float, concurrency: int, cache: SearchCache = search_cache, budget: ProviderBudget = rapidapi_budget) -> None:
+        self.top_n = top_n
+        self.window = window
+        self.per_page = per_page
+        self.lead_sec = lead_sec
+        self.interval_sec = interval_sec
+        self.concurrency = concurrency
+        self.cache = cache
+        self.budget = budget
+        self.last_run_at: Optional[datetime] = None
+        self._counters: Dict[str, int] = {"runs": 0, "warmed": 0, "fresh": 0, "errors": 0, "over_budget": 0}
+
+    def popular(self) -> List[Tuple[str, Optional[str]]]:
+        with SessionLocal() as db:
+            rows = top_keywords(db, self.window, self.top_n)
+        return [(keyword, canton) for keyword, canton, _ in rows if keyword]
+
+    async def warm_once(self, clients: Optional[HTTPClients] = None) -> Dict[str, int]:
+        pairs = await asyncio.to_thread(self.popular)
+        gate = asyncio.Semaphore(self.concurrency)
+        stats = {"queries": len(pairs), "warmed": 0, "fresh": 0, "errors": 0, "over_budget": 0}
+
+        async def warm(q: str, canton: Optional[str]) -> None:
+            key = search_key(q, canton, 1, self.per_page)
+            remaining = self.cache.expires_in(key)
+            if remaining is not None and remaining > self.lead_sec:
+                stats["fresh"] += 1
+                return
+            async with gate:
+                # checked per query: the budget may drop while the pass runs
+                if self.budget.level() != OK:
+                    stats["over_budget"] += 1
+                    return
+                try:
+                    await self.cache.warm(
+                        key,
+                        lambda: indexed_search(q=q, canton=canton, page=1, per_page=self.per_page, clients=clients),
+                        ttl_for=partial_result_ttl,
+                    )
+                    stats["warmed"] += 1
+                except Exception:
+                    stats["errors"] += 1
+
+        # most searched first: a pass cut short by the budget has warmed the ones that matter
+        await asyncio.gather(*(warm(q, canton) for q, canton in pairs))
+        self._counters["runs"] += 1
+        for name in ("warmed", "fresh", "errors", "over_budget"):
+            self._counters[name] += stats[name]
+        self.last_run_at = datetime.now(timezone.utc)
+        return stats
+
+    async def run_loop(self) -> None:
+        # every worker starts the loop; the lease makes one of them spend quota on warming,
+        # the others get the results through the index it writes back to
+        await run_leased(
+            LoopLease("jobs_warm", loop_lease_sec(self.interval_sec)),
+            self.interval_sec,
+            self.warm_once,
+            # let the app come up and answer its first requests before warming
+            first_delay_sec=float(os.getenv("JOBS_WARM_STARTUP_DELAY_SEC", "5")),
+        )
+
+    def stats(self) -> Dict[str, object]:
+        return {**self._counters, "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None}
+
+
+cache_warmer = CacheWarmer(
+    top_n=int(os.getenv("JOBS_WARM_TOP_N", "50")),
+    window=os.getenv("JOBS_WARM_WINDOW", "24h"),
+    per_page=int(os.getenv("JOBS_WARM_PER_PAGE", "20")),
+    lead_sec=float(os.getenv("JOBS_WARM_LEAD_SEC", "120")),
+    interval_sec=float(os.getenv("JOBS_WARM_INTERVAL_SEC", "60")),
+    concurrency=int(os.getenv("JOBS_WARM_CONCURRENCY", "2")),
+)
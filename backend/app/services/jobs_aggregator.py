@@ -1,322 +1,746 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
+import heapq
+import json
 import os
-from typing import List, Dict, Tuple, Any
-from datetime import datetime
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Dict, Tuple, Any
+from datetime import datetime, timezone
 import httpx
 
+from ..core.circuit import breakers
+from ..core.http import HTTPClients, http_clients
 from ..schemas.job import JobItem
+from .job_dedup import Deduper, dedupe
+from .job_records import JobRecord, to_items
+from .provider_budget import EXHAUSTED, OK, BudgetExhausted, rapidapi_budget
+from .provider_variants import variant_key, variant_memory
 
 
-def _parse_indeed(item: dict, canton: str | None) -> JobItem | None:
-    try:
-        job_id = str(item.get("jobkey") or item.get("id") or item.get("job_id") or item.get("jobKey") or "")
-        if not job_id:
-            return None
-        return JobItem(
-            id=f"indeed:{job_id}",
-            source="indeed",
-            title=item.get("title") or "",
-            company=item.get("company") or item.get("employer_name"),
-            location=item.get("location") or item.get("city") or "Switzerland",
-            canton=canton,
-            url=item.get("url") or item.get("job_url") or "",
-            posted_at=_parse_date(item.get("date") or item.get("published_at")),
-            employment_type=item.get("employment_type"),
-            salary=(item.get("salary") or item.get("salary_info")),
-            snippet=item.get("snippet") or item.get("description_snippet"),
-        )
-    except Exception:
+def _str(value: Any) -> str | None:
+    # JobItem fields are strings; providers sometimes send numbers (salaries, ids)
+    if isinstance(value, str):
+        return value or None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _parse_indeed(item: Any, canton: str | None) -> JobRecord | None:
+    # one malformed record is skipped, it must not fail the provider's whole page
+    if not isinstance(item, dict):
         return None
+    job_id = _str(item.get("jobkey") or item.get("id") or item.get("job_id") or item.get("jobKey"))
+    if not job_id:
+        return None
+    return JobRecord(
+        id=f"indeed:{job_id}",
+        source="indeed",
+        title=_str(item.get("title")) or "",
+        company=_str(item.get("company") or item.get("employer_name")),
+        location=_str(item.get("location") or item.get("city")) or "Switzerland",
+        canton=canton,
+        url=_str(item.get("url") or item.get("job_url")) or "",
+        posted_at=_parse_date(item.get("date") or item.get("published_at")),
+        employment_type=_str(item.get("employment_type")),
+        salary=_str(item.get("salary") or item.get("salary_info")),
+        snippet=_str(item.get("snippet") or item.get("description_snippet")),
+    )
 
 
-def _parse_rav(item: dict) -> JobItem | None:
-    try:
-        job_id = str(item.get("id") or item.get("externalId") or "")
-        if not job_id:
-            return None
-        company = None
-        if isinstance(item.get("company"), dict):
-            company = item["company"].get("name") or item["company"].get("displayName")
-        return JobItem(
-            id=f"rav:{job_id}",
-            source="rav",
-            title=item.get("title") or "",
-            company=company,
-            location=(item.get("workplace") or {}).get("city") if isinstance(item.get("workplace"), dict) else None,
-            canton=(item.get("workplace") or {}).get("canton") if isinstance(item.get("workplace"), dict) else None,
-            url=item.get("jobAdvertisementUrl") or item.get("url") or "",
-            posted_at=_parse_date(item.get("publicationDate") or item.get("createdDate")),
-            employment_type=(item.get("employment") or {}).get("workloadPeriod"),
-            salary=None,
-            snippet=(item.get("description") or "")[:280] if isinstance(item.get("description"), str) else None,
-        )
-    except Exception:
+def _parse_rav(item: Any) -> JobRecord | None:
+    if not isinstance(item, dict):
         return None
+    job_id = _str(item.get("id") or item.get("externalId"))
+    if not job_id:
+        return None
+    company = item.get("company")
+    workplace = item.get("workplace")
+    employment = item.get("employment")
+    description = item.get("description")
+    return JobRecord(
+        id=f"rav:{job_id}",
+        source="rav",
+        title=_str(item.get("title")) or "",
+        company=_str(company.get("name") or company.get("displayName")) if isinstance(company, dict) else None,
+        location=_str(workplace.get("city")) if isinstance(workplace, dict) else None,
+        canton=_str(workplace.get("canton")) if isinstance(workplace, dict) else None,
+        url=_str(item.get("jobAdvertisementUrl") or item.get("url")) or "",
+        posted_at=_parse_date(item.get("publicationDate") or item.get("createdDate")),
+        employment_type=_str(employment.get("workloadPeriod")) if isinstance(employment, dict) else None,
+        snippet=description[:280] if isinstance(description, str) else None,
+    )
 
 
-def _parse_jsearch(item: dict, canton: str | None) -> JobItem | None:
-    try:
-        job_id = str(item.get("job_id") or item.get("id") or "")
-        if not job_id:
-            return None
-        # Posted at (timestamp or ISO)
-        posted_at = None
-        ts = item.get("job_posted_at_timestamp")
-        if isinstance(ts, (int, float)):
-            try:
-                posted_at = datetime.utcfromtimestamp(int(ts))
-            except Exception:
-                posted_at = None
-        if not posted_at:
-            posted_at = _parse_date(item.get("job_posted_at_datetime_utc"))
-        # Build display location
-        city = item.get("job_city")
-        state = item.get("job_state")
-        country = item.get("job_country")
-        location = ", ".join([x for x in [city, state, country] if x])
-        return JobItem(
-            id=f"jsearch:{job_id}",
-            source="jsearch",
-            title=item.get("job_title") or "",
-            company=item.get("employer_name"),
-            location=location or country or "Switzerland",
-            canton=canton,
-            url=item.get("job_apply_link") or item.get("job_apply_url") or item.get("job_apply_link"),
-            posted_at=posted_at,
-            employment_type=item.get("job_employment_type"),
-            salary=item.get("job_salary") or item.get("job_min_salary"),
-            snippet=(item.get("job_description") or "")[:280] if isinstance(item.get("job_description"), str) else None,
-        )
-    except Exception:
+def _parse_jsearch(item: Any, canton: str | None) -> JobRecord | None:
+    if not isinstance(item, dict):
         return None
+    job_id = _str(item.get("job_id") or item.get("id"))
+    url = _str(item.get("job_apply_link") or item.get("job_apply_url"))
+    if not job_id or not url:
+        return None
+    # Posted at (timestamp or ISO)
+    posted_at = None
+    ts = item.get("job_posted_at_timestamp")
+    if isinstance(ts, (int, float)) and 0 < ts < 32503680000:
+        posted_at = datetime.utcfromtimestamp(int(ts))
+    if not posted_at:
+        posted_at = _parse_date(item.get("job_posted_at_datetime_utc"))
+    # Build display location
+    country = _str(item.get("job_country"))
+    location = ", ".join([x for x in (_str(item.get("job_city")), _str(item.get("job_state")), country) if x])
+    description = item.get("job_description")
+    return JobRecord(
+        id=f"jsearch:{job_id}",
+        source="jsearch",
+        title=_str(item.get("job_title")) or "",
+        company=_str(item.get("employer_name")),
+        location=location or "Switzerland",
+        canton=canton,
+        url=url,
+        posted_at=posted_at,
+        employment_type=_str(item.get("job_employment_type")),
+        salary=_str(item.get("job_salary") or item.get("job_min_salary")),
+        snippet=description[:280] if isinstance(description, str) else None,
+    )
 
 
 def _parse_date(value) -> datetime | None:
+    """Naive UTC datetime from the ISO-ish strings the providers send."""
     if not value:
         return None
     if isinstance(value, datetime):
         return value
-    for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%d"):
-        try:
-            return datetime.strptime(str(value), fmt)
-        except Exception:
+    text = str(value)
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        parsed = None
+        for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ"):
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is not None and parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# Sentinel values reported in ``sources`` for providers that returned no count
+SOURCE_FAILED = -1
+SOURCE_TIMED_OUT = -2
+SOURCE_SKIPPED = -3
+SOURCE_OVER_BUDGET = -4
+
+# Providers that spend the RapidAPI quota (see provider_budget.py)
+RAPIDAPI_PROVIDERS = ("jsearch", "indeed")
+
+CANTON_NAMES = {
+    "ZH": "Zurich", "BE": "Bern", "LU": "Lucerne", "UR": "Uri", "SZ": "Schwyz",
+    "OW": "Obwalden", "NW": "Nidwalden", "GL": "Glarus", "ZG": "Zug", "FR": "Fribourg",
+    "SO": "Solothurn", "BS": "Basel", "BL": "Basel-Landschaft", "SH": "Schaffhausen",
+    "AR": "Appenzell Ausserrhoden", "AI": "Appenzell Innerrhoden", "SG": "St. Gallen",
+    "GR": "Grisons", "AG": "Aargau", "TG": "Thurgau", "TI": "Ticino", "VD": "Vaud",
+    "VS": "Valais", "NE": "Neuchâtel", "GE": "Geneva", "JU": "Jura",
+}
+
+
+def _provider_timeout() -> float:
+    return float(os.getenv("JOBS_PROVIDER_TIMEOUT_SEC", "6"))
+
+
+def _page_timeout() -> float:
+    # well inside the provider deadline, whose clock started earlier (budget, breaker):
+    # pages that arrived are kept instead of losing them all to the outer timeout
+    default = _provider_timeout() * 0.75
+    return min(float(os.getenv("JOBS_PAGE_TIMEOUT_SEC", str(default))), default)
+
+
+def _search_budget() -> float:
+    return float(os.getenv("JOBS_SEARCH_BUDGET_SEC", "8"))
+
+
+def _jsearch_pages(per_page: int) -> int:
+    # JSearch serves 10 items per page
+    return max(1, min(5, (per_page + 9) // 10))
+
+
+class PageRun(list):
+    """
+    Records of consecutive provider pages in page order, each page newest first.
+
+    ``sizes`` counts the records of every page of the unbroken run that starts at the
+    requested page; records of pages that arrived after a missing one follow them.
+    Cursors only consume the run (``unbroken``) and address it as (page, offset), so a
+    page that missed its deadline is requested again instead of being skipped.
+    """
+
+    def __init__(self, records: List[JobRecord], sizes: List[int]) -> None:
+        super().__init__(records)
+        self.sizes = sizes
+
+    def unbroken(self) -> List[JobRecord]:
+        return self[:sum(self.sizes)]
+
+
+def _rapid_key() -> str | None:
+    return os.getenv("RAPIDAPI_KEY") or os.getenv("RAPID_API_KEY") or os.getenv("INDEED_RAPIDAPI_KEY")
+
+
+async def _fetch_jsearch(client: httpx.AsyncClient, rapid_key: str, host: str, q: str | None, canton: str | None, page: int, per_page: int, debug_info: Dict[str, Any] | None) -> PageRun | None:
+    """
+    JSearch (jsearch.p.rapidapi.com) returns 10 items per page; the pages needed to
+    fill ``per_page`` are requested concurrently from ``page`` on and whatever arrives
+    within ``_page_timeout()`` (shorter than the provider deadline) is kept, in page
+    order and untruncated. None when no page could be fetched.
+    """
+    # JSearch wants location inside query string + country code separately
+    city = CANTON_NAMES.get((canton or "").upper())
+    base_query = (q or "jobs").strip()
+    query = f"{base_query} in {city}" if city else f"{base_query} in Switzerland"
+    pages_needed = _jsearch_pages(per_page)
+    if rapidapi_budget.level() != OK:
+        # quota running low: one page per chunk instead of filling it
+        pages_needed = 1
+    pages_needed = await rapidapi_budget.acquire(pages_needed, partial=True)
+    if not pages_needed:
+        raise BudgetExhausted(rapidapi_budget.name)
+    headers = {
+        "x-rapidapi-key": rapid_key,
+        "x-rapidapi-host": host,
+        "Accept": "application/json",
+    }
+    url = f"https://{host}/search"
+
+    async def fetch_page(p: int) -> List[JobRecord] | None:
+        params = {
+            "query": query,
+            "page": str(p),
+            "num_pages": "1",
+            "country": "ch",
+            "date_posted": "all",
+        }
+        resp = await client.get(url, params=params, headers=headers)
+        if debug_info is not None:
+            snippet = "" if resp.status_code == 200 else resp.text[:220]
+            debug_info["indeed"].append({"host": host, "url": url, "params": params, "status": resp.status_code, "body": snippet})
+        if resp.status_code != 200:
+            return None
+        data = resp.json()
+        raw = data.get("data") if isinstance(data, dict) else None
+        if not isinstance(raw, list):
+            return None
+        return [it for it in (_parse_jsearch(r, canton) for r in raw) if it]
+
+    tasks = [asyncio.create_task(fetch_page(p)) for p in range(page, page + pages_needed)]
+    await asyncio.wait(tasks, timeout=_page_timeout())
+    pages: List[List[JobRecord] | None] = []
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+            pages.append(None)
+        elif task.cancelled() or task.exception() is not None:
+            pages.append(None)
+        else:
+            pages.append(task.result())
+    if all(p is None for p in pages):
+        return None
+    records: List[JobRecord] = []
+    sizes: List[int] = []
+    broken = False
+    for got in pages:
+        if got is None:
+            broken = True
             continue
-    return None
+        if not broken:
+            sizes.append(len(got))
+        records.extend(_newest_first(got))
+    return PageRun(records, sizes)
+
+
+async def _fetch_indeed(client: httpx.AsyncClient, rapid_key: str, hosts: List[str], q: str | None, canton: str | None, page: int, per_page: int, debug_info: Dict[str, Any] | None) -> List[JobRecord] | None:
+    """
+    Try a few common endpoint/param variants used by different Indeed RapidAPI packs.
+    Variants are probed one by one (first 200 with items wins) so a single search never
+    spends more than one successful call of quota. The order is learned per host by
+    ``variant_memory``, so the variant that worked last time is tried first.
+
+    Indeed has no "last page" marker: an empty 200 from a variant that has returned
+    items before means the results ran out and ends the probing. Returns [] when
+    some variant answered with an empty list and None if nothing succeeded.
+    """
+    await variant_memory.load_if_stale()
+    location_text = f"{CANTON_NAMES.get((canton or '').upper(), (canton or '').upper() or 'Switzerland')}, Switzerland".strip(", ")
+    query = (q or "").strip() or "a"  # fallback to broad match to fetch any listings
+    if rapidapi_budget.level() != OK:
+        # quota running low: no quota for the fallback hosts
+        hosts = hosts[:1]
+    spent = False
+    empty = False
+    for host in hosts:
+        headers = {
+            "x-rapidapi-key": rapid_key,
+            "x-rapidapi-host": host,
+            "X-RapidAPI-Key": rapid_key,
+            "X-RapidAPI-Host": host,
+            "Accept": "application/json",
+        }
+        variants = []
+        if query:
+            variants.extend([
+                (f"https://{host}/jobs/search", {"query": query, "location": location_text, "country": "CH", "page_id": str(max(page, 1))}),
+                (f"https://{host}/jobs/search", {"q": query, "location": location_text, "country": "CH", "page": str(max(page, 1))}),
+                (f"https://{host}/search", {"query": query, "location": location_text, "country": "CH", "page": str(max(page, 1))}),
+                (f"https://{host}/search", {"q": query, "l": location_text, "page": str(max(page, 1))}),
+                (f"https://{host}/jobs/search", {"query": query, "location": location_text, "page": str(max(page, 1))}),
+                (f"https://{host}/search", {"q": query, "l": location_text, "page": str(max(page, 1))}),
+                (f"https://{host}/search", {"q": query, "l": location_text, "co": "ch", "start": str((max(page, 1)-1)*per_page), "limit": str(per_page)}),
+            ])
+        else:
+            variants.extend([
+                (f"https://{host}/jobs/search", {"location": location_text, "country": "CH", "page_id": str(max(page, 1))}),
+                (f"https://{host}/jobs/search", {"location": location_text, "country": "CH", "page": str(max(page, 1))}),
+                (f"https://{host}/search", {"location": location_text, "country": "CH", "page": str(max(page, 1))}),
+                (f"https://{host}/search", {"l": location_text, "page": str(max(page, 1))}),
+                (f"https://{host}/search", {"l": location_text, "co": "ch", "start": str((max(page, 1)-1)*per_page), "limit": str(per_page)}),
+            ])
+        for url, params in variant_memory.order(host, variants):
+            key = variant_key(url, params)
+            if not await rapidapi_budget.acquire():
+                if not spent:
+                    raise BudgetExhausted(rapidapi_budget.name)
+                return None
+            spent = True
+            started = time.perf_counter()
+            try:
+                resp = await client.get(url, params=params, headers=headers)
+                if debug_info is not None:
+                    snippet = ""
+                    if resp.status_code != 200:
+                        try:
+                            snippet = resp.text[:220]
+                        except Exception:
+                            snippet = ""
+                    debug_info["indeed"].append({"host": host, "url": url, "params": params, "status": resp.status_code, "body": snippet})
+                if resp.status_code != 200:
+                    variant_memory.record(host, key, False, (time.perf_counter() - started) * 1000)
+                    continue
+                data = resp.json()
+                raw_list = (data.get("data") or data.get("jobs") or data.get("results") or data.get("items") or []) if isinstance(data, dict) else data
+                if not isinstance(raw_list, list):
+                    # some other shape: this variant doesn't fit the host
+                    variant_memory.record(host, key, False, (time.perf_counter() - started) * 1000)
+                    continue
+                parsed = [_parse_indeed(it, canton) for it in raw_list]
+                indeed_items = [p for p in parsed if p]
+                if not indeed_items and variant_memory.proven(host, key):
+                    # a variant known to work found nothing: past the last page
+                    variant_memory.record(host, key, True, (time.perf_counter() - started) * 1000)
+                    return []
+                variant_memory.record(host, key, bool(indeed_items), (time.perf_counter() - started) * 1000)
+                if indeed_items:
+                    return indeed_items
+                empty = True
+            except httpx.HTTPError:
+                variant_memory.record(host, key, False, (time.perf_counter() - started) * 1000)
+                continue
+            except ValueError:
+                # non-JSON body
+                variant_memory.record(host, key, False, (time.perf_counter() - started) * 1000)
+                continue
+    return [] if empty else None
+
+
+async def _fetch_rav(client: httpx.AsyncClient, rav_base: str, q: str | None, canton: str | None, page: int, per_page: int, debug_info: Dict[str, Any] | None) -> List[JobRecord] | None:
+    rav_token = os.getenv("RAV_API_KEY")
+    params = {
+        "query": q,
+        "workplaceCantons": canton or "",
+        "page": str(max(page - 1, 0)),
+        "size": str(per_page),
+    }
+    headers = {"Authorization": f"Bearer {rav_token}"} if rav_token else {}
+    base = rav_base.rstrip("/")
+    if base.lower().endswith("jobadvertisements"):
+        rav_url = base
+    else:
+        rav_url = f"{base}/jobAdvertisements"
+    resp = await client.get(rav_url, params=params, headers=headers)
+    if debug_info is not None:
+        debug_info["rav"].append({"url": rav_url, "params": params, "status": resp.status_code})
+    if resp.status_code != 200:
+        return None
+    data = resp.json()
+    raw_list = data.get("content") if isinstance(data, dict) else data
+    if not isinstance(raw_list, list):
+        return None
+    parsed = [_parse_rav(it) for it in raw_list]
+    return [p for p in parsed if p]
+
+
+async def _run_provider(name: str, coro: Awaitable[List[JobRecord] | None], outcomes: Dict[str, List[JobRecord] | int], debug_info: Dict[str, Any] | None) -> List[JobRecord] | None:
+    """
+    Await one provider under the per-provider deadline and record its outcome.
+    The outcome is pre-set to SOURCE_TIMED_OUT so that a provider still running when
+    the overall budget expires is reported as timed out. Providers whose circuit is
+    open are not called at all and reported as SOURCE_SKIPPED; RapidAPI providers
+    are reported as SOURCE_OVER_BUDGET once the quota is spent.
+    """
+    if name in RAPIDAPI_PROVIDERS:
+        await rapidapi_budget.load_if_stale()
+        if rapidapi_budget.level() == EXHAUSTED:
+            coro.close()
+            outcomes[name] = SOURCE_OVER_BUDGET
+            if debug_info is not None:
+                debug_info.setdefault("over_budget", []).append(name)
+            return None
+    breaker = breakers.get(name)
+    if not breaker.allow():
+        coro.close()
+        outcomes[name] = SOURCE_SKIPPED
+        if debug_info is not None:
+            debug_info.setdefault("circuit_open", []).append(name)
+        return None
+    outcomes[name] = SOURCE_TIMED_OUT
+    started = time.perf_counter()
+    try:
+        items = await asyncio.wait_for(coro, timeout=_provider_timeout())
+    except asyncio.TimeoutError:
+        breaker.record(False, (time.perf_counter() - started) * 1000)
+        if debug_info is not None:
+            debug_info.setdefault("timed_out", []).append(name)
+        return None
+    except asyncio.CancelledError:
+        # cut off by the search budget: counts against the provider like a timeout
+        breaker.record(False, (time.perf_counter() - started) * 1000)
+        raise
+    except BudgetExhausted:
+        # denied before any request went out: says nothing about the provider's health
+        breaker.release()
+        outcomes[name] = SOURCE_OVER_BUDGET
+        if debug_info is not None:
+            debug_info.setdefault("over_budget", []).append(name)
+        return None
+    except Exception:
+        breaker.record(False, (time.perf_counter() - started) * 1000)
+        outcomes[name] = SOURCE_FAILED
+        return None
+    breaker.record(items is not None, (time.perf_counter() - started) * 1000)
+    outcomes[name] = items if items is not None else SOURCE_FAILED
+    return items
+
+
+def _provider_calls(q: str | None, canton: str | None, per_page: int, clients: HTTPClients, dbg: Dict[str, Any] | None) -> Dict[str, Callable[[int], Awaitable[List[JobRecord] | None]]]:
+    """
+    Configured providers as ``chunk -> coroutine`` factories. A chunk is the provider
+    page that holds about ``per_page`` items, so cursors can address each provider
+    independently; for JSearch it is its own 10-item page, and one call returns the
+    run of pages starting there that fills ``per_page``.
+    """
+    calls: Dict[str, Callable[[int], Awaitable[List[JobRecord] | None]]] = {}
+    rapid_key = _rapid_key()
+    if rapid_key:
+        client = clients.get("rapidapi")
+        primary_host = os.getenv("RAPIDAPI_HOST") or "indeed-api.p.rapidapi.com"
+        alt_hosts = [primary_host]
+        # Fallback to the stable package if a custom host is set
+        if primary_host != "indeed-api.p.rapidapi.com":
+            alt_hosts.append("indeed-api.p.rapidapi.com")
+        if "jsearch" in primary_host:
+            calls["jsearch"] = lambda chunk: _fetch_jsearch(client, rapid_key, primary_host, q, canton, chunk + 1, per_page, dbg)
+        calls["indeed"] = lambda chunk: _fetch_indeed(client, rapid_key, alt_hosts, q, canton, chunk + 1, per_page, dbg)
+
+    # RAV Job-Room (optional)
+    rav_base = os.getenv("RAV_API_URL")
+    if rav_base:
+        calls["rav"] = lambda chunk: _fetch_rav(clients.get("rav"), rav_base, q, canton, chunk + 1, per_page, dbg)
+    return calls
+
+
+def _default_groups(calls: Dict[str, Any]) -> List[List[str]]:
+    # JSearch first; the Indeed variants are only a fallback when it yields nothing
+    rapidapi = [name for name in ("jsearch", "indeed") if name in calls]
+    return [g for g in (rapidapi, ["rav"] if "rav" in calls else []) if g]
+
+
+async def _fan_out(calls: Dict[str, Callable[[int], Awaitable[List[JobRecord] | None]]], groups: List[List[str]], chunks: Dict[str, int], dbg: Dict[str, Any] | None, on_items: Callable[[str, List[JobRecord]], None] | None = None) -> Dict[str, List[JobRecord] | int]:
+    """
+    Run provider groups concurrently under JOBS_SEARCH_BUDGET_SEC. Members of a group
+    run in order and the group stops at the first member that returns items.
+    ``on_items`` is called as soon as a provider delivers a non-empty result.
+    """
+    outcomes: Dict[str, List[JobRecord] | int] = {}
+
+    async def chain(names: List[str]) -> None:
+        for name in names:
+            items = await _run_provider(name, calls[name](chunks[name]), outcomes, dbg)
+            if items:
+                if on_items is not None:
+                    on_items(name, items)
+                return
+
+    tasks = [asyncio.create_task(chain(g)) for g in groups if g]
+    try:
+        if tasks:
+            await asyncio.wait(tasks, timeout=_search_budget())
+    finally:
+        # budget spent or the caller was cancelled: the provider calls must not outlive the fan-out
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    return outcomes
+
+
+def _recency(item: JobItem | JobRecord) -> float:
+    if item.posted_at is None:
+        return float("-inf")
+    posted = item.posted_at if item.posted_at.tzinfo else item.posted_at.replace(tzinfo=timezone.utc)
+    return posted.timestamp()
+
+
+def _newest_first(items: List[Any]) -> List[Any]:
+    # Deterministic order, so a cursor offset points at the same item when a chunk is re-fetched
+    return sorted(items, key=lambda x: (-_recency(x), x.id))
+
+
+def _source_counts(outcomes: Dict[str, List[JobRecord] | int]) -> Dict[str, int]:
+    return {name: len(o) if isinstance(o, list) else o for name, o in outcomes.items()}
 
 
-async def search_jobs(q: str | None, canton: str | None, page: int, per_page: int, debug: bool = False) -> Tuple[List[JobItem], Dict[str, int], Dict[str, Any]]:
+async def search_jobs(q: str | None, canton: str | None, page: int, per_page: int, debug: bool = False, clients: HTTPClients | None = None) -> Tuple[List[JobItem], Dict[str, int], Dict[str, Any]]:
     """
-    Fetch jobs from Indeed RapidAPI and optionally RAV Job-Room API, merge and sort by date desc.
+    Fetch jobs from Indeed/JSearch RapidAPI and optionally RAV Job-Room API concurrently,
+    merge, sort by date desc and collapse postings listed by several providers.
+
+    Each provider runs under JOBS_PROVIDER_TIMEOUT_SEC and the whole fan-out under
+    JOBS_SEARCH_BUDGET_SEC; providers that miss their deadline are reported in
+    ``sources`` as SOURCE_TIMED_OUT and the results that did arrive are returned.
+    Requests go through the shared pooled clients unless ``clients`` is given.
+
+    ``page`` selects the same chunk of every provider; use ``search_jobs_page`` to
+    walk the merged result set without gaps or duplicates.
     """
-    items: List[JobItem] = []
-    source_counts: Dict[str, int] = {}
+    clients = clients or http_clients
     debug_info: Dict[str, Any] = {"indeed": [], "rav": []} if debug else {}
+    dbg = debug_info if debug else None
+    calls = _provider_calls(q, canton, per_page, clients, dbg)
+    chunks = {name: max(page, 1) - 1 for name in calls}
+    if "jsearch" in chunks:
+        chunks["jsearch"] *= _jsearch_pages(per_page)
+    outcomes = await _fan_out(calls, _default_groups(calls), chunks, dbg)
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        # Indeed (RapidAPI)
-        rapid_key = os.getenv("RAPIDAPI_KEY") or os.getenv("RAPID_API_KEY") or os.getenv("INDEED_RAPIDAPI_KEY")
-        if rapid_key:
-            primary_host = os.getenv("RAPIDAPI_HOST") or "indeed-api.p.rapidapi.com"
-            alt_hosts = [primary_host]
-            # Fallback to the stable package if a custom host is set
-            if primary_host != "indeed-api.p.rapidapi.com":
-                alt_hosts.append("indeed-api.p.rapidapi.com")
-            # JSearch (jsearch.p.rapidapi.com) - special handling
-            if "jsearch" in primary_host:
-                try:
-                    # JSearch wants location inside query string + country code separately
-                    canton_map = {
-                        "ZH": "Zurich", "BE": "Bern", "LU": "Lucerne", "UR": "Uri", "SZ": "Schwyz",
-                        "OW": "Obwalden", "NW": "Nidwalden", "GL": "Glarus", "ZG": "Zug", "FR": "Fribourg",
-                        "SO": "Solothurn", "BS": "Basel", "BL": "Basel-Landschaft", "SH": "Schaffhausen",
-                        "AR": "Appenzell Ausserrhoden", "AI": "Appenzell Innerrhoden", "SG": "St. Gallen",
-                        "GR": "Grisons", "AG": "Aargau", "TG": "Thurgau", "TI": "Ticino", "VD": "Vaud",
-                        "VS": "Valais", "NE": "Neuchâtel", "GE": "Geneva", "JU": "Jura",
-                    }
-                    city = canton_map.get((canton or "").upper())
-                    base_query = (q or "jobs").strip()
-                    if city:
-                        query = f"{base_query} in {city}"
-                    else:
-                        query = f"{base_query} in Switzerland"
-                    # Fetch multiple pages to reach per_page items (JSearch: 10 per page)
-                    page_size = 10
-                    pages_needed = max(1, min(5, (per_page + page_size - 1) // page_size))
-                    total_added = 0
-                    for p in range(page, page + pages_needed):
-                        params = {
-                            "query": query,
-                            "page": str(p),
-                            "num_pages": "1",
-                            "country": "ch",
-                            "date_posted": "all",
-                        }
-                        headers = {
-                            "x-rapidapi-key": rapid_key,
-                            "x-rapidapi-host": primary_host,
-                            "Accept": "application/json",
-                        }
-                        url = f"https://{primary_host}/search"
-                        resp = await client.get(url, params=params, headers=headers)
-                        if debug:
-                            try:
-                                snippet = "" if resp.status_code == 200 else resp.text[:220]
-                                debug_info["indeed"].append({"host": primary_host, "url": url, "params": params, "status": resp.status_code, "body": snippet})
-                            except Exception:
-                                pass
-                        if resp.status_code != 200:
-                            continue
-                        data = resp.json()
-                        raw = data.get("data") or []
-                        parsed = [_parse_jsearch(it, canton) for it in raw]
-                        j_items = [p for p in parsed if p]
-                        if j_items:
-                            for it in j_items:
-                                items.append(it)
-                                total_added += 1
-                                if total_added >= per_page:
-                                    break
-                            if total_added >= per_page:
-                                break
-                    source_counts["jsearch"] = total_added
-                    if total_added > 0:
-                        # we consider success and skip other hosts
-                        alt_hosts = []
-                except Exception:
-                    # swallow and continue to generic hosts
-                    pass
-
-            # Try a few common endpoint/param variants used by different Indeed RapidAPI packs
-            canton_map = {
-                "ZH": "Zurich",
-                "BE": "Bern",
-                "LU": "Lucerne",
-                "UR": "Uri",
-                "SZ": "Schwyz",
-                "OW": "Obwalden",
-                "NW": "Nidwalden",
-                "GL": "Glarus",
-                "ZG": "Zug",
-                "FR": "Fribourg",
-                "SO": "Solothurn",
-                "BS": "Basel",
-                "BL": "Basel-Landschaft",
-                "SH": "Schaffhausen",
-                "AR": "Appenzell Ausserrhoden",
-                "AI": "Appenzell Innerrhoden",
-                "SG": "St. Gallen",
-                "GR": "Grisons",
-                "AG": "Aargau",
-                "TG": "Thurgau",
-                "TI": "Ticino",
-                "VD": "Vaud",
-                "VS": "Valais",
-                "NE": "Neuchâtel",
-                "GE": "Geneva",
-                "JU": "Jura",
-            }
-            location_text = f"{canton_map.get((canton or '').upper(), (canton or '').upper() or 'Switzerland')}, Switzerland".strip(", ")
-            query = (q or "").strip() or "a"  # fallback to broad match to fetch any listings
-            success = False
-            for host in alt_hosts:
-                headers = {
-                    "x-rapidapi-key": rapid_key,
-                    "x-rapidapi-host": host,
-                    "X-RapidAPI-Key": rapid_key,
-                    "X-RapidAPI-Host": host,
-                    "Accept": "application/json",
-                }
-                variants = []
-                if query:
-                    variants.extend([
-                        (f"https://{host}/jobs/search", {"query": query, "location": location_text, "country": "CH", "page_id": str(max(page, 1))}),
-                        (f"https://{host}/jobs/search", {"q": query, "location": location_text, "country": "CH", "page": str(max(page, 1))}),
-                        (f"https://{host}/search", {"query": query, "location": location_text, "country": "CH", "page": str(max(page, 1))}),
-                        (f"https://{host}/search", {"q": query, "l": location_text, "page": str(max(page, 1))}),
-                        (f"https://{host}/jobs/search", {"query": query, "location": location_text, "page": str(max(page, 1))}),
-                        (f"https://{host}/search", {"q": query, "l": location_text, "page": str(max(page, 1))}),
-                        (f"https://{host}/search", {"q": query, "l": location_text, "co": "ch", "start": str((max(page, 1)-1)*per_page), "limit": str(per_page)}),
-                    ])
-                else:
-                    variants.extend([
-                        (f"https://{host}/jobs/search", {"location": location_text, "country": "CH", "page_id": str(max(page, 1))}),
-                        (f"https://{host}/jobs/search", {"location": location_text, "country": "CH", "page": str(max(page, 1))}),
-                        (f"https://{host}/search", {"location": location_text, "country": "CH", "page": str(max(page, 1))}),
-                        (f"https://{host}/search", {"l": location_text, "page": str(max(page, 1))}),
-                        (f"https://{host}/search", {"l": location_text, "co": "ch", "start": str((max(page, 1)-1)*per_page), "limit": str(per_page)}),
-                    ])
-                for url, params in variants:
-                    try:
-                        resp = await client.get(url, params=params, headers=headers)
-                        if debug:
-                            try:
-                                snippet = ""
-                                if resp.status_code != 200:
-                                    try:
-                                        snippet = resp.text[:220]
-                                    except Exception:
-                                        snippet = ""
-                                debug_info["indeed"].append({"host": host, "url": url, "params": params, "status": resp.status_code, "body": snippet})
-                            except Exception:
-                                pass
-                        if resp.status_code != 200:
-                            continue
-                        data = resp.json()
-                        raw_list = data.get("data") or data.get("jobs") or data.get("results") or data.get("items") or []
-                        parsed = [_parse_indeed(it, canton) for it in raw_list]
-                        indeed_items = [p for p in parsed if p]
-                        if indeed_items:
-                            items.extend(indeed_items)
-                            source_counts["indeed"] = len(indeed_items)
-                            success = True
-                            break
-                    except Exception:
-                        continue
-                if success:
-                    break
-            if not success:
-                # mark as attempted so clients don't assume "not configured"
-                source_counts["indeed"] = -1
-
-        # RAV Job-Room (optional)
-        rav_base = os.getenv("RAV_API_URL")
-        rav_token = os.getenv("RAV_API_KEY")
-        if rav_base:
-            try:
-                params = {
-                    "query": q,
-                    "workplaceCantons": canton or "",
-                    "page": str(max(page - 1, 0)),
-                    "size": str(per_page),
-                }
-                headers = {"Authorization": f"Bearer {rav_token}"} if rav_token else {}
-                base = rav_base.rstrip("/")
-                if base.lower().endswith("jobadvertisements"):
-                    rav_url = base
-                else:
-                    rav_url = f"{base}/jobAdvertisements"
-                resp = await client.get(rav_url, params=params, headers=headers)
-                if debug:
-                    try:
-                        debug_info["rav"].append({"url": rav_url, "params": params, "status": resp.status_code})
-                    except Exception:
-                        pass
-                if resp.status_code == 200:
-                    data = resp.json()
-                    raw_list = data.get("content") if isinstance(data, dict) else data
-                    if isinstance(raw_list, list):
-                        parsed = [_parse_rav(it) for it in raw_list]
-                        rav_items = [p for p in parsed if p]
-                        items.extend(rav_items)
-                        source_counts["rav"] = len(rav_items)
-            except Exception:
-                pass
-
-    # Normalize, sort, paginate
-    items.sort(key=lambda x: x.posted_at or datetime.min, reverse=True)
-    start = (page - 1) * per_page
-    end = start + per_page
-    return items[start:end], source_counts, debug_info
+    records: List[JobRecord] = []
+    for outcome in outcomes.values():
+        if isinstance(outcome, list):
+            records.extend(outcome)
+    return to_items(dedupe(_newest_first(records))[:per_page]), _source_counts(outcomes), debug_info
+
+
+def _cursor_hash(q: str | None, canton: str | None, per_page: int) -> str:
+    norm = "|".join([" ".join((q or "").lower().split()), (canton or "").strip().upper(), str(per_page)])
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(q: str | None, canton: str | None, per_page: int, **state: Any) -> str:
+    payload = {"v": 1, "h": _cursor_hash(q, canton, per_page), **state}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, q: str | None, canton: str | None, per_page: int) -> Dict[str, Any]:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed or foreign cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except Exception as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(payload, dict) or payload.get("v") != 1:
+        raise ValueError("Malformed cursor")
+    if payload.get("h") != _cursor_hash(q, canton, per_page):
+        raise ValueError("Cursor does not belong to this search")
+    payload.pop("v")
+    payload.pop("h")
+    return payload
+
+
+async def search_jobs_page(q: str | None, canton: str | None, per_page: int, cursor: str | None = None, debug: bool = False, clients: HTTPClients | None = None) -> Tuple[List[JobItem], Dict[str, int], Dict[str, Any], str | None]:
+    """
+    One page of the k-way merge (newest first) of all providers.
+
+    The cursor stores, per provider, the chunk being consumed, how many of its items
+    were already returned and whether the provider is exhausted; a JSearch position
+    is a page and an offset into it, so no item is cut off between chunks. Each page fetches the
+    current chunk of every live provider once, merges them through a heap and only
+    fetches a provider's next chunk when its buffer runs dry (at most
+    JOBS_CURSOR_MAX_ROUNDS extra rounds). Returns ``(items, sources, debug, next_cursor)``.
+    """
+    clients = clients or http_clients
+    debug_info: Dict[str, Any] = {"indeed": [], "rav": []} if debug else {}
+    dbg = debug_info if debug else None
+    calls = _provider_calls(q, canton, per_page, clients, dbg)
+    max_rounds = int(os.getenv("JOBS_CURSOR_MAX_ROUNDS", "2"))
+
+    # position per provider: [chunk, consumed items of that chunk, exhausted]
+    positions: Dict[str, List[Any]] = {}
+    buffers: Dict[str, Deque[JobRecord]] = {}
+    # record counts of the loaded chunks not yet consumed, the first one at positions[name][0]
+    spans: Dict[str, Deque[int]] = {}
+    suspended: set[str] = set()
+    sources: Dict[str, int] = {}
+
+    def settle(name: str) -> None:
+        # move the position past chunks that were consumed completely
+        pos, span = positions[name], spans[name]
+        while span and pos[1] >= span[0]:
+            pos[1] -= span.popleft()
+            pos[0] += 1
+        if not span:
+            pos[1] = 0
+
+    def load(name: str, outcome: List[JobRecord] | int) -> None:
+        if not isinstance(outcome, list):
+            # failed/timed out: skip for this page, retry from the same position next time
+            suspended.add(name)
+            sources[name] = outcome
+            return
+        if not outcome:
+            positions[name][2] = True
+            buffers[name] = deque()
+            return
+        if isinstance(outcome, PageRun):
+            if not outcome.sizes:
+                # the first page missed its deadline: retry it rather than skip to later ones
+                suspended.add(name)
+                sources[name] = SOURCE_TIMED_OUT
+                return
+            records, sizes = outcome.unbroken(), list(outcome.sizes)
+        else:
+            records, sizes = _newest_first(outcome), [len(outcome)]
+        spans[name] = deque(sizes)
+        buffers[name] = deque(records[positions[name][1]:])
+        settle(name)
 
+    if cursor:
+        state = decode_cursor(cursor, q, canton, per_page).get("s")
+        if not isinstance(state, dict):
+            raise ValueError("Malformed cursor")
+        for name, pos in state.items():
+            if name in calls and isinstance(pos, list) and len(pos) == 3:
+                positions[name] = [int(pos[0]), int(pos[1]), bool(pos[2])]
+        live = [n for n, p in positions.items() if not p[2]]
+        outcomes = await _fan_out(calls, [[n] for n in live], {n: positions[n][0] for n in live}, dbg)
+        for name in live:
+            load(name, outcomes.get(name, SOURCE_TIMED_OUT))
+    else:
+        groups = _default_groups(calls)
+        outcomes = await _fan_out(calls, groups, {name: 0 for name in calls}, dbg)
+        for group in groups:
+            ran = [n for n in group if n in outcomes]
+            # once a chain member produced items, the fallbacks behind it stay unused
+            winners = [n for n in ran if isinstance(outcomes[n], list) and outcomes[n]]
+            for name in (winners if winners else ran):
+                positions[name] = [0, 0, False]
+                load(name, outcomes[name])
 
+    heap: List[Tuple[float, str, str]] = []
+
+    def push(name: str) -> None:
+        if buffers.get(name):
+            head = buffers[name][0]
+            heapq.heappush(heap, (-_recency(head), head.id, name))
+
+    for name in positions:
+        push(name)
+
+    page_records: List[JobRecord] = []
+    contributed: Dict[str, int] = {name: 0 for name in positions if name not in suspended}
+    # duplicates usually carry about the same posting date, so they meet on the same page
+    deduper = Deduper()
+    rounds = 0
+    while len(page_records) < per_page:
+        need = [n for n, p in positions.items() if n not in suspended and not p[2] and not buffers.get(n)]
+        if need:
+            # a provider ran dry: its next chunk may hold items newer than the other heads
+            if rounds >= max_rounds:
+                break
+            rounds += 1
+            outcomes = await _fan_out(calls, [[n] for n in need], {n: positions[n][0] for n in need}, dbg)
+            for name in need:
+                load(name, outcomes.get(name, SOURCE_TIMED_OUT))
+                push(name)
+            continue
+        if not heap:
+            break
+        _, _, name = heapq.heappop(heap)
+        item = buffers[name].popleft()
+        if deduper.add(item) is not None:
+            page_records.append(item)
+        contributed[name] = contributed.get(name, 0) + 1
+        positions[name][1] += 1
+        settle(name)
+        if buffers[name]:
+            push(name)
+
+    for name, count in contributed.items():
+        sources.setdefault(name, count)
+    next_cursor = None
+    if any(not p[2] for p in positions.values()):
+        next_cursor = encode_cursor(q, canton, per_page, s=positions)
+    return to_items(page_records), sources, debug_info, next_cursor
+
+
+async def stream_jobs(q: str | None, canton: str | None, per_page: int, clients: HTTPClients | None = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Same fan-out as the first page of ``search_jobs_page``, but every provider's
+    items are yielded as soon as it answers:
+
+    - ``{"type": "items", "provider": name, "items": [...]}`` per provider, already
+      deduplicated against what was sent before;
+    - ``{"type": "summary", "sources": {...}, "total": n, "order": [ids], "next_cursor": ...}``
+      once all providers finished or the budget ran out. ``order`` is the merged
+      newest-first order of everything sent; ``next_cursor`` continues with the next
+      chunk of every provider on /jobs/search.
+    """
+    clients = clients or http_clients
+    calls = _provider_calls(q, canton, per_page, clients, None)
+    queue: asyncio.Queue = asyncio.Queue()
+    fan_out = asyncio.create_task(
+        _fan_out(calls, _default_groups(calls), {name: 0 for name in calls}, None, lambda name, items: queue.put_nowait((name, items)))
+    )
+    fan_out.add_done_callback(lambda _: queue.put_nowait(None))
+    deduper = Deduper()
+    sent: List[JobRecord] = []
+    try:
+        while True:
+            got = await queue.get()
+            if got is None:
+                break
+            name, items = got
+            if isinstance(items, PageRun):
+                # pages after a missing one are left to the cursor, which re-requests the gap
+                items = items.unbroken()
+            fresh = [it for it in _newest_first(items) if deduper.add(it) is not None]
+            if fresh:
+                sent.extend(fresh)
+                yield {"type": "items", "provider": name, "items": to_items(fresh)}
+        outcomes = fan_out.result()
+    finally:
+        # client went away: stop the providers instead of finishing the fan-out for nobody
+        if not fan_out.done():
+            fan_out.cancel()
+            await asyncio.gather(fan_out, return_exceptions=True)
+    positions = {name: [len(o.sizes) if isinstance(o, PageRun) else 1, 0, False] for name, o in outcomes.items() if isinstance(o, list) and o}
+    yield {
+        "type": "summary",
+        "sources": _source_counts(outcomes),
+        "total": len(sent),
+        "order": [it.id for it in _newest_first(sent)],
+        "next_cursor": encode_cursor(q, canton, per_page, s=positions) if positions else None,
+    }
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from .jobs_aggregator import SOURCE_OVER_BUDGET
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    stored_at: float
+    ttl: float
+
+
+def _default_size(value: Any) -> int:
+    """Rough byte size of a cached ``indexed_search`` result."""
+    try:
+        items, sources = value[0], value[1]
+        return sum(len(it.model_dump_json()) for it in items) + len(json.dumps(sources)) + 64
+    except Exception:
+        return len(repr(value))
+
+
+class SearchCache:
+    """
+    In-process TTL cache for job search results.
+
+    - Fresh entries (age < ttl) are served directly.
+    - Stale entries (ttl <= age < ttl + stale_ttl) are served immediately while a
+      single background task refreshes them (stale-while-revalidate).
+    - Concurrent misses for the same key share one upstream fetch (single-flight).
+    - Total size is bounded by ``max_bytes``; least recently used entries are evicted.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_bytes: int, size_of: Callable[[Any], int] = _default_size) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._size_of = size_of
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._bytes = 0
+        self._counters: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "evictions": 0,
+            "warmed": 0,
+        }
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = _Entry(value=value, size=size, stored_at=time.monotonic(), ttl=self.ttl if ttl is None else ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._counters["evictions"] += 1
+
+    def _lookup(self, key: Hashable) -> Tuple[Optional[_Entry], str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, "miss"
+        age = time.monotonic() - entry.stored_at
+        if age < entry.ttl:
+            self._entries.move_to_end(key)
+            return entry, "fresh"
+        if age < entry.ttl + self.stale_ttl:
+            self._entries.move_to_end(key)
+            return entry, "stale"
+        self._entries.pop(key)
+        self._bytes -= entry.size
+        return None, "miss"
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl_for: Optional[Callable[[Any], Optional[float]]]) -> asyncio.Task:
+        async def run() -> Any:
+            try:
+                value = await fetch()
+                self._store(key, value, ttl_for(value) if ttl_for else None)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.create_task(run())
+        self._inflight[key] = task
+        return task
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl_for: Optional[Callable[[Any], Optional[float]]]) -> None:
+        if key in self._inflight:
+            return
+        self._counters["refreshes"] += 1
+        task = self._start_fetch(key, fetch, ttl_for)
+        self._background.add(task)
+
+        def done(t: asyncio.Task) -> None:
+            self._background.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                self._counters["refresh_errors"] += 1
+
+        task.add_done_callback(done)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl_for: Optional[Callable[[Any], Optional[float]]] = None, revalidate: bool = True) -> Any:
+        """
+        Return the cached value for ``key`` or compute it with ``fetch``.
+        ``ttl_for`` may shorten the TTL of a freshly fetched value (e.g. partial results).
+        With ``revalidate=False`` stale entries are served without a background refresh
+        (used while the provider quota is running low).
+        """
+        entry, state = self._lookup(key)
+        if state == "fresh":
+            self._counters["hits"] += 1
+            return entry.value
+        if state == "stale":
+            self._counters["stale"] += 1
+            if revalidate:
+                self._refresh(key, fetch, ttl_for)
+            return entry.value
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counters["coalesced"] += 1
+        else:
+            self._counters["misses"] += 1
+            task = self._start_fetch(key, fetch, ttl_for)
+        # Shield so a disconnecting client doesn't cancel the fetch other waiters share
+        return await asyncio.shield(task)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh or stale value without touching counters or triggering fetches."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.stored_at >= entry.ttl + self.stale_ttl:
+            return None
+        return entry.value
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """Seconds until ``key`` turns stale (negative once it is); None when not cached."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.ttl - (time.monotonic() - entry.stored_at)
+
+    async def warm(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl_for: Optional[Callable[[Any], Optional[float]]] = None) -> Any:
+        """Fetch ``key`` now and store it, whatever is cached; joins a fetch already in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            self._counters["warmed"] += 1
+            task = self._start_fetch(key, fetch, ttl_for)
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["stale"] + self._counters["misses"] + self._counters["coalesced"]
+        served_from_cache = self._counters["hits"] + self._counters["stale"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+            "ttl_sec": self.ttl,
+            "stale_ttl_sec": self.stale_ttl,
+            "hit_ratio": round(served_from_cache / lookups, 4) if lookups else 0.0,
+        }
+
+
+def search_key(q: Optional[str], canton: Optional[str], page: int, per_page: int, cursor: Optional[str] = None) -> Tuple[str, str, int, int, str]:
+    """Normalize search parameters so trivially different queries share an entry."""
+    norm_q = " ".join((q or "").lower().split())
+    norm_canton = (canton or "").strip().upper()
+    return (norm_q, norm_canton, max(page, 1), per_page, cursor or "")
+
+
+def facets_key(q: Optional[str], canton: Optional[str]) -> Tuple[str, str, str]:
+    """Facets don't depend on the page, so every page of a search shares one entry."""
+    norm_q, norm_canton = search_key(q, canton, 1, 0)[:2]
+    return ("facets", norm_q, norm_canton)
+
+
+def partial_result_ttl(value: Tuple[Any, ...]) -> Optional[float]:
+    """Results with failed or timed-out providers are kept only briefly."""
+    sources: Dict[str, int] = value[1]
+    # an exhausted quota won't come back within seconds; keep those results for the full TTL
+    if any(count < 0 and count != SOURCE_OVER_BUDGET for count in sources.values()):
+        return float(os.getenv("JOBS_CACHE_PARTIAL_TTL_SEC", "30"))
+    return None
+
+
+search_cache = SearchCache(
+    ttl=float(os.getenv("JOBS_CACHE_TTL_SEC", "300")),
+    stale_ttl=float(os.getenv("JOBS_CACHE_STALE_SEC", "900")),
+    max_bytes=int(os.getenv("JOBS_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
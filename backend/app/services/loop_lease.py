@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models.job import JobLoopLease
+
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LoopLease:
+    """
+    Lease on a row of ``job_loop_leases``, so that of all the workers running a
+    background loop only one does its work (and spends provider quota) per round.
+
+    ``acquire`` is a conditional UPDATE that only matches a free, expired or already
+    owned lease, like the feed leases of ``rss_engine``; the holder renews it every
+    round. A worker that dies loses the lease after ``lease_sec``.
+    """
+
+    def __init__(self, name: str, lease_sec: float, owner: str = WORKER_ID, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.name = name
+        self.lease_sec = lease_sec
+        self.owner = owner
+        self._session_factory = session_factory
+
+    def _acquire_sync(self) -> bool:
+        table = JobLoopLease.__table__
+        now = datetime.utcnow()
+        values = {"owner": self.owner, "expires_at": now + timedelta(seconds=self.lease_sec)}
+        with self._session_factory() as db:
+            won = db.execute(
+                update(table)
+                .where(table.c.name == self.name, or_(table.c.owner == self.owner, table.c.expires_at < now))
+                .values(**values)
+            ).rowcount
+            if not won:
+                try:
+                    db.execute(insert(table).values(name=self.name, **values))
+                    won = 1
+                except IntegrityError:
+                    # the row exists and another worker holds it
+                    db.rollback()
+                    return False
+            db.commit()
+            return bool(won)
+
+    def _release_sync(self) -> None:
+        table = JobLoopLease.__table__
+        with self._session_factory() as db:
+            db.execute(update(table).where(table.c.name == self.name, table.c.owner == self.owner).values(expires_at=datetime.utcnow()))
+            db.commit()
+
+    async def acquire(self) -> bool:
+        """Take or renew the lease; False while another worker holds it or the table is unreachable."""
+        try:
+            return await asyncio.to_thread(self._acquire_sync)
+        except Exception:
+            return False
+
+    async def release(self) -> None:
+        """Let another worker take over right away (shutdown)."""
+        with contextlib.suppress(Exception):
+            await asyncio.to_thread(self._release_sync)
+
+
+def loop_lease_sec(interval_sec: float) -> float:
+    # outlives a round plus the pause after it, so the holder keeps the loop
+    return max(2 * interval_sec, float(os.getenv("JOBS_LOOP_LEASE_MIN_SEC", "600")))
+
+
+async def run_leased(lease: LoopLease, interval_sec: float, run: Callable[[], Awaitable[object]], first_delay_sec: Optional[float] = None) -> None:
+    """Call ``run`` every ``interval_sec`` on the worker holding ``lease``; the others keep checking."""
+    if first_delay_sec:
+        await asyncio.sleep(first_delay_sec)
+    try:
+        while True:
+            try:
+                if await lease.acquire():
+                    await run()
+            except Exception:
+                # never break background loop
+                pass
+            await asyncio.sleep(interval_sec)
+    finally:
+        await lease.release()
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models.job import JobProviderBudget
+
+
+OK = "ok"
+LOW = "low"
+EXHAUSTED = "exhausted"
+
+
+class BudgetExhausted(Exception):
+    """Raised by a provider fetcher when the budget denied its first call."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Budget '{name}' is exhausted")
+        self.name = name
+
+
+def _period(now: datetime) -> str:
+    return now.strftime("%Y-%m")
+
+
+@dataclass
+class BudgetState:
+    period: str
+    spent: int = 0
+    denied: int = 0
+    tokens: float = 0.0
+    refilled_at: Optional[datetime] = None
+
+
+class ProviderBudget:
+    """
+    Token bucket plus monthly quota for one paid API (RapidAPI), shared by all workers.
+
+    The bucket holds at most ``burst`` tokens and refills at ``rate_per_sec``; the
+    monthly quota resets on the first of each month (UTC). Either limit is off when
+    set to 0. The state lives in ``job_provider_budgets`` and every ``acquire`` is a
+    compare-and-swap on the row's ``version``, so concurrent workers never spend the
+    same token twice. When the table can't be reached the worker falls back to its
+    in-process bucket for ``refresh_sec`` instead of blocking searches. With both
+    limits off the table is never touched.
+
+    ``level`` drives graceful degradation: LOW once less than ``low_fraction`` of the
+    monthly quota is left, EXHAUSTED when nothing is left.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        monthly_quota: int,
+        rate_per_sec: float,
+        burst: float,
+        low_fraction: float = 0.1,
+        max_wait_sec: float = 0.5,
+        refresh_sec: float = 30.0,
+        session_factory: Optional[Callable[[], Session]] = SessionLocal,
+    ) -> None:
+        self.name = name
+        self.monthly_quota = monthly_quota
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(burst, 1.0)
+        self.low_fraction = low_fraction
+        self.max_wait_sec = max_wait_sec
+        self.refresh_sec = refresh_sec
+        self._session_factory = session_factory
+        self._state = BudgetState(period=_period(datetime.now(timezone.utc)), tokens=self.burst)
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._store_down_until = 0.0
+        self._counters: Dict[str, int] = {"granted": 0, "denied": 0, "waits": 0, "store_errors": 0, "conflicts": 0}
+
+    @property
+    def unlimited(self) -> bool:
+        return self.monthly_quota <= 0 and self.rate_per_sec <= 0
+
+    # -- bucket arithmetic -------------------------------------------------
+
+    def _take(self, state: BudgetState, cost: int, partial: bool, now: datetime) -> int:
+        """Spend up to ``cost`` tokens from ``state`` (mutated); returns the number granted."""
+        if state.period != _period(now):
+            state.period, state.spent, state.denied = _period(now), 0, 0
+        if self.rate_per_sec > 0:
+            elapsed = (now - state.refilled_at).total_seconds() if state.refilled_at else self.burst / self.rate_per_sec
+            state.tokens = min(self.burst, state.tokens + max(elapsed, 0.0) * self.rate_per_sec)
+        state.refilled_at = now
+        granted = cost
+        if self.rate_per_sec > 0:
+            granted = min(granted, int(math.floor(state.tokens)))
+        if self.monthly_quota > 0:
+            granted = min(granted, self.monthly_quota - state.spent)
+        granted = max(granted, 0)
+        if granted < cost and not partial:
+            granted = 0
+        if self.rate_per_sec > 0:
+            state.tokens -= granted
+        state.spent += granted
+        if granted < cost:
+            state.denied += 1
+        return granted
+
+    def _wait_for(self, state: BudgetState, cost: int) -> float:
+        """Seconds until the bucket holds ``cost`` tokens, or 0 when waiting won't help."""
+        if self.rate_per_sec <= 0 or (self.monthly_quota > 0 and state.spent >= self.monthly_quota):
+            return 0.0
+        return max(min(cost, self.burst) - state.tokens, 0.0) / self.rate_per_sec
+
+    # -- shared store ------------------------------------------------------
+
+    def _take_shared(self, cost: int, partial: bool) -> int:
+        """Spend from the row in ``job_provider_budgets``; retries when another worker won the race."""
+        table = JobProviderBudget.__table__
+        with self._session_factory() as db:
+            for _ in range(5):
+                now = datetime.now(timezone.utc)
+                row = db.execute(select(table).where(table.c.name == self.name)).mappings().first()
+                if row is None:
+                    try:
+                        db.execute(insert(table).values(name=self.name, period=_period(now), spent=0, denied=0, tokens=self.burst, refilled_at=now, version=0, updated_at=now))
+                        db.commit()
+                    except IntegrityError:
+                        db.rollback()
+                    continue
+                refilled_at = row["refilled_at"]
+                if refilled_at is not None and refilled_at.tzinfo is None:
+                    refilled_at = refilled_at.replace(tzinfo=timezone.utc)
+                state = BudgetState(row["period"], row["spent"], row["denied"], row["tokens"], refilled_at)
+                granted = self._take(state, cost, partial, now)
+                result = db.execute(
+                    update(table)
+                    .where(table.c.name == self.name, table.c.version == row["version"])
+                    .values(period=state.period, spent=state.spent, denied=state.denied, tokens=state.tokens, refilled_at=now, version=row["version"] + 1, updated_at=now)
+                )
+                db.commit()
+                if result.rowcount == 1:
+                    with self._lock:
+                        self._state = state
+                    return granted
+                with self._lock:
+                    self._counters["conflicts"] += 1
+        raise RuntimeError(f"Budget '{self.name}' is contended")
+
+    def _take_local(self, cost: int, partial: bool) -> int:
+        with self._lock:
+            return self._take(self._state, cost, partial, datetime.now(timezone.utc))
+
+    def _take_sync(self, cost: int, partial: bool) -> int:
+        if self._session_factory is not None and not self.unlimited and time.monotonic() >= self._store_down_until:
+            try:
+                return self._take_shared(cost, partial)
+            except Exception:
+                self._counters["store_errors"] += 1
+                self._store_down_until = time.monotonic() + self.refresh_sec
+        return self._take_local(cost, partial)
+
+    def _load(self) -> None:
+        if self._session_factory is None or self.unlimited or time.monotonic() < self._store_down_until:
+            return
+        try:
+            with self._session_factory() as db:
+                row = db.get(JobProviderBudget, self.name)
+        except Exception:
+            return
+        if row is None:
+            return
+        refilled_at = row.refilled_at
+        if refilled_at is not None and refilled_at.tzinfo is None:
+            refilled_at = refilled_at.replace(tzinfo=timezone.utc)
+        with self._lock:
+            self._state = BudgetState(row.period, row.spent, row.denied, row.tokens, refilled_at)
+
+    async def load_if_stale(self) -> None:
+        """Refresh the local mirror of the shared state that ``level`` answers from."""
+        now = time.monotonic()
+        if now - self._loaded_at < self.refresh_sec:
+            return
+        self._loaded_at = now
+        await asyncio.to_thread(self._load)
+
+    # -- public API --------------------------------------------------------
+
+    async def acquire(self, cost: int = 1, partial: bool = False) -> int:
+        """
+        Spend ``cost`` calls of budget; returns how many were granted (0 when denied).
+        With ``partial`` a smaller grant is accepted. When only the per-second rate is
+        short, waits up to ``max_wait_sec`` for the bucket to refill once.
+        """
+        if self.unlimited:
+            # nothing to enforce: count locally and skip the thread hop and the row round trip
+            granted = self._take_local(cost, partial)
+            with self._lock:
+                self._counters["granted"] += granted
+            return granted
+        granted = await asyncio.to_thread(self._take_sync, cost, partial)
+        if not granted:
+            with self._lock:
+                wait = self._wait_for(self._state, cost)
+            if 0 < wait <= self.max_wait_sec:
+                self._counters["waits"] += 1
+                await asyncio.sleep(wait)
+                granted = await asyncio.to_thread(self._take_sync, cost, partial)
+        with self._lock:
+            self._counters["granted"] += granted
+            if granted < cost:
+                self._counters["denied"] += 1
+        return granted
+
+    def remaining(self) -> Optional[int]:
+        """Calls left this month as last seen by this worker; None without a monthly quota."""
+        if self.monthly_quota <= 0:
+            return None
+        with self._lock:
+            state = self._state
+            spent = state.spent if state.period == _period(datetime.now(timezone.utc)) else 0
+        return max(self.monthly_quota - spent, 0)
+
+    def level(self) -> str:
+        remaining = self.remaining()
+        if remaining is None:
+            return OK
+        if remaining <= 0:
+            return EXHAUSTED
+        if remaining < self.monthly_quota * self.low_fraction:
+            return LOW
+        return OK
+
+    def reset(self) -> None:
+        """Forget this worker's mirror (tests, or after changing the plan)."""
+        with self._lock:
+            self._state = BudgetState(period=_period(datetime.now(timezone.utc)), tokens=self.burst)
+            self._store_down_until = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = replace(self._state)
+            counters = dict(self._counters)
+        return {
+            "name": self.name,
+            "level": self.level(),
+            "period": state.period,
+            "spent": state.spent,
+            "denied_in_period": state.denied,
+            "monthly_quota": self.monthly_quota or None,
+            "remaining": self.remaining(),
+            "rate_per_sec": self.rate_per_sec or None,
+            "burst": self.burst,
+            "tokens": round(state.tokens, 2),
+            # counters of this worker since start
+            **counters,
+        }
+
+
+rapidapi_budget = ProviderBudget(
+    "rapidapi",
+    monthly_quota=int(os.getenv("RAPIDAPI_MONTHLY_QUOTA", "0")),
+    rate_per_sec=float(os.getenv("RAPIDAPI_RATE_PER_SEC", "0")),
+    burst=float(os.getenv("RAPIDAPI_BURST", "5")),
+    low_fraction=float(os.getenv("RAPIDAPI_BUDGET_LOW_FRACTION", "0.1")),
+    max_wait_sec=float(os.getenv("RAPIDAPI_BUDGET_MAX_WAIT_SEC", "0.5")),
+    refresh_sec=float(os.getenv("RAPIDAPI_BUDGET_REFRESH_SEC", "30")),
+)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from ..core.database import SessionLocal
+from ..models.job import JobProviderVariant
+
+
+Variant = Tuple[str, Dict[str, Any]]
+
+
+def variant_key(url: str, params: Dict[str, Any]) -> str:
+    """Stable id of a variant: path plus parameter names (values change per search)."""
+    return f"{urlparse(url).path}?{','.join(sorted(params))}"
+
+
+@dataclass
+class VariantStats:
+    successes: float = 0.0
+    failures: float = 0.0
+    avg_latency_ms: Optional[float] = None
+    last_success_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    def decayed(self, now: datetime, half_life_sec: float) -> "VariantStats":
+        if self.updated_at is None:
+            return VariantStats(self.successes, self.failures, self.avg_latency_ms, self.last_success_at, now)
+        updated_at = self.updated_at if self.updated_at.tzinfo else self.updated_at.replace(tzinfo=timezone.utc)
+        factor = 0.5 ** (max((now - updated_at).total_seconds(), 0.0) / half_life_sec)
+        return VariantStats(self.successes * factor, self.failures * factor, self.avg_latency_ms, self.last_success_at, now)
+
+    def score(self) -> float:
+        # Laplace-smoothed success rate, discounted by latency (1s halves the score)
+        rate = (self.successes + 1.0) / (self.successes + self.failures + 2.0)
+        latency_s = (self.avg_latency_ms or 0.0) / 1000.0
+        return rate / (1.0 + latency_s)
+
+
+class VariantMemory:
+    """
+    Per-host memory of which Indeed RapidAPI endpoint variant works.
+
+    The table lives in ``job_provider_variants`` so it survives restarts and is shared
+    by all workers; each worker keeps a mirror reloaded every ``refresh_sec``. Counts
+    decay with ``half_life_sec`` and every ``reprobe_sec`` a host is walked in its
+    original order once, so a provider that changes shape is re-learned.
+    """
+
+    def __init__(self, refresh_sec: float, half_life_sec: float, reprobe_sec: float) -> None:
+        self.refresh_sec = refresh_sec
+        self.half_life_sec = half_life_sec
+        self.reprobe_sec = reprobe_sec
+        self._stats: Dict[Tuple[str, str], VariantStats] = {}
+        self._loaded_at = 0.0
+        self._last_reprobe: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._pending: Set[asyncio.Task] = set()
+
+    def order(self, host: str, variants: List[Variant]) -> List[Variant]:
+        """Best-scoring variants first; unknown ones keep their original relative order."""
+        now_mono = time.monotonic()
+        last = self._last_reprobe.get(host)
+        if last is None:
+            self._last_reprobe[host] = now_mono
+        elif now_mono - last >= self.reprobe_sec:
+            self._last_reprobe[host] = now_mono
+            return list(variants)
+        now = datetime.now(timezone.utc)
+        neutral = VariantStats().score()
+
+        def rank(indexed: Tuple[int, Variant]) -> Tuple[float, int]:
+            idx, (url, params) = indexed
+            stats = self._stats.get((host, variant_key(url, params)))
+            score = stats.decayed(now, self.half_life_sec).score() if stats else neutral
+            return (-score, idx)
+
+        return [v for _, v in sorted(enumerate(variants), key=rank)]
+
+    def proven(self, host: str, key: str) -> bool:
+        """Whether the variant ever returned items for ``host``."""
+        stats = self._stats.get((host, key))
+        return stats is not None and stats.last_success_at is not None
+
+    def record(self, host: str, key: str, ok: bool, latency_ms: float) -> None:
+        """Update the local mirror and persist the observation in the background."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            stats = self._stats.get((host, key), VariantStats()).decayed(now, self.half_life_sec)
+            self._apply(stats, ok, latency_ms, now)
+            self._stats[(host, key)] = stats
+        try:
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._persist, host, key, ok, latency_ms, now))
+        except RuntimeError:
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    @staticmethod
+    def _apply(stats: VariantStats, ok: bool, latency_ms: float, now: datetime) -> None:
+        if ok:
+            stats.successes += 1.0
+            stats.last_success_at = now
+            prev = stats.avg_latency_ms
+            stats.avg_latency_ms = latency_ms if prev is None else 0.8 * prev + 0.2 * latency_ms
+        else:
+            stats.failures += 1.0
+        stats.updated_at = now
+
+    def _persist(self, host: str, key: str, ok: bool, latency_ms: float, now: datetime) -> None:
+        # Re-apply the observation on top of the stored row so increments from other workers are kept
+        try:
+            with SessionLocal() as db:
+                row = db.get(JobProviderVariant, (host, key))
+                if row is None:
+                    row = JobProviderVariant(host=host, variant=key, successes=0.0, failures=0.0)
+                stats = VariantStats(row.successes or 0.0, row.failures or 0.0, row.avg_latency_ms, row.last_success_at, row.updated_at)
+                stats = stats.decayed(now, self.half_life_sec)
+                self._apply(stats, ok, latency_ms, now)
+                row.successes = stats.successes
+                row.failures = stats.failures
+                row.avg_latency_ms = stats.avg_latency_ms
+                row.last_success_at = stats.last_success_at
+                row.updated_at = now
+                db.add(row)
+                db.commit()
+        except Exception:
+            # learning is best effort; the in-process mirror still works
+            pass
+
+    def _load(self) -> None:
+        try:
+            with SessionLocal() as db:
+                rows = db.query(JobProviderVariant).all()
+        except Exception:
+            return
+        loaded = {
+            (r.host, r.variant): VariantStats(r.successes or 0.0, r.failures or 0.0, r.avg_latency_ms, r.last_success_at, r.updated_at)
+            for r in rows
+        }
+        with self._lock:
+            self._stats.update(loaded)
+
+    async def load_if_stale(self) -> None:
+        now = time.monotonic()
+        if now - self._loaded_at < self.refresh_sec:
+            return
+        self._loaded_at = now
+        await asyncio.to_thread(self._load)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        out = []
+        for (host, key), stats in list(self._stats.items()):
+            s = stats.decayed(now, self.half_life_sec)
+            out.append({
+                "host": host,
+                "variant": key,
+                "successes": round(s.successes, 3),
+                "failures": round(s.failures, 3),
+                "avg_latency_ms": round(s.avg_latency_ms, 1) if s.avg_latency_ms is not None else None,
+                "score": round(s.score(), 4),
+                "last_success_at": s.last_success_at.isoformat() if s.last_success_at else None,
+            })
+        out.sort(key=lambda r: (r["host"], -r["score"]))
+        return out
+
+
+variant_memory = VariantMemory(
+    refresh_sec=float(os.getenv("JOBS_VARIANT_REFRESH_SEC", "60")),
+    half_life_sec=float(os.getenv("JOBS_VARIANT_HALF_LIFE_SEC", str(6 * 3600))),
+    reprobe_sec=float(os.getenv("JOBS_VARIANT_REPROBE_SEC", "3600")),
+)
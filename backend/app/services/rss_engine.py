@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from ..core.circuit import OPEN, CircuitOpenError, breakers
+from ..core.database import SessionLocal, upsert_insert
+from ..core.http import HTTPClients, http_clients
+from ..models.news import News
+from ..models.rss_feed import RSSFeed
+from .feed_parsing import extract_content, parse_feed
+from .image_pipeline import image_pipeline
+
+
+# column sizes of ``news``; longer values would fail the whole feed's commit
+_TITLE_MAX = 300
+_URL_MAX = 500
+_SOURCE_MAX = 120
+
+
+@dataclass(frozen=True)
+class FeedJob:
+    """What an import needs from an ``RSSFeed`` row, detached from any session."""
+
+    id: str
+    url: str
+    language: str
+    status: str
+    max_items: int
+    download_images: bool
+    extract_full: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    seen: FrozenSet[str] = frozenset()
+    poll_interval_sec: Optional[int] = None
+    # claimed by this engine's lease; the import releases it
+    leased: bool = False
+
+    @classmethod
+    def of(cls, feed: RSSFeed, leased: bool = False) -> "FeedJob":
+        try:
+            seen = frozenset(json.loads(feed.seen_entries or "[]"))
+        except ValueError:
+            seen = frozenset()
+        return cls(feed.id, feed.url, feed.language, feed.status, feed.max_items, feed.download_images, bool(feed.extract_full), feed.etag, feed.last_modified, feed.content_hash, seen, feed.poll_interval_sec, leased)
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"created": 0, "updated": 0, "skipped": 0, "seen": 0, "unchanged": 0}
+
+
+def _interval_bounds() -> Tuple[float, float]:
+    return float(os.getenv("FEED_MIN_INTERVAL_SEC", "300")), float(os.getenv("FEED_MAX_INTERVAL_SEC", str(6 * 3600)))
+
+
+def adapt_interval(previous: float, changed: int, published: List[datetime]) -> int:
+    """
+    Next polling interval of a feed. Nothing new since the last poll backs off by
+    half; otherwise the interval moves halfway toward the feed's publish rate (the
+    mean gap between its latest entries), or halves when entries carry no dates.
+    Clamped to FEED_MIN_INTERVAL_SEC..FEED_MAX_INTERVAL_SEC.
+    """
+    low, high = _interval_bounds()
+    if not changed:
+        target = previous * 1.5
+    elif len(published) >= 2:
+        recent = sorted(published)[-10:]
+        gap = (recent[-1] - recent[0]).total_seconds() / (len(recent) - 1)
+        # smoothed, so one burst or one quiet week doesn't swing the interval
+        target = (previous + gap) / 2
+    else:
+        target = previous / 2
+    return int(min(max(target, low), high))
+
+
+def _circuit_name(url: str) -> str:
+    return f"feeds:{urlparse(url).hostname or ''}"
+
+
+class FeedImportEngine:
+    """
+    Imports RSS feeds without blocking the event loop.
+
+    Feeds are fetched concurrently (at most ``concurrency`` at a time) with the
+    pooled async ``feeds`` client, each behind its host's circuit breaker.
+    ``feedparser`` runs in a pool of ``parse_workers`` processes (in a thread when
+    0). Images go through ``image_pipeline`` (concurrent, size-capped, stored once
+    per content hash). Feeds with ``extract_full`` also fetch every new item's
+    page (at most ``extract_concurrency`` at a time) and extract its main content
+    in the same pool.
+    Every feed is written with one bulk upsert in one transaction, through its own
+    session in a worker thread. Only images of items not stored yet are downloaded.
+
+    Scheduling lives in the database, so several workers can run the loop: a feed
+    is imported once its ``next_run_at`` is due, by the worker that wins its lease
+    (``lease_owner``/``lease_expires_at``). A worker that dies mid-import loses the
+    lease after ``lease_sec``. Every feed has its own interval, see ``adapt_interval``.
+    """
+
+    def __init__(self, concurrency: int, parse_workers: int, lease_sec: float = 600, default_interval_sec: float = 900, extract_concurrency: int = 4) -> None:
+        self.concurrency = concurrency
+        self.parse_workers = parse_workers
+        self.extract_concurrency = extract_concurrency
+        self.lease_sec = lease_sec
+        self.default_interval_sec = default_interval_sec
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pool: Optional[Executor] = None
+        self._counters: Dict[str, int] = {"runs": 0, "feeds": 0, "failed": 0, **_empty_counts()}
+        self._extraction: Dict[str, int] = {"extracted": 0, "not_modified": 0, "empty": 0, "errors": 0}
+        self.last_run_at: Optional[datetime] = None
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[httpx.Response]:
+        """The response (2xx/3xx, including 304 for a conditional request); None on errors."""
+        breaker = breakers.get(_circuit_name(url))
+        if not breaker.allow():
+            return None
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        started = time.perf_counter()
+        try:
+            r = await client.get(url, headers=headers)
+            # 4xx means the host answered; only server errors count against it
+            breaker.record(r.status_code < 500, (time.perf_counter() - started) * 1000)
+            if r.status_code < 400:
+                return r
+        except Exception:
+            breaker.record(False, (time.perf_counter() - started) * 1000)
+        return None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """``fn(*args)`` in the parse pool (a thread when ``parse_workers`` is 0)."""
+        if self.parse_workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and DB pools is unsafe
+            self._pool = ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def _parse(self, text: str, url: str, max_items: int) -> Dict[str, Any]:
+        return await self._run(parse_feed, text, url, max_items)
+
+    def _extracted(self, urls: List[str], language: str) -> Dict[str, Optional[str]]:
+        """``url -> content_etag`` of the items in ``language`` that already have content."""
+        if not urls:
+            return {}
+        with SessionLocal() as db:
+            query = db.query(News.url, News.content_etag).filter(News.url.in_(urls), News.language == language, News.content.isnot(None))
+            return dict(query.all())
+
+    async def _extract(self, client: httpx.AsyncClient, url: str, etag: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+        """``(content, etag)`` of the article at ``url``; None when the stored content stays."""
+        resp = await self._fetch(client, url, etag)
+        if resp is None:
+            self._extraction["errors"] += 1
+            return None
+        if resp.status_code == 304:
+            self._extraction["not_modified"] += 1
+            return None
+        try:
+            content = await self._run(extract_content, resp.text, str(resp.url))
+        except Exception:
+            self._extraction["errors"] += 1
+            return None
+        if content is None:
+            self._extraction["empty"] += 1
+            return None
+        self._extraction["extracted"] += 1
+        return content, resp.headers.get("etag")
+
+    def _stored(self, urls: List[str], language: str) -> Dict[str, Optional[str]]:
+        """``url -> image_url`` of the items already in ``news`` in ``language`` (one ``IN`` query per feed)."""
+        if not urls:
+            return {}
+        with SessionLocal() as db:
+            return dict(db.query(News.url, News.image_url).filter(News.url.in_(urls), News.language == language).all())
+
+    def _save_state(self, db: Session, job: FeedJob, state: Dict[str, Any], now: datetime) -> None:
+        if not job.id:
+            # one-off import of a URL that isn't a registered feed
+            return
+        values = {RSSFeed.last_imported_at: now, **self._release_values(job)}
+        values.update({getattr(RSSFeed, name): value for name, value in state.items()})
+        db.query(RSSFeed).filter(RSSFeed.id == job.id).update(values, synchronize_session=False)
+
+    def _release_values(self, job: FeedJob) -> Dict[Any, Any]:
+        return {RSSFeed.lease_owner: None, RSSFeed.lease_expires_at: None} if job.leased else {}
+
+    def _schedule(self, interval: int) -> Dict[str, Any]:
+        return {"poll_interval_sec": interval, "next_run_at": datetime.utcnow() + timedelta(seconds=interval)}
+
+    def _previous_interval(self, job: FeedJob) -> int:
+        return int(job.poll_interval_sec or self.default_interval_sec)
+
+    def _reschedule(self, job: FeedJob, interval: int) -> None:
+        """Set the next run (and give up the lease) without touching anything else."""
+        if not job.id:
+            return
+        values = {getattr(RSSFeed, name): value for name, value in self._schedule(interval).items()}
+        with SessionLocal() as db:
+            db.query(RSSFeed).filter(RSSFeed.id == job.id).update({**values, **self._release_values(job)}, synchronize_session=False)
+            db.commit()
+
+    def _write_unchanged(self, job: FeedJob, state: Dict[str, Any]) -> Dict[str, int]:
+        with SessionLocal() as db:
+            self._save_state(db, job, state, datetime.utcnow())
+            db.commit()
+        return {**_empty_counts(), "unchanged": 1}
+
+    def _write(self, job: FeedJob, source: str, entries: List[Dict[str, Any]], stored: Dict[str, Optional[str]], state: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Upsert the feed's items with one ``INSERT ... ON CONFLICT (url, language) DO
+        UPDATE`` and save the feed state, in one transaction. The same article
+        imported by feeds in other languages stays a separate item. ``stored`` (from ``_stored``)
+        tells created from updated items for the counters.
+        """
+        counts = _empty_counts()
+        now = datetime.utcnow()
+        rows: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            url = entry.get("url")
+            if not url or len(url) > _URL_MAX:
+                counts["skipped"] += 1
+                continue
+            image_url = entry.get("image_url")
+            counts["updated" if url in stored or url in rows else "created"] += 1
+            rows[url] = {
+                "id": str(uuid.uuid4()),
+                "url": url,
+                "title": entry["title"][:_TITLE_MAX],
+                "summary": entry["summary"],
+                "content": entry.get("content"),
+                "content_etag": entry.get("content_etag"),
+                "source": source[:_SOURCE_MAX],
+                "language": job.language,
+                "status": job.status,
+                "published_at": entry["published_at"],
+                "image_url": image_url if image_url and len(image_url) <= _URL_MAX else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+        with SessionLocal() as db:
+            if rows:
+                table = News.__table__
+                stmt = upsert_insert(db, table)
+                updatable = ("title", "summary", "source", "status", "published_at", "updated_at")
+                set_ = {c: getattr(stmt.excluded, c) for c in updatable}
+                # an item without an image keeps the one stored earlier
+                set_["image_url"] = func.coalesce(stmt.excluded.image_url, table.c.image_url)
+                # likewise the extracted content, with the ETag it was extracted at
+                set_["content"] = func.coalesce(stmt.excluded.content, table.c.content)
+                set_["content_etag"] = case((stmt.excluded.content.isnot(None), stmt.excluded.content_etag), else_=table.c.content_etag)
+                db.execute(stmt.on_conflict_do_update(index_elements=["url", "language"], set_=set_), list(rows.values()))
+            # validators are only stored together with the items they describe
+            self._save_state(db, job, state, now)
+            db.commit()
+        return counts
+
+    async def import_feed(self, job: FeedJob, clients: Optional[HTTPClients] = None) -> Dict[str, int]:
+        """
+        Fetch, parse and store one feed. Raises ``CircuitOpenError`` while its host's
+        circuit is open.
+
+        Polling is conditional: the request carries the stored ``ETag``/``Last-Modified``,
+        and a 304 or a body identical to the last one (by SHA-256) ends the import
+        before parsing. Otherwise only entries whose ``(link, updated)`` fingerprint
+        wasn't in the previous document are written. Each outcome also schedules the
+        feed's next poll (``adapt_interval``) and releases a lease held on it.
+        """
+        circuit = _circuit_name(job.url)
+        if breakers.get(circuit).state == OPEN:
+            raise CircuitOpenError(circuit)
+        client = (clients or http_clients).get("feeds")
+        previous = self._previous_interval(job)
+        unchanged = self._schedule(adapt_interval(previous, 0, []))
+        resp = await self._fetch(client, job.url, job.etag, job.last_modified)
+        if resp is None:
+            # keep the stored state and interval; try again one interval later
+            await asyncio.to_thread(self._reschedule, job, previous)
+            return _empty_counts()
+        if resp.status_code == 304:
+            return await asyncio.to_thread(self._write_unchanged, job, unchanged)
+        body_hash = hashlib.sha256(resp.content).hexdigest()
+        state = {"etag": resp.headers.get("etag"), "last_modified": resp.headers.get("last-modified"), "content_hash": body_hash}
+        if body_hash == job.content_hash:
+            return await asyncio.to_thread(self._write_unchanged, job, {**state, **unchanged})
+        parsed = await self._parse(resp.text, job.url, job.max_items)
+        if not parsed["feed"] and parsed["alternate"]:
+            # an HTML page advertising its feed; validators of the page say nothing about the feed
+            alt = await self._fetch(client, parsed["alternate"])
+            if alt is not None:
+                alt_hash = hashlib.sha256(alt.content).hexdigest()
+                state = {"etag": None, "last_modified": None, "content_hash": alt_hash}
+                if alt_hash == job.content_hash:
+                    return await asyncio.to_thread(self._write_unchanged, job, {**state, **unchanged})
+                alternate = await self._parse(alt.text, parsed["alternate"], job.max_items)
+                if alternate["feed"]:
+                    parsed = alternate
+        if not parsed["feed"]:
+            state = {"etag": None, "last_modified": None, "content_hash": None}
+        fingerprints = [e["fingerprint"] for e in parsed["entries"] if e.get("fingerprint")]
+        state["seen_entries"] = json.dumps(fingerprints)
+        entries = [e for e in parsed["entries"] if e.get("fingerprint") not in job.seen]
+        changed = sum(1 for e in entries if e.get("url"))
+        state.update(self._schedule(adapt_interval(previous, changed, parsed["published"])))
+        stored = await asyncio.to_thread(self._stored, [e["url"] for e in entries if e.get("url")], job.language)
+        if job.download_images:
+            pending = []
+            for entry in entries:
+                kept = stored.get(entry.get("url")) or ""
+                if kept.startswith("/media/"):
+                    # keep the copy downloaded by an earlier import
+                    entry["image_url"] = kept
+                elif entry.get("image_url"):
+                    pending.append(entry)
+            images = await asyncio.gather(*(image_pipeline.fetch(client, e["image_url"]) for e in pending))
+            for entry, local in zip(pending, images):
+                # the remote URL stays when the image couldn't be stored
+                entry["image_url"] = local or entry["image_url"]
+        if job.extract_full:
+            await self._extract_entries(client, entries, job.language)
+        counts = await asyncio.to_thread(self._write, job, parsed["source"], entries, stored, state)
+        counts["seen"] = len(parsed["entries"]) - len(entries)
+        return counts
+
+    async def _extract_entries(self, client: httpx.AsyncClient, entries: List[Dict[str, Any]], language: str) -> None:
+        """
+        Set ``content``/``content_etag`` of the entries whose page yields an article.
+        Pages extracted before are requested with their stored ETag, so an unchanged
+        page (304) keeps its content without being parsed again.
+        """
+        articles = [e for e in entries if e.get("url") and len(e["url"]) <= _URL_MAX]
+        cached = await asyncio.to_thread(self._extracted, [e["url"] for e in articles], language)
+        gate = asyncio.Semaphore(self.extract_concurrency)
+
+        async def extract(entry: Dict[str, Any]) -> None:
+            async with gate:
+                result = await self._extract(client, entry["url"], cached.get(entry["url"]))
+            if result is not None:
+                entry["content"], entry["content_etag"] = result
+
+        await asyncio.gather(*(extract(e) for e in articles))
+
+    def _claim(self, due_only: bool, limit: int) -> List[FeedJob]:
+        """
+        Lease up to ``limit`` enabled feeds (only those due when ``due_only``) for
+        ``lease_sec``. Each lease is a conditional UPDATE that only matches a feed
+        without a live lease, so concurrent workers never claim the same feed.
+        """
+        now = datetime.utcnow()
+        free = or_(RSSFeed.lease_expires_at.is_(None), RSSFeed.lease_expires_at < now)
+        with SessionLocal() as db:
+            query = db.query(RSSFeed.id).filter(RSSFeed.enabled == True, free)  # noqa: E712
+            if due_only:
+                query = query.filter(or_(RSSFeed.next_run_at.is_(None), RSSFeed.next_run_at <= now))
+            ids = [r[0] for r in query.order_by(RSSFeed.next_run_at.asc().nullsfirst()).limit(limit).all()]
+            claimed = []
+            for feed_id in ids:
+                won = db.query(RSSFeed).filter(RSSFeed.id == feed_id, free).update(
+                    {RSSFeed.lease_owner: self.owner, RSSFeed.lease_expires_at: now + timedelta(seconds=self.lease_sec)},
+                    synchronize_session=False,
+                )
+                db.commit()
+                if won:
+                    claimed.append(feed_id)
+            if not claimed:
+                return []
+            return [FeedJob.of(f, leased=True) for f in db.query(RSSFeed).filter(RSSFeed.id.in_(claimed)).all()]
+
+    async def run_once(self, clients: Optional[HTTPClients] = None, due_only: bool = True) -> Dict[str, int]:
+        """
+        Import the feeds that are due (every enabled one with ``due_only=False``)
+        and not leased by another worker; one failing feed doesn't stop the others.
+        """
+        jobs = await asyncio.to_thread(self._claim, due_only, self.concurrency * 4 if due_only else 10_000)
+        gate = asyncio.Semaphore(self.concurrency)
+        stats = {"feeds": len(jobs), "failed": 0, **_empty_counts()}
+
+        async def run(job: FeedJob) -> None:
+            async with gate:
+                try:
+                    counts = await self.import_feed(job, clients)
+                except Exception:
+                    stats["failed"] += 1
+                    try:
+                        await asyncio.to_thread(self._reschedule, job, self._previous_interval(job))
+                    except Exception:
+                        # the lease expires on its own
+                        pass
+                    return
+            for name, n in counts.items():
+                stats[name] += n
+
+        await asyncio.gather(*(run(job) for job in jobs))
+        self._counters["runs"] += 1
+        for name, n in stats.items():
+            self._counters[name] += n
+        self.last_run_at = datetime.utcnow()
+        return stats
+
+    async def run_loop(self) -> None:
+        tick = float(os.getenv("FEED_SCHEDULER_TICK_SEC", "30"))
+        while True:
+            # sleep first: imports never compete with startup
+            await asyncio.sleep(tick)
+            try:
+                await self.run_once()
+            except Exception:
+                # never break background loop
+                pass
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "extraction": dict(self._extraction), "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None}
+
+
+feed_engine = FeedImportEngine(
+    concurrency=int(os.getenv("FEED_IMPORT_CONCURRENCY", "4")),
+    parse_workers=int(os.getenv("FEED_PARSE_WORKERS", "2")),
+    lease_sec=float(os.getenv("FEED_LEASE_SEC", "600")),
+    # first interval of a feed; each poll adapts it
+    default_interval_sec=float(os.getenv("FEED_IMPORT_INTERVAL_SEC", "900")),
+    extract_concurrency=int(os.getenv("FEED_EXTRACT_CONCURRENCY", "4")),
+)
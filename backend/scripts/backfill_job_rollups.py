@@ -0,0 +1,41 @@
+"""
+Build the hourly/daily search rollups behind /jobs/analytics/top from the raw
+``job_search_events`` rows.
+
+  python backend/scripts/backfill_job_rollups.py                    # everything
+  python backend/scripts/backfill_job_rollups.py --since 2026-10-01 # from a day on
+
+Buckets in the backfilled range are replaced, so the command can be re-run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Make the repo root importable regardless of current working directory
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from backend.app.core.database import SessionLocal
+from backend.app.services.job_rollups import backfill, prune_rollups
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Backfill job search rollups from raw events")
+    parser.add_argument("--since", type=lambda v: datetime.fromisoformat(v).replace(tzinfo=timezone.utc), default=None, help="UTC date (YYYY-MM-DD) to start from")
+    parser.add_argument("--batch", type=int, default=10000, help="raw events read per round-trip")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        stats = backfill(db, since=args.since, batch=args.batch)
+        stats["pruned_rows"] = prune_rollups(db)
+        db.commit()
+    for name, value in stats.items():
+        print(f"{name:<14} {value}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Make the repo root importable regardless of current working directory
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from backend.app.schemas.job import JobItem
+from backend.app.services.job_dedup import dedupe
+
+
+ROLES = ["Software Engineer", "Data Scientist", "Pflegefachfrau HF", "Sales Manager", "Backend Developer Python",
+         "Project Manager", "Koch", "Logistiker EFZ", "Account Executive", "UX Designer", "Elektroinstallateur"]
+LEVELS = ["", "Senior ", "Junior ", "Lead "]
+COMPANIES = [f"Company {i} AG" for i in range(400)]
+CITIES = ["Zürich", "Bern", "Basel", "Lausanne", "Genève", "Luzern", "St. Gallen", "Lugano"]
+SOURCES = ["jsearch", "indeed", "rav"]
+
+
+def _variant(title: str, rnd: random.Random) -> str:
+    # the kind of noise providers add to the same posting
+    return rnd.choice([title, f"{title} (m/w/d)", f"{title} 80-100%", title.upper(), f" {title} - "])
+
+
+def make_items(n: int, dup_ratio: float, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    items = []
+    originals = []
+    for i in range(n):
+        if originals and rnd.random() < dup_ratio:
+            title, company, city = rnd.choice(originals)
+            title = _variant(title, rnd)
+            if rnd.random() < 0.5:
+                company = company.replace(" AG", "")
+        else:
+            title = rnd.choice(LEVELS) + rnd.choice(ROLES) + f" {rnd.randint(1, 50)}"
+            company, city = rnd.choice(COMPANIES), rnd.choice(CITIES)
+            originals.append((title, company, city))
+        source = rnd.choice(SOURCES)
+        items.append(JobItem(id=f"{source}:{i}", source=source, title=title, company=company, location=city, url=f"https://example.com/{i}"))
+    return items
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cross-provider job deduplication")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--dup-ratio", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    kept = 0
+    for _ in range(args.repeat):
+        items = make_items(args.items, args.dup_ratio)
+        start = time.perf_counter()
+        kept = len(dedupe(items))
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"items={args.items} kept={kept} collapsed={args.items - kept}")
+    print(f"best={best * 1000:.1f}ms median={sorted(timings)[len(timings) // 2] * 1000:.1f}ms per_item={best / args.items * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    run()
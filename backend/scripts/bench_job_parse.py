@@ -0,0 +1,88 @@
+"""
+Time and allocations of the provider parse path per 1k raw records:
+parse -> newest-first merge -> dedup -> first page of JobItem.
+
+  python backend/scripts/bench_job_parse.py [--records 3000] [--per-page 20]
+
+Uses the recorded payloads of bench_jobs_search.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Make the repo root importable regardless of current working directory
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from backend.app.services import jobs_aggregator
+from backend.app.services.job_dedup import dedupe
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "jobs"
+
+
+def _raw_records(n: int) -> List[Tuple[Callable[[dict], Any], dict]]:
+    jsearch = json.loads((FIXTURES / "jsearch.json").read_text())
+    indeed = json.loads((FIXTURES / "indeed.json").read_text())
+    rav = json.loads((FIXTURES / "rav.json").read_text())
+    pool: List[Tuple[Callable[[dict], Any], dict]] = []
+    pool += [(lambda it: jobs_aggregator._parse_jsearch(it, "ZH"), it) for page in jsearch["pages"] for it in page["data"]]
+    pool += [(lambda it: jobs_aggregator._parse_indeed(it, "ZH"), it) for body in indeed["variants"].values() for it in body["jobs"]]
+    pool += [(jobs_aggregator._parse_rav, it) for page in rav["pages"] for it in page["content"]]
+    out = []
+    for i in range(n):
+        parse, raw = pool[i % len(pool)]
+        # unique ids/titles so dedup keeps a realistic share of the records
+        raw = {**raw, "job_id": f"{raw.get('job_id')}-{i}", "jobkey": f"{raw.get('jobkey')}-{i}", "id": f"{raw.get('id')}-{i}"}
+        for key in ("job_title", "title"):
+            if key in raw:
+                raw[key] = f"{raw[key]} {i % 211}"
+        out.append((parse, raw))
+    return out
+
+
+def pipeline(records: List[Tuple[Callable[[dict], Any], dict]], per_page: int) -> list:
+    parsed = [p for p in (parse(raw) for parse, raw in records) if p is not None]
+    page = dedupe(jobs_aggregator._newest_first(parsed))[:per_page]
+    # older trees parse straight into JobItem; newer ones build it for the page only
+    return [r.to_item() if hasattr(r, "to_item") else r for r in page]
+
+
+def measure(records: List[Tuple[Callable[[dict], Any], dict]], per_page: int, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pipeline(records, per_page)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    pipeline(records, per_page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_k = 1000 / len(records)
+    return {
+        "ms_per_1k": round(min(timings) * 1000 * per_k, 2),
+        "peak_kib_per_1k": round(peak / 1024 * per_k, 1),
+    }
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the jobs aggregator parse path")
+    parser.add_argument("--records", type=int, default=3000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    records = _raw_records(args.records)
+    for name, value in measure(records, args.per_page, args.repeat).items():
+        print(f"{name:<20} {value}")
+
+
+if __name__ == "__main__":
+    run()
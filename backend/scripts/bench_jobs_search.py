@@ -0,0 +1,302 @@
+"""
+Replay benchmark for the jobs aggregator.
+
+Provider payloads recorded in scripts/fixtures/jobs/ are served through an
+httpx mock transport with per-provider latency and error injection, so the
+aggregator can be measured without spending RapidAPI quota.
+
+  python backend/scripts/bench_jobs_search.py                  # run and compare with the baseline
+  python backend/scripts/bench_jobs_search.py --write-baseline # store the current numbers
+  python backend/scripts/bench_jobs_search.py --latency rav=400 --errors indeed=0.3
+  python backend/scripts/bench_jobs_search.py --record         # refresh fixtures from the live APIs (spends quota)
+
+Exits with status 1 when a metric regressed by more than --tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Make the repo root importable regardless of current working directory
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import httpx
+
+from backend.app.core import circuit
+from backend.app.core.http import HTTPClients
+from backend.app.services import jobs_aggregator
+from backend.app.services.job_dedup import dedupe
+from backend.app.services.provider_budget import ProviderBudget
+from backend.app.services.provider_variants import VariantMemory
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "jobs"
+BASELINE = FIXTURES / "baseline.json"
+JSEARCH_HOST = "jsearch.p.rapidapi.com"
+INDEED_HOST = "indeed-api.p.rapidapi.com"
+RAV_BASE = "https://rav.bench.local/api"
+DEFAULT_LATENCY_MS = {"jsearch": 150.0, "indeed": 250.0, "rav": 90.0}
+# Metrics where a bigger number is better; everything else is a cost
+HIGHER_IS_BETTER = ("_per_sec",)
+
+
+class _OfflineVariantMemory(VariantMemory):
+    """Variant learning without the database."""
+
+    async def load_if_stale(self) -> None:
+        return
+
+    def _persist(self, *args: Any, **kwargs: Any) -> None:
+        return
+
+
+def _provider_of(request: httpx.Request) -> str:
+    if request.url.host == JSEARCH_HOST:
+        return "jsearch"
+    if request.url.host == INDEED_HOST:
+        return "indeed"
+    return "rav"
+
+
+def _load_fixtures() -> Dict[str, Any]:
+    return {name: json.loads((FIXTURES / f"{name}.json").read_text()) for name in ("jsearch", "indeed", "rav")}
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded payloads. ``latency_ms`` is the mean delay per provider
+    (±30% jitter); ``error_rates`` is the share of requests answered with a 503.
+    """
+
+    def __init__(self, fixtures: Dict[str, Any], latency_ms: Dict[str, float], error_rates: Dict[str, float], seed: int = 1) -> None:
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.error_rates = error_rates
+        self.rnd = random.Random(seed)
+        self.requests: Dict[str, int] = {"jsearch": 0, "indeed": 0, "rav": 0}
+
+    def _payload(self, provider: str, request: httpx.Request) -> Tuple[int, Any]:
+        params = request.url.params
+        if provider == "jsearch":
+            pages = self.fixtures["jsearch"]["pages"]
+            page = int(params.get("page", "1"))
+            return 200, pages[page - 1] if 1 <= page <= len(pages) else {"data": []}
+        if provider == "indeed":
+            key = f"{request.url.path}?{','.join(sorted(params))}"
+            body = self.fixtures["indeed"]["variants"].get(key)
+            return (200, body) if body is not None else (404, {"message": "Endpoint does not exist"})
+        pages = self.fixtures["rav"]["pages"]
+        page = int(params.get("page", "0"))
+        return 200, pages[page] if page < len(pages) else {"content": []}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        provider = _provider_of(request)
+        self.requests[provider] += 1
+        delay = self.latency_ms.get(provider, 0.0) * self.rnd.uniform(0.7, 1.3)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if self.rnd.random() < self.error_rates.get(provider, 0.0):
+            return httpx.Response(503, json={"message": "injected"}, request=request)
+        status, body = self._payload(provider, request)
+        return httpx.Response(status, json=body, request=request)
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {"p50_ms": round(pick(0.50), 2), "p90_ms": round(pick(0.90), 2), "p99_ms": round(pick(0.99), 2)}
+
+
+def _configure(scenario: str) -> None:
+    os.environ["RAPIDAPI_KEY"] = "bench"
+    os.environ["RAPIDAPI_HOST"] = JSEARCH_HOST if scenario == "jsearch" else INDEED_HOST
+    os.environ["RAV_API_URL"] = RAV_BASE
+    jobs_aggregator.variant_memory = _OfflineVariantMemory(refresh_sec=3600, half_life_sec=3600, reprobe_sec=10 ** 9)
+    # a fresh registry per scenario: injected errors may still open circuits within a run
+    jobs_aggregator.breakers = circuit.CircuitBreakers()
+    # unlimited and in-process: the bench measures the search path, not the quota
+    jobs_aggregator.rapidapi_budget = ProviderBudget("rapidapi", monthly_quota=0, rate_per_sec=0, burst=1, session_factory=None)
+
+
+async def _end_to_end(scenario: str, transport: ReplayTransport, runs: int, concurrency: int, per_page: int) -> Dict[str, float]:
+    _configure(scenario)
+    clients = HTTPClients(transport=transport)
+    samples: List[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            started = time.perf_counter()
+            await jobs_aggregator.search_jobs(q=f"engineer {i % 7}", canton="ZH", page=1, per_page=per_page, clients=clients)
+            samples.append((time.perf_counter() - started) * 1000)
+
+    try:
+        await asyncio.gather(*(one(i) for i in range(runs)))
+    finally:
+        await clients.aclose()
+    return _percentiles(samples)
+
+
+def _parse_throughput(fixtures: Dict[str, Any], repeat: int) -> Dict[str, float]:
+    raw = {
+        "jsearch": [it for page in fixtures["jsearch"]["pages"] for it in page["data"]],
+        "indeed": [it for body in fixtures["indeed"]["variants"].values() for it in body.get("jobs", [])],
+        "rav": [it for page in fixtures["rav"]["pages"] for it in page["content"]],
+    }
+    parsers = {
+        "jsearch": lambda it: jobs_aggregator._parse_jsearch(it, "ZH"),
+        "indeed": lambda it: jobs_aggregator._parse_indeed(it, "ZH"),
+        "rav": jobs_aggregator._parse_rav,
+    }
+    out: Dict[str, float] = {}
+    for name, items in raw.items():
+        parse = parsers[name]
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for it in items:
+                parse(it)
+        elapsed = time.perf_counter() - started
+        out[f"parse_{name}_items_per_sec"] = round(len(items) * repeat / elapsed, 1)
+    return out
+
+
+def _merge_cost(fixtures: Dict[str, Any], n_items: int, repeat: int) -> Dict[str, float]:
+    pool = [jobs_aggregator._parse_jsearch(it, "ZH") for page in fixtures["jsearch"]["pages"] for it in page["data"]]
+    pool += [jobs_aggregator._parse_rav(it) for page in fixtures["rav"]["pages"] for it in page["content"]]
+    pool = [p for p in pool if p]
+    rnd = random.Random(3)
+    items = []
+    for i in range(n_items):
+        item = copy.copy(rnd.choice(pool))
+        item.id, item.title = f"{item.id}-{i}", f"{item.title} {i % 97}"
+        items.append(item)
+    sort_ms: List[float] = []
+    dedupe_ms: List[float] = []
+    for _ in range(repeat):
+        batch = [copy.copy(it) for it in items]
+        started = time.perf_counter()
+        merged = jobs_aggregator._newest_first(batch)
+        sort_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        dedupe(merged)
+        dedupe_ms.append((time.perf_counter() - started) * 1000)
+    return {f"merge_sort_{n_items}_ms": round(statistics.median(sort_ms), 2), f"dedupe_{n_items}_ms": round(statistics.median(dedupe_ms), 2)}
+
+
+def _parse_map(values: List[str]) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for value in values:
+        for part in value.split(","):
+            name, _, number = part.partition("=")
+            out[name.strip()] = float(number)
+    return out
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    regressions = []
+    for name, base in baseline.items():
+        now = current.get(name)
+        if now is None or not base:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            worse = now < base * (1 - tolerance)
+        else:
+            worse = now > base * (1 + tolerance)
+        if worse:
+            regressions.append(f"{name}: {now} vs baseline {base}")
+    return regressions
+
+
+async def _record() -> None:
+    """Fetch fresh payloads from the live providers (uses the real keys and quota)."""
+    key = os.getenv("RAPIDAPI_KEY") or os.getenv("RAPID_API_KEY")
+    if not key:
+        raise SystemExit("RAPIDAPI_KEY is required for --record")
+    headers = {"x-rapidapi-key": key, "Accept": "application/json"}
+    async with httpx.AsyncClient(timeout=20.0) as client:
+        pages = []
+        for page in range(1, 4):
+            r = await client.get(f"https://{JSEARCH_HOST}/search", params={"query": "engineer in Zurich", "page": str(page), "num_pages": "1", "country": "ch"}, headers={**headers, "x-rapidapi-host": JSEARCH_HOST})
+            pages.append({"data": r.json().get("data") or []} if r.status_code == 200 else {"data": []})
+        (FIXTURES / "jsearch.json").write_text(json.dumps({"pages": pages}, indent=1))
+        r = await client.get(f"https://{INDEED_HOST}/search", params={"q": "engineer", "l": "Zurich, Switzerland", "page": "1"}, headers={**headers, "x-rapidapi-host": INDEED_HOST})
+        if r.status_code == 200:
+            (FIXTURES / "indeed.json").write_text(json.dumps({"variants": {"/search?l,page,q": r.json()}}, indent=1))
+        rav_base = os.getenv("RAV_API_URL")
+        if rav_base:
+            rav_pages = []
+            for page in range(3):
+                r = await client.get(f"{rav_base.rstrip('/')}/jobAdvertisements", params={"query": "engineer", "page": str(page), "size": "20"})
+                rav_pages.append({"content": r.json().get("content") or []} if r.status_code == 200 else {"content": []})
+            (FIXTURES / "rav.json").write_text(json.dumps({"pages": rav_pages}, indent=1))
+    print(f"Recorded fixtures into {FIXTURES}")
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Replay benchmark for jobs_aggregator.search_jobs")
+    parser.add_argument("--runs", type=int, default=60, help="end-to-end searches per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", action="append", default=[], help="provider=ms, e.g. rav=400")
+    parser.add_argument("--errors", action="append", default=[], help="provider=rate, e.g. indeed=0.2")
+    parser.add_argument("--merge-items", type=int, default=5000)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(_record())
+        return
+
+    fixtures = _load_fixtures()
+    latency = {**DEFAULT_LATENCY_MS, **_parse_map(args.latency)}
+    errors = _parse_map(args.errors)
+    metrics: Dict[str, float] = {}
+    for scenario in ("jsearch", "indeed"):
+        transport = ReplayTransport(fixtures, latency, errors)
+        for name, value in asyncio.run(_end_to_end(scenario, transport, args.runs, args.concurrency, args.per_page)).items():
+            metrics[f"e2e_{scenario}_{name}"] = value
+    metrics.update(_parse_throughput(fixtures, repeat=200))
+    metrics.update(_merge_cost(fixtures, args.merge_items, repeat=5))
+
+    width = max(len(k) for k in metrics)
+    for name, value in metrics.items():
+        print(f"{name:<{width}}  {value}")
+
+    if args.write_baseline:
+        BASELINE.write_text(json.dumps(metrics, indent=2, sort_keys=True) + "\n")
+        print(f"Wrote {BASELINE}")
+        return
+    if not BASELINE.exists():
+        print("No baseline stored yet; run with --write-baseline")
+        return
+    # Injected latency/errors change the numbers on purpose; only compare default runs
+    if args.latency or args.errors:
+        return
+    regressions = compare(metrics, json.loads(BASELINE.read_text()), args.tolerance)
+    if regressions:
+        print("Regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,109 @@
+import time
+
+from app.core import circuit
+from app.core.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_breaker_opens_on_failure_rate_and_recovers(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", window=10, min_calls=4, failure_rate=0.5, slow_call_ms=1000, open_sec=30)
+
+    breaker.record(True, 50)
+    breaker.record(False, 50)
+    breaker.record(True, 2000)  # slow calls count as failures
+    assert breaker.state == CLOSED
+    breaker.record(True, 50)
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    now[0] += 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # one trial call at a time
+    breaker.record(False, 50)
+    assert breaker.state == OPEN
+
+    now[0] += 31
+    assert breaker.allow() is True
+    breaker.record(True, 50)
+    assert breaker.state == CLOSED
+    snap = breaker.snapshot()
+    assert snap["opened"] == 2 and snap["rejected"] == 2
+
+
+def test_open_provider_circuit_is_skipped(monkeypatch):
+    import asyncio
+
+    import httpx
+
+    from app.core.http import HTTPClients
+    from app.services.jobs_aggregator import SOURCE_SKIPPED, search_jobs
+
+    for key in ("RAPIDAPI_KEY", "RAPID_API_KEY", "INDEED_RAPIDAPI_KEY"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("RAV_API_URL", "https://rav.example.com/api")
+    registry = circuit.CircuitBreakers()
+    monkeypatch.setattr("app.services.jobs_aggregator.breakers", registry)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        return httpx.Response(503)
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            return [await search_jobs(q="dev", canton=None, page=1, per_page=10, clients=clients) for _ in range(7)]
+        finally:
+            await clients.aclose()
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 5
+    assert results[-1][1]["rav"] == SOURCE_SKIPPED
+
+
+def test_cancelled_trial_frees_the_half_open_slot(monkeypatch):
+    import asyncio
+
+    import httpx
+
+    from app.routers import live
+
+    # real clock (the event loop runs on time.monotonic); a lost trial would only expire after open_sec
+    breaker = CircuitBreaker("overpass", window=10, min_calls=1, failure_rate=0.5, open_sec=0.05)
+    registry = circuit.CircuitBreakers()
+    registry._breakers["overpass"] = breaker
+    monkeypatch.setattr(live, "breakers", registry)
+    breaker.record(False, 50)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={"elements": []})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            task = asyncio.create_task(live._overpass_hours(client, 47.37, 8.54, "Office"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # the trial never reached a verdict: the next call may try again right away
+            return breaker.allow(), breaker.state
+
+    assert asyncio.run(run()) == (True, HALF_OPEN)
+
+
+def test_lost_trial_expires_after_open_sec(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", window=10, min_calls=1, failure_rate=0.5, open_sec=30)
+    breaker.record(False, 50)
+    now[0] += 31
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    # the trial's caller vanished without record() or release()
+    now[0] += 30
+    assert breaker.allow() is True
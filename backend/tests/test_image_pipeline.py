@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+
+from app.services import image_pipeline as pipeline_module
+from app.services.image_pipeline import ImagePipeline, sniff_extension
+
+JPEG = b"\xff\xd8\xff\xe0" + b"j" * 2000
+PNG = b"\x89PNG\r\n\x1a\n" + b"p" * 100
+
+
+def test_sniff_prefers_magic_bytes_over_content_type():
+    assert sniff_extension(PNG, "image/jpeg") == ".png"
+    assert sniff_extension(b"RIFF\x00\x00\x00\x00WEBPVP8 ", None) == ".webp"
+    assert sniff_extension(b"\x00\x00\x00\x1cftypavif", "application/octet-stream") == ".avif"
+    assert sniff_extension(b"<html>", "image/gif") == ".gif"
+    assert sniff_extension(b"<html>", "text/html; charset=utf-8") is None
+
+
+def test_images_are_capped_typed_and_stored_once_per_content(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline_module, "UPLOAD_DIR", tmp_path)
+    requests = []
+
+    async def endless():
+        while True:
+            yield b"\xff\xd8\xff" + b"x" * 1021
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        path = request.url.path
+        if path.startswith("/hero"):
+            # the same picture behind several URLs
+            return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=JPEG)
+        if path == "/logo":
+            return httpx.Response(200, headers={"content-type": "text/plain"}, content=PNG)
+        if path == "/page":
+            return httpx.Response(200, headers={"content-type": "text/html"}, content=b"<html>not an image</html>")
+        if path == "/huge":
+            return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=b"\xff\xd8\xff" + b"x" * 10_000)
+        # no Content-Length: the cap must stop the stream itself
+        return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=endless())
+
+    pipeline = ImagePipeline(concurrency=2, max_bytes=4096, chunk_size=512)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://img.example") as client:
+            urls = ["/hero/1", "/hero/1", "/hero/1", "/hero/2", "/hero/3", "/logo", "/page", "/huge", "/stream"]
+            first = await asyncio.gather(*(pipeline.fetch(client, f"https://img.example{u}") for u in urls))
+            again = await pipeline.fetch(client, "https://img.example/hero/2")
+            return first, again
+
+    (h1a, h1b, h1c, h2, h3, logo, page, huge, stream), again = asyncio.run(run())
+
+    assert h1a == h1b == h1c == h2 == h3 == again
+    assert h1a.startswith("/media/") and h1a.endswith(".jpg")
+    assert logo.endswith(".png")
+    assert page is None and huge is None and stream is None
+    # concurrent requests for one URL share a download, later ones are remembered
+    assert requests.count("/hero/1") == 1 and requests.count("/hero/2") == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([h1a.rsplit("/", 1)[1], logo.rsplit("/", 1)[1]])
+    stats = pipeline.stats()
+    assert (stats["stored"], stats["deduplicated"], stats["too_large"], stats["not_image"]) == (2, 2, 2, 1)
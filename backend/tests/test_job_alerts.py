@@ -0,0 +1,77 @@
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.job import JobAlert, JobSavedSearch
+from app.schemas.job import JobItem
+from app.services import job_alerts
+from app.services.job_alerts import AlertMatcher, MatcherCache, SavedSearchSpec, load_matcher, record_alerts
+
+
+def _job(i: int, title: str, canton: str = "ZH", employment_type: str | None = None) -> JobItem:
+    return JobItem(id=f"rav:{i}", source="rav", title=title, company="ACME", location="Zürich", canton=canton, url="https://x", employment_type=employment_type)
+
+
+def test_matcher_requires_all_terms_canton_and_employment_type():
+    searches = [
+        SavedSearchSpec.from_row("1", "u", "python developer", "zh", None),
+        SavedSearchSpec.from_row("2", "u", "python", None, "full_time"),
+        SavedSearchSpec.from_row("3", "u", "", "BE", None),
+        SavedSearchSpec.from_row("4", "u", "nurse", None, None),
+    ]
+    matcher = AlertMatcher(searches)
+
+    hits = matcher.match([
+        _job(1, "Senior Python Developers", employment_type="FULLTIME"),
+        _job(2, "Python Developer", canton="BE"),
+        _job(3, "Data Engineer", canton="BE"),
+    ])
+
+    assert sorted((sid, [it.id for it in items]) for sid, (_, items) in hits.items()) == [
+        ("1", ["rav:1"]),
+        ("2", ["rav:1"]),
+        ("3", ["rav:2", "rav:3"]),
+    ]
+
+
+def test_alerts_are_recorded_once_per_search_and_job():
+    engine = create_engine("sqlite://")
+    JobSavedSearch.__table__.create(engine)
+    JobAlert.__table__.create(engine)
+    user_id = uuid.uuid4()
+    with Session(engine) as db:
+        db.add(JobSavedSearch(user_id=user_id, keyword="python", canton="ZH"))
+        db.commit()
+        jobs = [_job(1, "Python Developer"), _job(2, "Nurse")]
+
+        assert record_alerts(db, load_matcher(db).match(jobs)) == 1
+        assert record_alerts(db, load_matcher(db).match(jobs)) == 0
+        db.commit()
+
+        alerts = db.query(JobAlert).all()
+        assert [(a.job_id, a.user_id) for a in alerts] == [("rav:1", user_id)]
+        assert db.query(JobSavedSearch).one().last_matched_at is not None
+
+
+def test_matcher_is_reused_until_saved_searches_change(monkeypatch):
+    engine = create_engine("sqlite://")
+    JobSavedSearch.__table__.create(engine)
+    JobAlert.__table__.create(engine)
+    loads = []
+    monkeypatch.setattr(job_alerts, "load_matcher", lambda db: loads.append(1) or load_matcher(db))
+    cache = MatcherCache(refresh_sec=3600)
+    monkeypatch.setattr(job_alerts, "alert_matcher", cache)
+    with Session(engine) as db:
+        db.add(JobSavedSearch(user_id=uuid.uuid4(), keyword="python", canton="ZH"))
+        db.commit()
+
+        assert job_alerts.alert_new(db, [_job(1, "Python Developer")]) == 1
+        assert job_alerts.alert_new(db, [_job(2, "Python Engineer")]) == 1
+        assert len(loads) == 1
+
+        db.add(JobSavedSearch(user_id=uuid.uuid4(), keyword="nurse", canton=None))
+        db.commit()
+        cache.invalidate()
+        assert job_alerts.alert_new(db, [_job(3, "Nurse"), _job(4, "Python Dev")]) == 2
+        assert len(loads) == 2
@@ -0,0 +1,36 @@
+from app.schemas.job import JobItem
+from app.services.job_dedup import dedupe
+
+
+def _item(source: str, title: str, company: str = "ACME AG", location: str = "Zürich", **kwargs) -> JobItem:
+    return JobItem(id=f"{source}:{title}", source=source, title=title, company=company, location=location, url="https://x", **kwargs)
+
+
+def test_same_posting_from_several_providers_is_collapsed():
+    items = [
+        _item("jsearch", "Software Engineer (m/w/d)", location="Zurich, ZH, CH"),
+        _item("indeed", "Software Engineer", company="Acme", salary="120k"),
+        _item("rav", "Software Engineers 80-100%"),
+    ]
+
+    out = dedupe(items)
+
+    assert len(out) == 1
+    assert out[0].id == "jsearch:Software Engineer (m/w/d)"
+    assert out[0].sources == ["jsearch", "indeed", "rav"]
+    assert out[0].salary == "120k"
+
+
+def test_near_duplicate_titles_need_same_company_and_city():
+    items = [
+        _item("jsearch", "Senior Backend Developer Python Django"),
+        _item("indeed", "Backend Developer Python Django Senior"),
+        _item("rav", "Senior Backend Developer Python Django", company="Other GmbH"),
+        _item("rav", "Senior Backend Developer Python Django", location="Bern"),
+        _item("indeed", "Sales Manager"),
+    ]
+
+    out = dedupe(items)
+
+    assert [it.source for it in out] == ["jsearch", "rav", "rav", "indeed"]
+    assert out[0].sources == ["jsearch", "indeed"]
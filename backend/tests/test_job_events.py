@@ -0,0 +1,79 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.job import JobSearchEvent, JobSearchRollup
+from app.services.job_events import EventSink
+from app.services.job_rollups import backfill, top_keywords
+
+
+def _engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    JobSearchEvent.__table__.create(engine)
+    JobSearchRollup.__table__.create(engine)
+    return engine
+
+
+def _count(engine) -> int:
+    with Session(engine) as db:
+        return db.scalar(select(func.count()).select_from(JobSearchEvent))
+
+
+def test_events_are_written_in_batches_and_drained_on_close():
+    engine = _engine()
+    sink = EventSink(batch_size=3, flush_sec=60, max_buffer=100, session_factory=lambda: Session(engine))
+
+    async def run():
+        sink.submit([("python", "ZH"), ("nurse", None)])
+        await asyncio.sleep(0.05)
+        before_batch = _count(engine)
+        sink.submit([("java", "BE")])
+        await asyncio.sleep(0.05)
+        after_batch = _count(engine)
+        sink.submit([("rust", None)])
+        await sink.aclose()
+        return before_batch, after_batch
+
+    assert asyncio.run(run()) == (0, 3)
+    assert _count(engine) == 4
+    assert sink.stats()["flushes"] == 2
+
+
+def test_endpoint_accepts_query_params_and_arrays(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    engine = _engine()
+    sink = EventSink(batch_size=1000, flush_sec=60, max_buffer=100, session_factory=lambda: Session(engine))
+    monkeypatch.setattr("app.routers.jobs.event_sink", sink)
+    client = TestClient(app)
+
+    assert client.post("/api/v1/jobs/analytics/events", params={"keyword": " Python "}).status_code == 204
+    res = client.post("/api/v1/jobs/analytics/events", json=[{"keyword": "Nurse", "canton": "BE"}, {"keyword": "java"}])
+    assert res.status_code == 204
+    assert client.post("/api/v1/jobs/analytics/events").status_code == 422
+
+    assert sink.stats()["buffered"] == 3
+    sink.flush()
+    with Session(engine) as db:
+        assert sorted(db.scalars(select(JobSearchEvent.keyword))) == ["java", "nurse", "python"]
+
+
+def test_top_keywords_come_from_rollups_and_backfill_is_idempotent():
+    engine = _engine()
+    now = datetime(2026, 10, 18, 12, 30)
+    events = [("python", "ZH", now), ("python", "ZH", now - timedelta(hours=3)), ("nurse", None, now - timedelta(days=3)), ("java", None, now - timedelta(days=20))]
+    with Session(engine) as db:
+        db.execute(insert(JobSearchEvent.__table__), [{"id": uuid.uuid4(), "keyword": k, "canton": c, "created_at": t} for k, c, t in events])
+        for _ in range(2):
+            backfill(db)
+        db.commit()
+
+        assert top_keywords(db, "24h", 10, now=now) == [("python", "ZH", 2)]
+        assert top_keywords(db, "7d", 10, now=now) == [("python", "ZH", 2), ("nurse", None, 1)]
+        assert [k for k, _, _ in top_keywords(db, "30d", 10, now=now)] == ["python", "java", "nurse"]
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.job import JobPosting
+from app.schemas.job import JobItem
+from app.services.job_facets import compute_facets, facet_counts, salary_stats
+from app.services.job_index import index_columns, upsert_jobs
+
+
+def test_salary_stats_annualize_ranges_and_units():
+    stats = salary_stats(["CHF 80'000 - 100'000", "120k", "6 500 per month", "40.00 / hour", "nach Vereinbarung", None])
+    # 90'000, 120'000, 78'000, 87'360
+    assert stats["count"] == 4
+    assert (stats["min"], stats["max"]) == (78000, 120000)
+    assert stats["p50"] == 88680
+    assert salary_stats(["competitive", None]) is None
+
+
+def test_facet_counts_most_frequent_first():
+    assert facet_counts(["ZH", "BE", None, "ZH", "", "GE", "BE", "ZH"], top=2) == [
+        {"value": "ZH", "count": 3},
+        {"value": "BE", "count": 2},
+    ]
+
+
+def test_facets_over_index_columns():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    JobPosting.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    items = [
+        JobItem(id=f"indeed:{i}", source="indeed" if i % 3 else "rav", title=f"Python developer {i}", company="Acme" if i < 4 else "Globex", canton="ZH" if i % 2 else "BE", url=f"https://x/{i}", salary=f"{90 + i}k")
+        for i in range(6)
+    ] + [JobItem(id="rav:cook", source="rav", title="Cook", canton="ZH", url="https://x/cook", salary="5000 per month")]
+    with Session() as db:
+        upsert_jobs(db, items, now=datetime.utcnow())
+        db.commit()
+        columns = index_columns(db, "python", None, ("canton", "employment_type", "company", "source", "salary"), 100)
+
+    facets = compute_facets(columns, "index")
+    assert facets["matched"] == 6
+    assert facets["counts"]["company"] == [{"value": "Acme", "count": 4}, {"value": "Globex", "count": 2}]
+    assert facets["counts"]["source"] == [{"value": "indeed", "count": 4}, {"value": "rav", "count": 2}]
+    assert facets["counts"]["employment_type"] == []
+    assert facets["salary"]["min"] == 90000 and facets["salary"]["max"] == 95000
+
+
+def test_result_page_facets_are_not_shared_between_pages(monkeypatch):
+    import asyncio
+
+    from app.routers import jobs as jobs_router
+    from app.services.jobs_cache import SearchCache
+
+    pages = {
+        1: [JobItem(id="rav:1", source="rav", title="Dev", url="https://x/1", company="Acme")],
+        2: [JobItem(id="rav:2", source="rav", title="Dev", url="https://x/2", company="Globex")],
+    }
+
+    async def indexed_search(q, canton, page, per_page, cursor=None, clients=None):
+        return pages[page], {"rav": 1}, {}, None
+
+    async def cold_index(q, canton):
+        return None
+
+    monkeypatch.setattr(jobs_router, "indexed_search", indexed_search)
+    monkeypatch.setattr(jobs_router, "index_facets", cold_index)
+    monkeypatch.setattr(jobs_router, "search_cache", SearchCache(ttl=60, stale_ttl=60, max_bytes=1 << 20))
+
+    async def run():
+        return [await jobs_router.search(None, q="dev", page=page, per_page=1, facets=True) for page in (1, 2)]
+
+    first, second = asyncio.run(run())
+
+    assert first.facets.basis == second.facets.basis == "results"
+    assert [c.value for c in first.facets.counts["company"]] == ["Acme"]
+    assert [c.value for c in second.facets.counts["company"]] == ["Globex"]
@@ -0,0 +1,123 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.http import HTTPClients
+from app.models.job import JobAlert, JobIndexCoverage, JobPosting, JobSavedSearch
+from app.schemas.job import JobItem
+from app.services import job_alerts, job_index
+from app.services.job_index import expire_stale, indexed_search, query_index, record_coverage, upsert_jobs
+
+
+def _session() -> Session:
+    engine = create_engine("sqlite://")
+    JobPosting.__table__.create(engine)
+    return Session(engine)
+
+
+def _job(i: int, title: str, canton: str = "ZH") -> JobItem:
+    return JobItem(
+        id=f"indeed:{i}",
+        source="indeed",
+        title=title,
+        company="ACME",
+        location="Zurich",
+        canton=canton,
+        url=f"https://example.com/{i}",
+        posted_at=datetime(2026, 1, 1) + timedelta(days=i),
+    )
+
+
+def test_upsert_reports_only_new_ids_and_search_matches_prefixes():
+    with _session() as db:
+        assert upsert_jobs(db, [_job(1, "Python Developer"), _job(2, "Nurse", canton="BE")]) == ["indeed:1", "indeed:2"]
+        assert upsert_jobs(db, [_job(1, "Senior Python Developer"), _job(3, "Python Engineer")]) == ["indeed:3"]
+        db.commit()
+
+        items, total = query_index(db, "pyth", "zh", offset=0, limit=10)
+        assert total == 2
+        assert [it.id for it in items] == ["indeed:3", "indeed:1"]
+        assert items[1].title == "Senior Python Developer"
+
+        items, total = query_index(db, None, "BE", offset=0, limit=10)
+        assert [it.id for it in items] == ["indeed:2"]
+
+
+def test_expire_stale_drops_postings_from_search():
+    with _session() as db:
+        upsert_jobs(db, [_job(1, "Python Developer")], now=datetime.utcnow() - timedelta(days=30))
+        upsert_jobs(db, [_job(2, "Python Engineer")])
+        assert expire_stale(db) == 1
+        db.commit()
+
+        items, total = query_index(db, "python", None, offset=0, limit=10)
+        assert [it.id for it in items] == ["indeed:2"]
+
+
+def test_write_back_rows_do_not_make_the_index_warm(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    JobPosting.__table__.create(engine)
+    JobIndexCoverage.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(job_index, "SessionLocal", Session)
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.delenv("RAV_API_URL", raising=False)
+    # what an earlier live search for "python" in ZH wrote back
+    with Session() as db:
+        upsert_jobs(db, [_job(1, "Python Developer")])
+        db.commit()
+    live = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        live.append(request.url.params["query"])
+        data = [{"job_id": f"l{i}", "job_title": f"Nurse {i}", "job_apply_link": f"https://x/{i}", "job_posted_at_timestamp": 1_700_000_000 + i} for i in range(3)]
+        return httpx.Response(200, json={"data": data})
+
+    async def search(**kwargs):
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            return await indexed_search(page=1, per_page=10, clients=clients, **kwargs)
+        finally:
+            await clients.aclose()
+
+    items, sources, _, _ = asyncio.run(search(q=None, canton="ZH"))
+    assert "index" not in sources and len(items) == 3
+    assert set(live) == {"jobs in Zurich"}
+
+    # once the ingester covered ZH, the index answers on its own
+    with Session() as db:
+        record_coverage(db, "zh", 20)
+        db.commit()
+    live.clear()
+    items, sources, _, _ = asyncio.run(search(q="python", canton="ZH"))
+    assert sources == {"index": 1} and [it.id for it in items] == ["indeed:1"]
+    assert live == []
+    # other cantons (and all of Switzerland) are still cold
+    asyncio.run(search(q="python", canton="BE"))
+    asyncio.run(search(q="python", canton=None))
+    assert set(live) == {"python in Bern", "python in Switzerland"}
+
+
+def test_postings_first_indexed_by_write_back_raise_alerts(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (JobPosting, JobIndexCoverage, JobSavedSearch, JobAlert):
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(job_index, "SessionLocal", Session)
+    monkeypatch.setattr(job_alerts, "alert_matcher", job_alerts.MatcherCache(refresh_sec=3600))
+    with Session() as db:
+        db.add(JobSavedSearch(user_id=uuid.uuid4(), keyword="python", canton="ZH"))
+        db.commit()
+
+    # a live search writes the posting back; the ingester later sees it again
+    assert job_index._store_sync([_job(1, "Python Developer"), _job(2, "Nurse")]) == (["indeed:1", "indeed:2"], 1)
+    assert job_index._store_sync([_job(1, "Python Developer"), _job(3, "Python Engineer")], "ZH") == (["indeed:3"], 1)
+
+    with Session() as db:
+        assert sorted(a.job_id for a in db.query(JobAlert)) == ["indeed:1", "indeed:3"]
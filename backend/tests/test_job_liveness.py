@@ -0,0 +1,109 @@
+import asyncio
+import uuid
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.http import HTTPClients
+from app.models.job import JobFavorite
+from app.services import job_liveness
+from app.services.job_liveness import UNKNOWN, LivenessChecker, public_url
+
+
+async def _public_dns(host, port):
+    return ["93.184.216.34"]
+
+
+def test_favorites_are_probed_once_per_url_and_dead_ones_marked(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    JobFavorite.__table__.create(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr("app.services.job_liveness.SessionLocal", Session)
+    monkeypatch.setattr(job_liveness, "resolve", _public_dns)
+    urls = ["https://a.example/jobs/1", "https://a.example/jobs/2", "https://a.example/jobs/1", "https://b.example/p/3", "https://b.example/p/4"]
+    with Session() as db:
+        for i, url in enumerate(urls):
+            db.add(JobFavorite(id=uuid.UUID(int=(0xA << 124) + i), user_id=uuid.uuid4(), job_id=url, source="indeed", title="Dev", url=url))
+        db.commit()
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, str(request.url)))
+        path = request.url.path
+        if request.url.host == "b.example" and request.method == "HEAD":
+            return httpx.Response(405)
+        if path == "/jobs/2":
+            return httpx.Response(410)
+        if path == "/p/4":
+            return httpx.Response(302, headers={"location": "https://b.example/"})
+        return httpx.Response(200, headers={"etag": '"v1"'})
+
+    checker = LivenessChecker(concurrency=4, per_host=1, host_interval_sec=0.0, cache_ttl_sec=60, batch_size=2, recheck_sec=3600)
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            first = await checker.check_once(clients)
+            with Session() as db:
+                db.add(JobFavorite(user_id=uuid.uuid4(), job_id="late", source="indeed", title="Dev", url=urls[0]))
+                db.commit()
+            second = await checker.check_once(clients)
+            return first, second
+        finally:
+            await clients.aclose()
+
+    first, second = asyncio.run(run())
+
+    # rows sharing a URL are updated together, so the later duplicate is no longer due
+    assert first == {"favorites": 4, "urls": 4, "dead": 2}
+    # a favorite added later for a known URL is answered from the cache
+    assert second == {"favorites": 1, "urls": 1, "dead": 0}
+    assert sorted(m for m, _ in requests) == ["GET", "GET", "GET", "HEAD", "HEAD", "HEAD", "HEAD"]
+    assert checker.stats()["cache_hits"] == 1
+    with Session() as db:
+        status = {r.url: (r.link_status, r.link_etag) for r in db.query(JobFavorite)}
+    assert status == {
+        "https://a.example/jobs/1": ("live", '"v1"'),
+        "https://a.example/jobs/2": ("dead", None),
+        "https://b.example/p/3": ("live", '"v1"'),
+        "https://b.example/p/4": ("dead", None),
+    }
+
+
+def test_only_public_http_urls_are_probed(monkeypatch):
+    addresses = {"jobs.example": ["93.184.216.34"], "intranet.example": ["10.0.0.5"], "mixed.example": ["93.184.216.34", "::1"]}
+
+    async def resolve(host, port):
+        if host not in addresses:
+            raise OSError("no such host")
+        return addresses[host]
+
+    monkeypatch.setattr(job_liveness, "resolve", resolve)
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        if request.url.path == "/moved":
+            # a public board redirecting into the private network
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+        return httpx.Response(200)
+
+    async def run():
+        verdicts = [
+            await public_url(u)
+            for u in ("https://jobs.example/1", "http://intranet.example/admin", "http://127.0.0.1:8080/", "http://[::1]/", "file:///etc/passwd", "https://mixed.example/", "https://unknown.example/")
+        ]
+        checker = LivenessChecker(concurrency=2, per_host=1, host_interval_sec=0.0, cache_ttl_sec=60, batch_size=10, recheck_sec=3600)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            probes = [await checker.probe(client, u) for u in ("http://intranet.example:22/", "https://jobs.example/moved", "https://jobs.example/2")]
+        return verdicts, probes, checker.stats()
+
+    verdicts, probes, stats = asyncio.run(run())
+
+    assert verdicts == [True, False, False, False, False, False, False]
+    assert [p.status for p in probes] == [UNKNOWN, UNKNOWN, "live"]
+    # the internal URL and the redirect target were never requested
+    assert requests == ["https://jobs.example/moved", "https://jobs.example/2"]
+    assert stats["blocked"] == 2
@@ -0,0 +1,47 @@
+from app.services.job_suggest import SuggestIndex
+
+
+def test_prefix_lookup_ranks_by_searches_and_filters_by_canton():
+    index = SuggestIndex([
+        ("python developer", "ZH", 5),
+        ("python developer", None, 2),
+        ("python", "BE", 4),
+        ("pflege", "BE", 9),
+        ("project manager", None, 3),
+        ("java", "ZH", 1),
+    ])
+
+    assert index.lookup("p", limit=3) == [("pflege", 9), ("python developer", 7), ("python", 4)]
+    assert index.lookup(" PYT ") == [("python developer", 7), ("python", 4)]
+    assert index.lookup("pyth", canton="be") == [("python", 4)]
+    assert index.lookup("py", canton="ZH") == [("python developer", 5)]
+    assert index.lookup("rust") == [] and index.lookup("") == []
+
+
+def test_thresholds_apply_to_keywords_not_canton_pairs(monkeypatch):
+    from datetime import datetime
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.models.job import JobSearchRollup
+    from app.services import job_suggest
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    JobSearchRollup.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(job_suggest, "SessionLocal", Session)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    with Session() as db:
+        # once in each of three cantons, three times in all
+        for canton in ("ZH", "BE", ""):
+            db.add(JobSearchRollup(granularity="day", bucket=today, keyword="pflege", canton=canton, count=1))
+        db.add(JobSearchRollup(granularity="day", bucket=today, keyword="python", canton="ZH", count=5))
+        db.add(JobSearchRollup(granularity="day", bucket=today, keyword="java", canton="ZH", count=1))
+        db.commit()
+
+    counts = job_suggest.load_counts(window_days=30, min_count=2, max_keywords=10)
+    assert sorted(counts, key=lambda c: (c[0], c[1] or "")) == [("pflege", None, 1), ("pflege", "BE", 1), ("pflege", "ZH", 1), ("python", "ZH", 5)]
+    # the cap counts keywords, and keeps every canton of the ones it keeps
+    assert {c[0] for c in job_suggest.load_counts(window_days=30, min_count=1, max_keywords=2)} == {"python", "pflege"}
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.services import job_warmer
+from app.services.jobs_cache import SearchCache, search_key
+from app.services.provider_budget import LOW, OK
+
+
+class _Budget:
+    def __init__(self, levels):
+        self.levels = iter(levels)
+
+    def level(self):
+        return next(self.levels)
+
+
+def test_warmer_fills_missing_and_expiring_entries_within_budget(monkeypatch):
+    cache = SearchCache(ttl=300, stale_ttl=600, max_bytes=10_000, size_of=lambda v: 10)
+    fetched = []
+
+    async def fake_search(q, canton, page, per_page, clients=None):
+        fetched.append((q, canton))
+        return [], {"index": 1}, {}, None
+
+    monkeypatch.setattr(job_warmer, "indexed_search", fake_search)
+    warmer = job_warmer.CacheWarmer(top_n=4, window="24h", per_page=20, lead_sec=60, interval_sec=60, concurrency=1, cache=cache, budget=_Budget([OK, OK, LOW]))
+    monkeypatch.setattr(warmer, "popular", lambda: [("python", "ZH"), ("cook", None), ("nurse", "BE"), ("driver", None)])
+
+    async def cached():
+        return [], {}, {}, None
+
+    async def run():
+        # "python" is cached and fresh, "cook" expires within the lead time
+        await cache.get_or_fetch(search_key("python", "ZH", 1, 20), cached)
+        await cache.get_or_fetch(search_key("cook", None, 1, 20), cached, ttl_for=lambda v: 30)
+        return await warmer.warm_once()
+
+    stats = asyncio.run(run())
+
+    assert stats == {"queries": 4, "warmed": 2, "fresh": 1, "errors": 0, "over_budget": 1}
+    # most searched first; the budget ran low before the last one
+    assert fetched == [("cook", None), ("nurse", "BE")]
+    assert cache.peek(search_key("nurse", "BE", 1, 20))[1] == {"index": 1}
+    assert cache.stats()["warmed"] == 2
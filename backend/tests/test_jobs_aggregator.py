@@ -0,0 +1,392 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+
+from app.core.http import HTTPClients
+from app.services.jobs_aggregator import SOURCE_TIMED_OUT, search_jobs, search_jobs_page
+
+
+def _jsearch_payload(n: int) -> dict:
+    return {
+        "data": [
+            {
+                "job_id": f"j{i}",
+                "job_title": f"Engineer {i}",
+                "employer_name": "ACME",
+                "job_city": "Zurich",
+                "job_country": "CH",
+                "job_apply_link": f"https://example.com/{i}",
+                "job_posted_at_timestamp": 1_700_000_000 + i,
+            }
+            for i in range(n)
+        ]
+    }
+
+
+def _run_search(handler, **kwargs):
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            return await search_jobs(clients=clients, **kwargs)
+        finally:
+            await clients.aclose()
+
+    return asyncio.run(run())
+
+
+def test_slow_provider_is_reported_as_timed_out(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.setenv("RAV_API_URL", "https://rav.example.com/api")
+    monkeypatch.setenv("JOBS_PROVIDER_TIMEOUT_SEC", "0.2")
+    monkeypatch.setenv("JOBS_SEARCH_BUDGET_SEC", "0.5")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "rav.example.com":
+            await asyncio.sleep(2)
+            return httpx.Response(200, json={"content": []})
+        return httpx.Response(200, json=_jsearch_payload(10))
+
+    items, sources, _ = _run_search(handler, q="dev", canton="ZH", page=1, per_page=10)
+
+    assert sources["jsearch"] == 10
+    assert sources["rav"] == SOURCE_TIMED_OUT
+    assert len(items) == 10
+    assert items[0].id == "jsearch:j9"
+
+
+def test_jsearch_pages_are_fetched_concurrently(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.delenv("RAV_API_URL", raising=False)
+    monkeypatch.setenv("JOBS_PROVIDER_TIMEOUT_SEC", "1")
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        page = int(request.url.params["page"])
+        payload = _jsearch_payload(10)
+        for it in payload["data"]:
+            it["job_id"] = f"p{page}-{it['job_id']}"
+            it["job_title"] = f"{it['job_title']} p{page}"
+        return httpx.Response(200, json=payload)
+
+    items, sources, _ = _run_search(handler, q="dev", canton=None, page=1, per_page=30)
+
+    assert peak == 3
+    assert sources["jsearch"] == 30
+    assert len({it.id for it in items}) == 30
+
+
+def test_indeed_tries_learned_variant_first(monkeypatch):
+    from app.services import jobs_aggregator
+    from app.services.provider_variants import VariantMemory
+
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "indeed-api.p.rapidapi.com")
+    monkeypatch.delenv("RAV_API_URL", raising=False)
+    memory = VariantMemory(refresh_sec=3600, half_life_sec=3600, reprobe_sec=3600)
+    memory._loaded_at = float("inf")  # keep the test off the database
+    monkeypatch.setattr(jobs_aggregator, "variant_memory", memory)
+    seen = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.path, tuple(sorted(request.url.params))))
+        if request.url.path == "/search" and "l" in request.url.params and "co" in request.url.params:
+            return httpx.Response(200, json={"jobs": [{"jobkey": "a1", "title": "Dev", "url": "https://x"}]})
+        return httpx.Response(404)
+
+    _, sources, _ = _run_search(handler, q="dev", canton="BE", page=1, per_page=10)
+    first_walk = len(seen)
+    seen.clear()
+    _, sources_again, _ = _run_search(handler, q="dev", canton="BE", page=1, per_page=10)
+
+    assert sources["indeed"] == sources_again["indeed"] == 1
+    assert first_walk == 7
+    assert len(seen) == 1
+
+
+def test_cursor_pages_merge_providers_without_gaps(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.setenv("RAV_API_URL", "https://rav.example.com/api")
+    # jsearch: 25 items on even timestamps, rav: 15 items on odd ones, both newest first
+    jsearch_ts = [1_700_000_000 + 2 * i for i in range(25)][::-1]
+    rav_ts = [1_700_000_001 + 2 * i for i in range(15)][::-1]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "rav.example.com":
+            page, size = int(request.url.params["page"]), int(request.url.params["size"])
+            content = [
+                {"id": f"r{ts}", "title": f"Dev {ts}", "url": "https://x", "publicationDate": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}
+                for ts in rav_ts[page * size:(page + 1) * size]
+            ]
+            return httpx.Response(200, json={"content": content})
+        page = int(request.url.params["page"])
+        data = [
+            {"job_id": f"j{ts}", "job_title": f"Dev {ts}", "job_apply_link": "https://x", "job_posted_at_timestamp": ts}
+            for ts in jsearch_ts[(page - 1) * 10:page * 10]
+        ]
+        return httpx.Response(200, json={"data": data})
+
+    async def walk():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        pages, cursor = [], None
+        try:
+            while True:
+                items, _, _, cursor = await search_jobs_page(q="dev", canton=None, per_page=10, cursor=cursor, clients=clients)
+                pages.append(items)
+                if cursor is None or len(pages) > 10:
+                    return pages
+        finally:
+            await clients.aclose()
+
+    pages = asyncio.run(walk())
+    seen = [it.id for page in pages for it in page]
+    stamps = [int(i.split(":")[1][1:]) for i in seen]
+
+    assert len(seen) == len(set(seen)) == 40
+    assert stamps == sorted(jsearch_ts + rav_ts, reverse=True)
+    assert [len(p) for p in pages[:4]] == [10, 10, 10, 10]
+
+
+def test_stream_yields_fast_provider_first(monkeypatch):
+    from app.services.jobs_aggregator import stream_jobs
+
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.setenv("RAV_API_URL", "https://rav.example.com/api")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "rav.example.com":
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json={"content": [{"id": "r1", "title": "Nurse", "url": "https://x"}]})
+        return httpx.Response(200, json=_jsearch_payload(3))
+
+    async def collect():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            return [frame async for frame in stream_jobs(q="dev", canton=None, per_page=10, clients=clients)]
+        finally:
+            await clients.aclose()
+
+    frames = asyncio.run(collect())
+
+    assert [(f["type"], f.get("provider")) for f in frames] == [("items", "jsearch"), ("items", "rav"), ("summary", None)]
+    summary = frames[-1]
+    assert summary["sources"] == {"jsearch": 3, "rav": 1}
+    assert summary["order"][0] == "jsearch:j2"
+    assert summary["next_cursor"]
+
+
+def test_cursor_ends_when_indeed_runs_out(monkeypatch):
+    from app.services import jobs_aggregator
+    from app.services.provider_variants import VariantMemory
+
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "indeed-api.p.rapidapi.com")
+    monkeypatch.delenv("RAV_API_URL", raising=False)
+    memory = VariantMemory(refresh_sec=3600, half_life_sec=3600, reprobe_sec=3600)
+    memory._loaded_at = float("inf")
+    monkeypatch.setattr(jobs_aggregator, "variant_memory", memory)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        page = request.url.params.get("page_id")
+        if request.url.path != "/jobs/search" or page is None:
+            return httpx.Response(404)
+        # two pages of results, then Indeed just answers with an empty list
+        jobs = [{"jobkey": f"{page}-{i}", "title": f"Dev {page}-{i}", "url": f"https://x/{page}/{i}", "date": f"2026-0{4 - int(page)}-1{i}"} for i in range(10)] if int(page) <= 2 else []
+        return httpx.Response(200, json={"jobs": jobs})
+
+    async def walk():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        pages, cursor = [], None
+        try:
+            while True:
+                calls.clear()
+                items, sources, _, cursor = await search_jobs_page(q="dev", canton=None, per_page=10, cursor=cursor, clients=clients)
+                pages.append((len(items), sources, len(calls)))
+                if cursor is None or len(pages) > 5:
+                    return pages
+        finally:
+            await clients.aclose()
+
+    pages = asyncio.run(walk())
+
+    assert [n for n, _, _ in pages] == [10, 10, 0]
+    # the last page costs one probe of the learned variant and ends the walk
+    assert pages[-1][1]["indeed"] == 0
+    assert pages[-1][2] == 1
+
+
+def test_slow_jsearch_page_keeps_the_others(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.delenv("RAV_API_URL", raising=False)
+    monkeypatch.setenv("JOBS_PROVIDER_TIMEOUT_SEC", "0.4")
+    monkeypatch.setenv("JOBS_SEARCH_BUDGET_SEC", "1")
+    paths = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        page = int(request.url.params["page"])
+        if page == 2:
+            await asyncio.sleep(2)
+        payload = _jsearch_payload(10)
+        for it in payload["data"]:
+            it["job_id"] = f"p{page}-{it['job_id']}"
+            it["job_title"] = f"{it['job_title']} p{page}"
+        return httpx.Response(200, json=payload)
+
+    items, sources, _ = _run_search(handler, q="dev", canton=None, page=1, per_page=30)
+
+    assert sources["jsearch"] == 20
+    assert {it.id.split("-")[0] for it in items} == {"jsearch:p1", "jsearch:p3"}
+    # jsearch delivered, so the Indeed fallback was not called
+    assert "indeed" not in sources and all(p == "/search" for p in paths)
+
+
+def test_parsers_skip_malformed_records_and_tolerate_odd_fields():
+    from app.services.jobs_aggregator import _parse_indeed, _parse_jsearch, _parse_rav
+
+    for junk in (None, "x", 42, ["id", "1"]):
+        assert _parse_indeed(junk, None) is None
+        assert _parse_rav(junk) is None
+        assert _parse_jsearch(junk, None) is None
+    # no id / no apply link
+    assert _parse_indeed({"title": "Dev"}, None) is None
+    assert _parse_jsearch({"job_id": "1"}, None) is None
+
+    rav = _parse_rav({"id": 7, "title": None, "company": "ACME", "workplace": [], "employment": {"workloadPeriod": 80}, "publicationDate": "yesterday", "description": {"x": 1}})
+    assert (rav.id, rav.title, rav.company, rav.location, rav.employment_type, rav.posted_at, rav.snippet) == ("rav:7", "", None, None, "80", None, None)
+
+    indeed = _parse_indeed({"jobkey": "a", "salary": 95000, "location": {"city": "Bern"}, "date": "2026-03-01T10:00:00+02:00"}, "BE")
+    assert (indeed.salary, indeed.location, indeed.url) == ("95000", "Switzerland", "")
+    assert indeed.posted_at == datetime(2026, 3, 1, 8, 0)
+
+    jsearch = _parse_jsearch({"job_id": "j", "job_apply_link": "https://x", "job_posted_at_timestamp": "soon", "job_city": 8000, "job_title": ["Dev"]}, None)
+    assert (jsearch.title, jsearch.location, jsearch.posted_at) == ("", "8000", None)
+
+
+def test_malformed_records_do_not_fail_the_provider(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.setenv("RAV_API_URL", "https://rav.example.com/api")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "rav.example.com":
+            return httpx.Response(200, json={"content": [None, "x", {"id": "r1", "title": "Nurse", "url": "https://x"}]})
+        payload = _jsearch_payload(2)
+        payload["data"].insert(1, None)
+        return httpx.Response(200, json=payload)
+
+    items, sources, _ = _run_search(handler, q="dev", canton=None, page=1, per_page=10)
+
+    assert sources == {"jsearch": 2, "rav": 1}
+    assert len(items) == 3
+
+
+def test_cursor_walks_every_jsearch_item_for_any_page_size(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.delenv("RAV_API_URL", raising=False)
+    monkeypatch.setenv("JOBS_PROVIDER_TIMEOUT_SEC", "0.4")
+    monkeypatch.setenv("JOBS_CURSOR_MAX_ROUNDS", "5")
+    available = [1_700_000_000 + 600 - i for i in range(60)]
+    slow_once = {3}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        if page in slow_once:
+            # misses the page deadline the first time it is asked for
+            slow_once.discard(page)
+            await asyncio.sleep(1)
+        data = [
+            {"job_id": f"j{ts}", "job_title": f"Dev {ts}", "job_apply_link": f"https://x/{ts}", "job_posted_at_timestamp": ts}
+            for ts in available[(page - 1) * 10:page * 10]
+        ]
+        return httpx.Response(200, json={"data": data})
+
+    async def walk(per_page):
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        seen, cursor = [], None
+        try:
+            for _ in range(40):
+                items, _, _, cursor = await search_jobs_page(q="dev", canton=None, per_page=per_page, cursor=cursor, clients=clients)
+                seen.extend(it.id for it in items)
+                if cursor is None:
+                    break
+        finally:
+            await clients.aclose()
+        return seen
+
+    for per_page in (5, 20, 25):
+        slow_once.add(3)
+        seen = asyncio.run(walk(per_page))
+        assert len(seen) == len(set(seen)) == 60, per_page
+
+
+def test_closing_the_stream_stops_slow_providers(monkeypatch):
+    from app.services.jobs_aggregator import stream_jobs
+
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.setenv("RAV_API_URL", "https://rav.example.com/api")
+    finished = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "rav.example.com":
+            await asyncio.sleep(0.3)
+            finished.append("rav")
+            return httpx.Response(200, json={"content": []})
+        return httpx.Response(200, json=_jsearch_payload(3))
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            stream = stream_jobs(q="dev", canton=None, per_page=10, clients=clients)
+            first = await stream.__anext__()
+            # the client disconnects after the first frame
+            await stream.aclose()
+            await asyncio.sleep(0.5)
+            return first
+        finally:
+            await clients.aclose()
+
+    first = asyncio.run(run())
+
+    assert first["provider"] == "jsearch"
+    assert finished == []
+
+
+def test_debug_search_honours_page(monkeypatch):
+    from app.routers import jobs as jobs_router
+
+    calls = []
+
+    async def search_jobs(q, canton, page, per_page, debug=False, clients=None):
+        calls.append(("page", page))
+        return [], {}, {"indeed": []}
+
+    async def search_jobs_page(q, canton, per_page, cursor=None, debug=False, clients=None):
+        calls.append(("cursor", cursor))
+        return [], {}, {"indeed": []}, None
+
+    monkeypatch.setattr(jobs_router, "search_jobs", search_jobs)
+    monkeypatch.setattr(jobs_router, "search_jobs_page", search_jobs_page)
+
+    async def run():
+        for page, cursor in ((2, None), (1, None), (2, "c")):
+            await jobs_router.search(None, q="dev", page=page, cursor=cursor, debug=True)
+
+    asyncio.run(run())
+
+    assert calls == [("page", 2), ("cursor", None), ("cursor", "c")]
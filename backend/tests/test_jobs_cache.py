@@ -0,0 +1,72 @@
+import asyncio
+
+from app.services.jobs_cache import SearchCache, search_key
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = SearchCache(ttl=60, stale_ttl=60, max_bytes=10_000, size_of=lambda v: 10)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert results == ["result"] * 20
+    assert calls == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 19
+
+
+def test_stale_entry_is_served_while_refreshing():
+    cache = SearchCache(ttl=0.01, stale_ttl=60, max_bytes=10_000, size_of=lambda v: 10)
+    versions = iter(["v1", "v2"])
+
+    async def fetch():
+        return next(versions)
+
+    async def run():
+        first = await cache.get_or_fetch("k", fetch)
+        await asyncio.sleep(0.02)
+        stale = await cache.get_or_fetch("k", fetch)
+        await asyncio.sleep(0)  # let the background refresh finish
+        await asyncio.sleep(0)
+        fresh = await cache.get_or_fetch("k", fetch)
+        return first, stale, fresh
+
+    assert asyncio.run(run()) == ("v1", "v1", "v2")
+    assert cache.stats()["stale"] == 1
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = SearchCache(ttl=60, stale_ttl=0, max_bytes=25, size_of=lambda v: 10)
+
+    async def run():
+        for key in ("a", "b"):
+            await cache.get_or_fetch(key, _const(key))
+        await cache.get_or_fetch("a", _const("a"))  # touch "a" so "b" is least recent
+        await cache.get_or_fetch("c", _const("c"))
+
+    asyncio.run(run())
+    assert cache.peek("a") == "a"
+    assert cache.peek("b") is None
+    assert cache.peek("c") == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_search_key_normalizes_query_and_canton():
+    assert search_key("  Jobs   in ZH ", "zh", 1, 20) == search_key("jobs in zh", "ZH", 1, 20)
+
+
+def _const(value):
+    async def fetch():
+        return value
+
+    return fetch
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.job import JobLoopLease
+from app.services.loop_lease import LoopLease, run_leased
+
+
+def _sessions() -> sessionmaker:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    JobLoopLease.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_one_worker_holds_the_lease_until_it_expires_or_is_released():
+    Sessions = _sessions()
+    a, b = (LoopLease("jobs_ingest", 60, owner=owner, session_factory=Sessions) for owner in ("a", "b"))
+
+    async def run():
+        taken = [await a.acquire(), await b.acquire(), await a.acquire()]
+        await a.release()
+        taken.append(await b.acquire())
+        with Sessions() as db:
+            db.get(JobLoopLease, "jobs_ingest").expires_at = datetime.utcnow() - timedelta(seconds=1)
+            db.commit()
+        # b died without releasing
+        taken.append(await a.acquire())
+        return taken
+
+    assert asyncio.run(run()) == [True, False, True, True, True]
+
+
+def test_only_the_lease_holder_runs_the_loop():
+    Sessions = _sessions()
+    runs = []
+
+    async def worker(owner: str) -> None:
+        async def round_() -> None:
+            runs.append(owner)
+
+        await run_leased(LoopLease("jobs_warm", 60, owner=owner, session_factory=Sessions), 0.02, round_)
+
+    async def run():
+        workers = [asyncio.create_task(worker(owner)) for owner in ("a", "b", "c")]
+        await asyncio.sleep(0.5)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert len(runs) >= 2 and len(set(runs)) == 1
+    with Session(Sessions.kw["bind"]) as db:
+        # released on shutdown
+        assert db.get(JobLoopLease, "jobs_warm").expires_at <= datetime.utcnow()
@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.http import HTTPClients
+from app.models.job import JobProviderBudget
+from app.services.provider_budget import EXHAUSTED, LOW, ProviderBudget
+
+
+def test_workers_share_the_monthly_quota():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    JobProviderBudget.__table__.create(engine)
+    workers = [ProviderBudget("rapidapi", monthly_quota=10, rate_per_sec=0, burst=5, low_fraction=0.5, session_factory=lambda: Session(engine)) for _ in range(2)]
+
+    async def run():
+        first = await workers[0].acquire(4)
+        second = await workers[1].acquire(4)
+        assert workers[1].level() == LOW
+        partial = await workers[0].acquire(4, partial=True)
+        denied = await workers[1].acquire()
+        return first, second, partial, denied
+
+    assert asyncio.run(run()) == (4, 4, 2, 0)
+    assert workers[0].level() == workers[1].level() == EXHAUSTED
+    with Session(engine) as db:
+        row = db.get(JobProviderBudget, "rapidapi")
+        assert (row.spent, row.denied, row.version) == (10, 2, 4)
+
+
+def test_search_degrades_and_reports_spent_quota(monkeypatch):
+    from app.services import jobs_aggregator
+    from app.services.jobs_aggregator import SOURCE_OVER_BUDGET, search_jobs
+
+    monkeypatch.setenv("RAPIDAPI_KEY", "k")
+    monkeypatch.setenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+    monkeypatch.delenv("RAV_API_URL", raising=False)
+    budget = ProviderBudget("rapidapi", monthly_quota=4, rate_per_sec=0, burst=5, low_fraction=0.5, session_factory=None)
+    monkeypatch.setattr(jobs_aggregator, "rapidapi_budget", budget)
+    pages = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        page = request.url.params["page"]
+        pages.append(page)
+        data = [
+            {"job_id": f"{page}-{i}", "job_title": f"Role{page}x{i}", "job_apply_link": f"https://example.com/{page}/{i}"}
+            for i in range(10)
+        ]
+        return httpx.Response(200, json={"data": data})
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            return [await search_jobs(q="dev", canton=None, page=1, per_page=30, clients=clients) for _ in range(3)]
+        finally:
+            await clients.aclose()
+
+    full, low, spent = asyncio.run(run())
+
+    # a full chunk is 3 pages; once low on quota a search only gets one, then none
+    assert [len(items) for items, _, _ in (full, low, spent)] == [30, 10, 0]
+    assert len(pages) == 4
+    assert spent[1] == {"jsearch": SOURCE_OVER_BUDGET, "indeed": SOURCE_OVER_BUDGET}
+    assert budget.level() == EXHAUSTED
+    assert budget.snapshot()["spent"] == 4
+
+
+def test_unlimited_budget_never_touches_the_store():
+    def no_store():
+        raise AssertionError("the budget table must not be read without limits")
+
+    budget = ProviderBudget("rapidapi", monthly_quota=0, rate_per_sec=0, burst=5, session_factory=no_store)
+
+    async def run():
+        await budget.load_if_stale()
+        return [await budget.acquire(), await budget.acquire(cost=3)]
+
+    assert asyncio.run(run()) == [1, 3]
+    snap = budget.snapshot()
+    assert snap["spent"] == 4 and snap["store_errors"] == 0 and snap["level"] == "ok"
@@ -0,0 +1,288 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.http import HTTPClients
+from app.models.news import News
+from app.models.rss_feed import RSSFeed
+from app.services import image_pipeline, rss_engine
+from app.services.image_pipeline import ImagePipeline
+from app.services.rss_engine import FeedImportEngine, adapt_interval
+
+
+def _rss(host, n):
+    items = "".join(
+        f'<item><title>{host} {i}</title><link>https://{host}/a/{i}</link><description>&lt;img src="https://{host}/img/{i}.jpg"&gt;</description></item>'
+        for i in range(n)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{host} news</title>{items}<item><title>no link</title></item></channel></rss>'
+
+
+def test_feeds_are_imported_concurrently_and_images_fetched_once(monkeypatch, tmp_path):
+    # a file, not StaticPool: concurrent feed writes need a connection each
+    engine = create_engine(f"sqlite:///{tmp_path / 'news.db'}")
+    media = tmp_path / "media"
+    media.mkdir()
+    News.__table__.create(engine)
+    RSSFeed.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(rss_engine, "SessionLocal", Session)
+    monkeypatch.setattr(image_pipeline, "UPLOAD_DIR", media)
+    monkeypatch.setattr(rss_engine, "image_pipeline", ImagePipeline(concurrency=2, max_bytes=1024))
+    with Session() as db:
+        db.add_all([
+            RSSFeed(id="1", url="https://one.example/rss", max_items=10, download_images=True),
+            RSSFeed(id="2", url="https://two.example/", max_items=10, download_images=False),
+            RSSFeed(id="3", url="https://down.example/rss", max_items=10),
+            RSSFeed(id="4", url="https://off.example/rss", enabled=False),
+        ])
+        db.commit()
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        host, path = request.url.host, request.url.path
+        if host == "down.example":
+            return httpx.Response(503)
+        if path.startswith("/img/"):
+            return httpx.Response(200, content=b"\xff\xd8\xff" + path.encode())
+        if host == "two.example" and path == "/":
+            # an HTML page that links to its feed
+            return httpx.Response(200, text='<html><head><link rel="alternate" type="application/rss+xml" href="/feed.xml"></head></html>')
+        return httpx.Response(200, text=_rss(host, 3))
+
+    importer = FeedImportEngine(concurrency=2, parse_workers=1)
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            return await importer.run_once(clients, due_only=False), await importer.run_once(clients, due_only=False)
+        finally:
+            await clients.aclose()
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        importer.close()
+
+    assert first == {"feeds": 3, "failed": 0, "created": 6, "updated": 0, "skipped": 2, "seen": 0, "unchanged": 0}
+    # identical bodies (the feed, and the feed behind the HTML page) end before parsing
+    assert second == {"feeds": 3, "failed": 0, "created": 0, "updated": 0, "skipped": 0, "seen": 0, "unchanged": 2}
+    # images are downloaded by the first run only, and only for feeds that want them
+    assert sum("/img/" in u for u in requests) == 3
+    assert len(list(media.iterdir())) == 3
+    with Session() as db:
+        rows = {n.url: (n.source, n.image_url) for n in db.query(News)}
+        imported = {f.id: f.last_imported_at is not None for f in db.query(RSSFeed)}
+    assert rows["https://two.example/a/0"] == ("two.example news", "https://two.example/img/0.jpg")
+    assert rows["https://one.example/a/1"][1].startswith("/media/")
+    assert imported == {"1": True, "2": True, "3": False, "4": False}
+
+
+def test_polling_is_conditional_and_skips_seen_entries(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    News.__table__.create(engine)
+    RSSFeed.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(rss_engine, "SessionLocal", Session)
+    with Session() as db:
+        db.add(RSSFeed(id="1", url="https://one.example/rss", max_items=10, download_images=False))
+        db.commit()
+    versions = {
+        '"v1"': [("a", "Mon, 01 Jun 2026 10:00:00 GMT"), ("b", "Mon, 01 Jun 2026 10:00:00 GMT")],
+        # "a" was edited, "c" is new
+        '"v2"': [("a", "Tue, 02 Jun 2026 10:00:00 GMT"), ("b", "Mon, 01 Jun 2026 10:00:00 GMT"), ("c", "Tue, 02 Jun 2026 11:00:00 GMT")],
+    }
+    current = ['"v1"']
+    conditional = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        conditional.append(request.headers.get("if-none-match"))
+        etag = current[0]
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        items = "".join(f"<item><title>{k}</title><link>https://one.example/{k}</link><pubDate>{d}</pubDate></item>" for k, d in versions[etag])
+        return httpx.Response(200, headers={"etag": etag}, text=f"<rss version='2.0'><channel><title>One</title>{items}</channel></rss>")
+
+    importer = FeedImportEngine(concurrency=1, parse_workers=0)
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            results = [await importer.run_once(clients, due_only=False), await importer.run_once(clients, due_only=False)]
+            current[0] = '"v2"'
+            results.append(await importer.run_once(clients, due_only=False))
+            return results
+        finally:
+            await clients.aclose()
+
+    first, second, third = asyncio.run(run())
+
+    assert conditional == [None, '"v1"', '"v1"']
+    assert (first["created"], first["unchanged"]) == (2, 0)
+    assert second["unchanged"] == 1
+    assert (third["created"], third["updated"], third["seen"]) == (1, 1, 1)
+    with Session() as db:
+        assert db.get(RSSFeed, "1").etag == '"v2"'
+
+
+def test_poll_interval_follows_publish_rate():
+    now = datetime(2026, 6, 1, 12, 0)
+    every_10_min = [now - timedelta(minutes=10 * i) for i in range(5)]
+    assert adapt_interval(900, changed=3, published=every_10_min) == 750
+    assert adapt_interval(900, changed=0, published=every_10_min) == 1350
+    # undated entries: halve, but never below the floor
+    assert adapt_interval(400, changed=1, published=[]) == 300
+    assert adapt_interval(20000, changed=0, published=[]) == 6 * 3600
+
+
+def test_due_feeds_are_leased_to_one_worker(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'feeds.db'}")
+    News.__table__.create(engine)
+    RSSFeed.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(rss_engine, "SessionLocal", Session)
+    now = datetime.utcnow()
+    with Session() as db:
+        for i in range(6):
+            db.add(RSSFeed(id=str(i), url=f"https://f{i}.example/rss", download_images=False))
+        # not due yet / leased by a worker that is still alive
+        db.add(RSSFeed(id="later", url="https://later.example/rss", next_run_at=now + timedelta(hours=1)))
+        db.add(RSSFeed(id="busy", url="https://busy.example/rss", lease_owner="other", lease_expires_at=now + timedelta(minutes=5)))
+        db.commit()
+    fetched = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        fetched.append(request.url.host)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, text=_rss(request.url.host, 2))
+
+    workers = [FeedImportEngine(concurrency=2, parse_workers=0) for _ in range(3)]
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            first = await asyncio.gather(*(w.run_once(clients) for w in workers))
+            second = await workers[0].run_once(clients)
+            return first, second
+        finally:
+            await clients.aclose()
+
+    first, second = asyncio.run(run())
+
+    assert sorted(fetched) == sorted(f"f{i}.example" for i in range(6))
+    assert sum(r["feeds"] for r in first) == 6
+    assert second["feeds"] == 0
+    with Session() as db:
+        feeds = {f.id: f for f in db.query(RSSFeed)}
+    for i in range(6):
+        f = feeds[str(i)]
+        assert f.lease_owner is None and f.next_run_at > now
+        assert f.poll_interval_sec == 450
+    assert feeds["busy"].lease_owner == "other"
+
+
+_ARTICLE = (
+    "<html><body><nav><a href='/'>Home</a></nav><div class='comments'><p>First, great, thanks, more please, again.</p></div>"
+    "<article class='story'><p>Cantons publish the new permit rules, which apply to residents, students and workers.</p>"
+    "<p onclick='x()'>The form is <a href='/forms/b'>online</a>, and must be signed, dated and sent by post.</p>"
+    "<script>track()</script><p>Appointments open next month, first in Zurich, Bern and Geneva.</p></article></body></html>"
+)
+
+
+def test_full_articles_are_extracted_and_refetched_conditionally(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'news.db'}")
+    News.__table__.create(engine)
+    RSSFeed.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(rss_engine, "SessionLocal", Session)
+    with Session() as db:
+        db.add(RSSFeed(id="1", url="https://x.example/rss", max_items=10, download_images=False, extract_full=True))
+        db.commit()
+    updated = ["Mon, 01 Jun 2026 10:00:00 GMT"]
+    pages = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/rss":
+            items = "".join(
+                f"<item><title>{i}</title><link>https://x.example/a/{i}</link><pubDate>{updated[0]}</pubDate></item>" for i in range(2)
+            )
+            return httpx.Response(200, text=f'<?xml version="1.0"?><rss version="2.0"><channel><title>X</title>{items}</channel></rss>')
+        pages.append((path, request.headers.get("if-none-match")))
+        if path == "/a/0":
+            if request.headers.get("if-none-match") == '"a0"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=_ARTICLE, headers={"ETag": '"a0"'})
+        # too short to be an article
+        return httpx.Response(200, text="<html><body><p>Cookies?</p></body></html>")
+
+    importer = FeedImportEngine(concurrency=2, parse_workers=1)
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            await importer.run_once(clients, due_only=False)
+            with Session() as db:
+                before = {n.url: (n.content, n.content_etag) for n in db.query(News)}
+            # edited entries are re-imported; their pages are requested with the stored ETag
+            updated[0] = "Tue, 02 Jun 2026 10:00:00 GMT"
+            await importer.run_once(clients, due_only=False)
+            return before
+        finally:
+            await clients.aclose()
+
+    try:
+        before = asyncio.run(run())
+    finally:
+        importer.close()
+
+    content, etag = before["https://x.example/a/0"]
+    assert etag == '"a0"'
+    assert "Cantons publish" in content and "Appointments open" in content
+    assert '<a href="https://x.example/forms/b">online</a>' in content
+    assert "onclick" not in content and "track()" not in content and "Home" not in content and "great" not in content
+    assert before["https://x.example/a/1"] == (None, None)
+    assert sorted(pages, key=str) == [("/a/0", '"a0"'), ("/a/0", None), ("/a/1", None), ("/a/1", None)]
+    with Session() as db:
+        after = {n.url: (n.content, n.content_etag) for n in db.query(News)}
+    assert after == before
+    assert importer.stats()["extraction"] == {"extracted": 1, "not_modified": 1, "empty": 2, "errors": 0}
+
+
+def test_same_article_in_feeds_of_two_languages_is_kept_twice(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'news.db'}")
+    News.__table__.create(engine)
+    RSSFeed.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(rss_engine, "SessionLocal", Session)
+    with Session() as db:
+        db.add_all([
+            RSSFeed(id="uk", url="https://x.example/uk.rss", language="uk", download_images=False),
+            RSSFeed(id="en", url="https://x.example/en.rss", language="en", download_images=False),
+        ])
+        db.commit()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        # both feeds link the same article
+        return httpx.Response(200, text=_rss("x.example", 1).replace("x.example news", request.url.path))
+
+    importer = FeedImportEngine(concurrency=2, parse_workers=0)
+
+    async def run():
+        clients = HTTPClients(transport=httpx.MockTransport(handler))
+        try:
+            return await importer.run_once(clients, due_only=False)
+        finally:
+            await clients.aclose()
+
+    stats = asyncio.run(run())
+
+    assert stats["created"] == 2
+    with Session() as db:
+        rows = sorted((n.url, n.language, n.source) for n in db.query(News))
+    assert rows == [("https://x.example/a/0", "en", "/en.rss"), ("https://x.example/a/0", "uk", "/uk.rss")]